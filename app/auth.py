@@ -1,20 +1,21 @@
+import asyncio
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from app.database import SessionLocal, get_db
 from app import models
 from app.settings import settings
+from app.services.principal_cache import Principal, principal_cache
+from app.services.password_hasher import pwd_context
 
 # Настройки JWT
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 
-# Утилиты для хэширования
+# Утилиты для хэширования (синхронные; в обработчиках запросов используйте password_hasher)
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
@@ -30,20 +31,66 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+def create_user_token(user: models.User) -> str:
+    """Токен с claims роли и версии токена пользователя"""
+    return create_access_token(data={"sub": str(user.user_id), "role": user.role, "ver": user.token_version or 0})
+
+def _decode_claims(token: str) -> Optional[dict]:
+    """Проверенные claims токена с int user_id; None, если токен невалиден"""
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload["user_id"] = int(payload.get("sub"))
+    except (JWTError, TypeError, ValueError):
+        return None
+    return payload
+
+def _needs_reload(principal: Optional[Principal], claims: dict) -> bool:
+    # промах или запись старше токена — перечитываем из БД
+    return principal is None or principal.token_version < claims.get("ver", 0)
+
+def _matches(principal: Optional[Principal], claims: dict) -> bool:
+    """Токен действителен, только если его версия и роль совпадают с актуальными"""
+    if principal is None or principal.token_version != claims.get("ver", 0):
+        return False
+    return "role" not in claims or claims["role"] == principal.role
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Principal:
+    """
+    Пользователь по JWT. Principal берётся из кэша; БД читается только при промахе.
+    Токен отклоняется, если его версия или роль не совпадают с актуальными.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Не удалось подтвердить учетные данные",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        user_id: int = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
+    claims = _decode_claims(token)
+    if claims is None:
         raise credentials_exception
-    user = db.query(models.User).filter(models.User.user_id == user_id).first()
-    if user is None:
+    principal = principal_cache.get(claims["user_id"])
+    if _needs_reload(principal, claims):
+        principal = principal_cache.load(db, claims["user_id"])
+    if not _matches(principal, claims):
         raise credentials_exception
-    return user
\ No newline at end of file
+    return principal
+
+async def authenticate_websocket(token: str) -> Optional[Principal]:
+    """
+    Те же проверки, что у get_current_user (версия токена, роль), для WebSocket.
+    При промахе кэша БД читается короткой сессией в потоке — соединение пула
+    не удерживается на время жизни сокета. None — токен отклонён.
+    """
+    claims = _decode_claims(token)
+    if claims is None:
+        return None
+    principal = principal_cache.get(claims["user_id"])
+    if _needs_reload(principal, claims):
+        principal = await asyncio.to_thread(_load_principal, claims["user_id"])
+    return principal if _matches(principal, claims) else None
+
+def _load_principal(user_id: int) -> Optional[Principal]:
+    db = SessionLocal()
+    try:
+        return principal_cache.load(db, user_id)
+    finally:
+        db.close()
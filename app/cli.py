@@ -0,0 +1,114 @@
+"""
+Служебные команды IdeaBridge.
+
+    python -m app.cli reconcile-user-stats
+    python -m app.cli archive-notifications [--days 90]
+    python -m app.cli repair-idea-counters
+    python -m app.cli reconcile-system-counters
+    python -m app.cli import-ideas ideas.csv [--format csv|ndjson]
+    python -m app.cli backfill-similarity [--batch-size 5000]
+"""
+import argparse
+import json
+
+from app import crud
+from app.database import SessionLocal
+from app.services.user_stats_service import UserStatsService
+from app.services.system_counters_service import SystemCountersService
+from app.services.idea_import import IdeaImporter
+from app.services.notification_retention import NotificationRetention
+from app.services.similarity import similarity_index
+from app.settings import settings
+
+
+def reconcile_user_stats(args):
+    db = SessionLocal()
+    try:
+        fixed = UserStatsService(db).reconcile()
+        db.commit()
+        print(f"user_stats: создано/исправлено строк: {fixed}")
+    finally:
+        db.close()
+
+
+def archive_notifications(args):
+    db = SessionLocal()
+    try:
+        moved = NotificationRetention(db, retention_days=args.days).run()
+        print(f"notifications: перенесено в архив: {moved}")
+    finally:
+        db.close()
+
+
+def repair_idea_counters(args):
+    db = SessionLocal()
+    try:
+        fixed = crud.repair_idea_counters(db)
+        db.commit()
+        print(f"ideas: исправлено счётчиков голосов/комментариев: {fixed}")
+    finally:
+        db.close()
+
+
+def reconcile_system_counters(args):
+    db = SessionLocal()
+    try:
+        SystemCountersService(db).reconcile()
+        print("system_counters и daily_activity пересчитаны")
+    finally:
+        db.close()
+
+
+def import_ideas(args):
+    fmt = args.format or ("ndjson" if args.path.lower().endswith((".ndjson", ".jsonl")) else "csv")
+    db = SessionLocal()
+    try:
+        with open(args.path, encoding="utf-8-sig", newline="") as f:
+            report = IdeaImporter(db, batch_size=args.batch_size).run(f, fmt)
+        print(json.dumps(report.as_dict(), indent=2, ensure_ascii=False))
+    finally:
+        db.close()
+
+
+def backfill_similarity(args):
+    computed = similarity_index.backfill(SessionLocal, batch_size=args.batch_size)
+    print(f"idea_signatures: досчитано подписей: {computed}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Служебные команды IdeaBridge")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    cmd = commands.add_parser("reconcile-user-stats", help="Пересчитать счётчики user_stats из исходных таблиц")
+    cmd.set_defaults(func=reconcile_user_stats)
+
+    cmd = commands.add_parser("archive-notifications", help="Перенести старые прочитанные уведомления в архив")
+    cmd.add_argument("--days", type=int, default=settings.NOTIFICATION_RETENTION_DAYS)
+    cmd.set_defaults(func=archive_notifications)
+
+    cmd = commands.add_parser("repair-idea-counters", help="Пересчитать vote_count/comment_count идей")
+    cmd.set_defaults(func=repair_idea_counters)
+
+    cmd = commands.add_parser(
+        "reconcile-system-counters", help="Пересчитать system_counters и daily_activity для админ-статистики"
+    )
+    cmd.set_defaults(func=reconcile_system_counters)
+
+    cmd = commands.add_parser("import-ideas", help="Пакетный импорт идей из CSV или NDJSON")
+    cmd.add_argument("path")
+    cmd.add_argument("--format", choices=("csv", "ndjson"))
+    cmd.add_argument("--batch-size", type=int, default=settings.IMPORT_BATCH_SIZE)
+    cmd.set_defaults(func=import_ideas)
+
+    cmd = commands.add_parser(
+        "backfill-similarity", help="Досчитать MinHash-подписи идей без подписи (однократно, после миграции)"
+    )
+    cmd.add_argument("--batch-size", type=int, default=5000)
+    cmd.set_defaults(func=backfill_similarity)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,37 +1,256 @@
 
+from collections import Counter, defaultdict
+from datetime import timezone
+from typing import List, Optional
+from sqlalchemy import bindparam, cast, delete, func, literal, select, text, true, tuple_, update
+from sqlalchemy.dialects.postgresql import DOUBLE_PRECISION, insert as pg_insert
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app import models, schemas
-from app.auth import get_password_hash, verify_password, create_access_token, get_current_user
+from app.utils.pagination import encode_cursor, decode_cursor, encode_rank_cursor, decode_rank_cursor
+from app.auth import create_user_token
 from fastapi import FastAPI, Depends, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
 from app.services.reward_achievements_service import RewardAchievementService
+from app.services import outbox_service as outbox
+from app.services.user_stats_service import UserStatsService
+from app.services.system_counters_service import SystemCountersService
+from app.services.catalog_cache import catalog_cache
+from app.services.principal_cache import Principal
+from app.services.password_hasher import password_hasher
+from app.services.similarity import similarity_index, idea_text
+from app.services.response_cache import invalidate_responses, TAG_IDEAS
 
 def create_idea(db: Session, idea_in: schemas.IdeaCreate, author_id: int):
+    """
+    Создание идеи; побочные эффекты записываются в outbox в той же транзакции.
+    Возвращает (идея, похожие ранее поданные идеи).
+    """
+    signature = similarity_index.hasher.signature(idea_text(idea_in.title, idea_in.description))
+    similar = similarity_index.query(signature)
     idea = models.Idea(title=idea_in.title, description=idea_in.description, author_id=author_id, category_id=idea_in.category_id)
     db.add(idea)
-    db.commit()
-    db.refresh(idea)
+    db.flush()  # нужен idea_id для участников команды
+    UserStatsService(db).increment(author_id, ideas_count=1)
+    counters = SystemCountersService(db)
+    counters.increment(ideas=1)
+    counters.record_activity(ideas=1)
     # team members handling - simple: add idea_team_members if table exists
-    try:
-        for uid in (idea_in.team_member_ids or []):
-            db.execute("INSERT INTO ideabridge.idea_team_members (idea_id, user_id, is_primary) VALUES (:idea_id, :user_id, false) ON CONFLICT DO NOTHING", {"idea_id": idea.idea_id, "user_id": uid})
-            db.commit()
-    except Exception:
-        pass
+    if idea_in.team_member_ids:
+        try:
+            with db.begin_nested():
+                for uid in idea_in.team_member_ids:
+                    db.execute(
+                        text("INSERT INTO ideabridge.idea_team_members (idea_id, user_id, is_primary) VALUES (:idea_id, :user_id, false) ON CONFLICT DO NOTHING"),
+                        {"idea_id": idea.idea_id, "user_id": uid}
+                    )
+        except DBAPIError:
+            pass
 
-    service = RewardAchievementService(db)
-    service.add_points(author_id, "create_idea")
+    # очки, достижения и уведомление обработает outbox-воркер
+    outbox.enqueue(db, "idea_created", {"idea_id": idea.idea_id, "author_id": author_id, "title": idea.title})
+    similarity_index.stage_signature(db, idea.idea_id, signature)
+    invalidate_responses(db, TAG_IDEAS)
+    db.commit()
+    similarity_index.add(idea.idea_id, signature)
+    return idea, _similar_ideas(db, similar)
+
+def find_similar_ideas(db: Session, text_: str, limit: int = 5):
+    """Похожие идеи по LSH-индексу — без перебора всех идей"""
+    signature = similarity_index.hasher.signature(text_)
+    return _similar_ideas(db, similarity_index.query(signature, limit))
 
-    return idea
+def _similar_ideas(db: Session, hits):
+    """[(idea_id, similarity)] -> список dict с заголовками, одним запросом"""
+    if not hits:
+        return []
+    titles = dict(db.execute(
+        select(models.Idea.idea_id, models.Idea.title).where(models.Idea.idea_id.in_([i for i, _ in hits]))
+    ).all())
+    return [
+        {"idea_id": idea_id, "title": titles[idea_id], "similarity": round(score, 3)}
+        for idea_id, score in hits if idea_id in titles
+    ]
 
 def list_ideas(db: Session, skip: int = 0, limit: int = 50):
-    return db.query(models.Idea).order_by(models.Idea.created_at.desc()).offset(skip).limit(limit).all()
+    """Устаревшая OFFSET-пагинация, оставлена для старых клиентов"""
+    return (
+        db.query(models.Idea)
+        .order_by(models.Idea.created_at.desc(), models.Idea.idea_id.desc())
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+
+def list_ideas_page(db: Session, cursor: Optional[str] = None, limit: int = 50):
+    """
+    Keyset-пагинация ленты по (created_at, idea_id) — стоимость страницы не зависит от глубины.
+    Возвращает (идеи, next_cursor).
+    """
+    query = db.query(models.Idea)
+    after = decode_cursor(cursor)
+    if after:
+        query = query.filter(tuple_(models.Idea.created_at, models.Idea.idea_id) < after)
+    ideas = (
+        query.order_by(models.Idea.created_at.desc(), models.Idea.idea_id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+    next_cursor = None
+    if len(ideas) > limit:
+        ideas = ideas[:limit]
+        last = ideas[-1]
+        next_cursor = encode_cursor(last.created_at, last.idea_id)
+    return ideas, next_cursor
+
+def search_ideas(
+    db: Session,
+    q: str,
+    category_id: Optional[int] = None,
+    status: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = 20,
+):
+    """
+    Полнотекстовый поиск по идеям (GIN-индекс по search_vector), сортировка по ts_rank.
+    Keyset-пагинация по (rank, idea_id). Возвращает ([(idea, rank)], next_cursor).
+    ts_rank возвращает real; ранг приводится к float8 и в выдаче, и в условии курсора —
+    иначе значение из курсора (double) не совпадает с real и страницы теряют или дублируют строки.
+    """
+    query_ts = func.websearch_to_tsquery("russian", q)
+    rank = cast(func.ts_rank(models.Idea.search_vector, query_ts), DOUBLE_PRECISION)
+    query = db.query(models.Idea, rank.label("rank")).filter(models.Idea.search_vector.op("@@")(query_ts))
+    if category_id is not None:
+        query = query.filter(models.Idea.category_id == category_id)
+    if status is not None:
+        query = query.filter(models.Idea.status == status)
+    after = decode_rank_cursor(cursor)
+    if after:
+        query = query.filter(tuple_(rank, models.Idea.idea_id) < after)
+    rows = query.order_by(rank.desc(), models.Idea.idea_id.desc()).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_idea, last_rank = rows[-1]
+        next_cursor = encode_rank_cursor(last_rank, last_idea.idea_id)
+    return rows, next_cursor
+
+def _bump_idea_counters(db: Session, idea_id: int, **deltas: int):
+    """UPDATE ideas SET vote_count = vote_count + :d ... в транзакции вызывающего кода"""
+    db.execute(
+        update(models.Idea)
+        .where(models.Idea.idea_id == idea_id)
+        .values({getattr(models.Idea, name): getattr(models.Idea, name) + delta for name, delta in deltas.items()})
+        .execution_options(synchronize_session=False)
+    )
+
+def repair_idea_counters(db: Session) -> int:
+    """Пересчёт vote_count/comment_count всех идей одним запросом; возвращает число исправленных идей"""
+    result = db.execute(text("""
+        UPDATE ideabridge.ideas AS i
+        SET vote_count = fresh.vote_count, comment_count = fresh.comment_count
+        FROM (
+            SELECT ideas.idea_id,
+                   COALESCE(v.n, 0) AS vote_count,
+                   COALESCE(c.n, 0) AS comment_count
+            FROM ideabridge.ideas
+            LEFT JOIN (SELECT idea_id, count(*) AS n FROM ideabridge.votes GROUP BY idea_id) v USING (idea_id)
+            LEFT JOIN (SELECT idea_id, count(*) AS n FROM ideabridge.comments GROUP BY idea_id) c USING (idea_id)
+        ) AS fresh
+        WHERE i.idea_id = fresh.idea_id
+          AND (i.vote_count, i.comment_count) IS DISTINCT FROM (fresh.vote_count, fresh.comment_count)
+    """))
+    return result.rowcount
+
+def account_user_deletion(db: Session, user_id: int):
+    """
+    Вызывается до удаления пользователя в той же транзакции: каскад FK унесёт его голоса
+    и комментарии, в том числе под чужими идеями, — их вычитаем из счётчиков этих идей.
+    Собственные идеи пользователя удаляются целиком, их счётчики не трогаем.
+    В user_stats остальных пользователей вычитаются лайки, полученные от удаляемого,
+    а также голоса и комментарии, оставленные под его идеями. Глобальные счётчики
+    и daily_activity уменьшаются на все уносимые строки — по дню их создания.
+    """
+    db.execute(text("""
+        UPDATE ideabridge.ideas AS i
+        SET vote_count = i.vote_count - gone.votes, comment_count = i.comment_count - gone.comments
+        FROM (
+            SELECT idea_id, sum(votes) AS votes, sum(comments) AS comments
+            FROM (
+                SELECT idea_id, 1 AS votes, 0 AS comments FROM ideabridge.votes WHERE user_id = :user_id
+                UNION ALL
+                SELECT idea_id, 0, 1 FROM ideabridge.comments WHERE user_id = :user_id
+            ) AS removed
+            GROUP BY idea_id
+        ) AS gone
+        WHERE i.idea_id = gone.idea_id AND i.author_id IS DISTINCT FROM :user_id
+    """), {"user_id": user_id})
+    db.execute(text("""
+        UPDATE ideabridge.user_stats AS s
+        SET likes_received = s.likes_received - gone.likes,
+            votes_cast = s.votes_cast - gone.votes,
+            comments_count = s.comments_count - gone.comments,
+            updated_at = now()
+        FROM (
+            SELECT user_id, sum(likes) AS likes, sum(votes) AS votes, sum(comments) AS comments
+            FROM (
+                SELECT i.author_id AS user_id, 1 AS likes, 0 AS votes, 0 AS comments
+                  FROM ideabridge.votes v JOIN ideabridge.ideas i USING (idea_id)
+                 WHERE v.user_id = :user_id AND v.vote_type
+                UNION ALL
+                SELECT v.user_id, 0, 1, 0
+                  FROM ideabridge.votes v JOIN ideabridge.ideas i USING (idea_id)
+                 WHERE i.author_id = :user_id
+                UNION ALL
+                SELECT c.user_id, 0, 0, 1
+                  FROM ideabridge.comments c JOIN ideabridge.ideas i USING (idea_id)
+                 WHERE i.author_id = :user_id
+            ) AS removed
+            WHERE user_id <> :user_id
+            GROUP BY user_id
+        ) AS gone
+        WHERE s.user_id = gone.user_id
+    """), {"user_id": user_id})
+
+    removed = db.execute(text("""
+        SELECT (created_at AT TIME ZONE 'UTC')::date AS day,
+               sum(ideas) AS ideas, sum(votes) AS votes, sum(comments) AS comments
+        FROM (
+            SELECT created_at, 1 AS ideas, 0 AS votes, 0 AS comments
+              FROM ideabridge.ideas WHERE author_id = :user_id
+            UNION ALL
+            SELECT v.created_at, 0, 1, 0
+              FROM ideabridge.votes v JOIN ideabridge.ideas i USING (idea_id)
+             WHERE v.user_id = :user_id OR i.author_id = :user_id
+            UNION ALL
+            SELECT c.created_at, 0, 0, 1
+              FROM ideabridge.comments c JOIN ideabridge.ideas i USING (idea_id)
+             WHERE c.user_id = :user_id OR i.author_id = :user_id
+        ) AS removed
+        GROUP BY day
+    """), {"user_id": user_id}).all()
+    achievements = db.execute(
+        select(func.count()).select_from(models.UserAchievement).where(models.UserAchievement.user_id == user_id)
+    ).scalar_one()
+    counters = SystemCountersService(db)
+    counters.increment(
+        users=-1,
+        ideas=-sum(row.ideas for row in removed),
+        votes=-sum(row.votes for row in removed),
+        comments=-sum(row.comments for row in removed),
+        achievements=-achievements,
+    )
+    counters.record_activity_many({
+        row.day: {"ideas": -row.ideas, "votes": -row.votes, "comments": -row.comments}
+        for row in removed if row.day is not None
+    })
 
 def create_comment(
         idea_id: int,
         comment_in: schemas.CommentCreate,
         db: Session,
-        current_user: models.User
+        current_user: Principal
     ):
     idea = db.query(models.Idea).filter(models.Idea.idea_id == idea_id).first()
     if not idea:
@@ -44,32 +263,171 @@ def create_comment(
         text=comment_in.text
     )
     db.add(new_comment)
+    UserStatsService(db).increment(current_user.user_id, comments_count=1)
+    counters = SystemCountersService(db)
+    counters.increment(comments=1)
+    counters.record_activity(comments=1)
+    _bump_idea_counters(db, idea_id, comment_count=1)
+    db.flush()
+
+    outbox.enqueue(db, "comment_added", {
+        "idea_id": idea_id,
+        "comment_id": new_comment.comment_id,
+        "idea_author_id": idea.author_id,
+        "user_id": current_user.user_id,
+        "user_email": current_user.email,
+        "text": new_comment.text,
+    })
     db.commit()
-    db.refresh(new_comment)
+    return new_comment
 
-    service = RewardAchievementService(db)
-    
-    # автор идеи получает бонус за комментарии других пользователей
-    if idea.author_id != current_user.user_id:
-        service.add_points(idea.author_id, "comment_received") 
+def _delete_votes(db: Session, user_id: int, idea_ids: List[int]):
+    """DELETE ... USING ideas RETURNING: снятые голоса (idea_id, created_at, author_id) без предварительного чтения"""
+    return db.execute(
+        delete(models.Vote)
+        .where(
+            models.Vote.user_id == user_id,
+            models.Vote.idea_id.in_(idea_ids),
+            models.Idea.idea_id == models.Vote.idea_id,
+        )
+        .returning(models.Vote.idea_id, models.Vote.created_at, models.Idea.author_id)
+        .execution_options(synchronize_session=False)
+    ).all()
 
-    # начисляем баллы по правилу
-    service.add_points(current_user.user_id, "comment_add") 
-    return new_comment
+def _insert_votes(db: Session, user_id: int, idea_ids: List[int]):
+    """
+    INSERT ... SELECT FROM ideas ON CONFLICT DO NOTHING RETURNING: новые голоса
+    (vote_id, idea_id, author_id, title). Несуществующие идеи и уже стоящие голоса пропускаются.
+    """
+    inserted = (
+        pg_insert(models.Vote)
+        .from_select(
+            ["idea_id", "user_id", "vote_type"],
+            select(models.Idea.idea_id, literal(user_id), true()).where(models.Idea.idea_id.in_(idea_ids)),
+        )
+        .on_conflict_do_nothing(constraint="uq_votes_idea_user")
+        .returning(models.Vote.vote_id, models.Vote.idea_id)
+        .cte("inserted")
+    )
+    return db.execute(
+        select(inserted.c.vote_id, inserted.c.idea_id, models.Idea.author_id, models.Idea.title)
+        .join(models.Idea, models.Idea.idea_id == inserted.c.idea_id)
+    ).all()
+
+def _apply_vote_changes(db: Session, voter: Principal, added, removed):
+    """
+    Счётчики идей и пользователей, суточный rollup и outbox для изменившихся голосов —
+    по одному запросу на вид независимо от числа голосов. Строки обновляются
+    в порядке ключей, чтобы параллельные пакеты не взаимоблокировались.
+    """
+    if not added and not removed:
+        return
+    user_deltas = defaultdict(lambda: defaultdict(int))
+    idea_deltas = Counter()
+    user_deltas[voter.user_id]["votes_cast"] += len(added) - len(removed)
+    for row in added:
+        user_deltas[row.author_id]["likes_received"] += 1
+        idea_deltas[row.idea_id] += 1
+    for row in removed:
+        user_deltas[row.author_id]["likes_received"] -= 1
+        idea_deltas[row.idea_id] -= 1
+
+    ideas = models.Idea.__table__
+    db.execute(
+        update(ideas)
+        .where(ideas.c.idea_id == bindparam("b_idea_id"))
+        .values(vote_count=ideas.c.vote_count + bindparam("b_delta")),
+        [{"b_idea_id": idea_id, "b_delta": delta} for idea_id, delta in sorted(idea_deltas.items())],
+    )
+    UserStatsService(db).increment_many({user_id: dict(user_deltas[user_id]) for user_id in sorted(user_deltas)})
+
+    counters = SystemCountersService(db)
+    counters.increment(votes=len(added) - len(removed))
+    if added:
+        counters.record_activity(votes=len(added))
+    # снятый голос уменьшает день, в который он был поставлен
+    counters.record_activity_many({
+        day: {"votes": -count}
+        for day, count in Counter(row.created_at.astimezone(timezone.utc).date() for row in removed).items()
+    })
+
+    # награды и уведомление автора обработает outbox-воркер
+    for row in added:
+        outbox.enqueue(db, "vote_added", {
+            "idea_id": row.idea_id,
+            "vote_id": row.vote_id,
+            "idea_author_id": row.author_id,
+            "user_id": voter.user_id,
+            "user_email": voter.email,
+            "title": row.title,
+        })
 
-def create_user(user: schemas.UserCreate, db: Session):
-    existing = db.query(models.User).filter(models.User.email == user.email).first()
+def vote_idea(db: Session, idea_id: int, current_user: Principal):
+    """
+    Переключение голоса: повторный голос удаляет предыдущий. Без чтения перед записью —
+    DELETE ... RETURNING, а если удалять нечего, INSERT ... ON CONFLICT DO NOTHING RETURNING;
+    два одновременных клика не приводят к нарушению uq_votes_idea_user. Один commit на действие.
+    """
+    removed = _delete_votes(db, current_user.user_id, [idea_id])
+    if removed:
+        _apply_vote_changes(db, current_user, [], removed)
+        db.commit()
+        return {"message": "Голос удалён"}
+
+    added = _insert_votes(db, current_user.user_id, [idea_id])
+    if not added:
+        if db.execute(select(models.Idea.idea_id).where(models.Idea.idea_id == idea_id)).first() is None:
+            raise HTTPException(status_code=404, detail="Идея не найдена")
+        # голос уже поставлен параллельным запросом того же пользователя
+        return {"message": "Голос уже учтён"}
+
+    _apply_vote_changes(db, current_user, added, [])
+    db.commit()
+    return {"message": "Голос принят", "vote_id": added[0].vote_id}
+
+def vote_ideas_batch(db: Session, votes: List[schemas.VoteBatchItem], current_user: Principal) -> dict:
+    """
+    Голоса одного пользователя по многим идеям одной транзакцией. В отличие от vote_idea
+    не переключает, а выставляет состояние (vote=True — голос стоит, False — снят),
+    поэтому повтор запроса безопасен. Для повторяющихся idea_id действует последнее значение.
+    """
+    desired = {}
+    for item in votes:
+        desired[item.idea_id] = item.vote
+    to_add = sorted(idea_id for idea_id, vote in desired.items() if vote)
+    to_remove = sorted(idea_id for idea_id, vote in desired.items() if not vote)
+
+    removed = _delete_votes(db, current_user.user_id, to_remove) if to_remove else []
+    added = _insert_votes(db, current_user.user_id, to_add) if to_add else []
+    _apply_vote_changes(db, current_user, added, removed)
+    db.commit()
+
+    added_ids = sorted(row.idea_id for row in added)
+    removed_ids = sorted(row.idea_id for row in removed)
+    return {
+        "added": added_ids,
+        "removed": removed_ids,
+        "unchanged": sorted(set(desired) - set(added_ids) - set(removed_ids)),
+    }
+
+async def create_user(user: schemas.UserCreate, db: AsyncSession):
+    existing = (await db.execute(select(models.User.user_id).where(models.User.email == user.email))).first()
     if existing:
         raise HTTPException(status_code=400, detail="Пользователь с таким email уже существует")
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await password_hasher.hash(user.password)
     new_user = models.User(
         full_name=user.full_name,
         email=user.email,
         password_hash=hashed_password,
     )
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.run_sync(lambda session: SystemCountersService(session).increment(users=1))
+    try:
+        await db.commit()
+    except IntegrityError:
+        # параллельная регистрация с тем же email
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Пользователь с таким email уже существует")
 
     return new_user
 
@@ -83,18 +441,25 @@ def get_user_by_idea_id(db: Session,idea_id):
     return user
 
 
-def login_user(form_data: OAuth2PasswordRequestForm, db: Session):
-    user = db.query(models.User).filter(models.User.email == form_data.username).first()
-    
-    if not user or not verify_password(form_data.password, user.password_hash):
+async def login_user(form_data: OAuth2PasswordRequestForm, db: AsyncSession):
+    user = (await db.execute(select(models.User).where(models.User.email == form_data.username))).scalar_one_or_none()
+    if not user:
+        raise HTTPException(status_code=400, detail="Неверный email или пароль")
+
+    verified, new_hash = await password_hasher.verify_and_update(form_data.password, user.password_hash)
+    if not verified:
         raise HTTPException(status_code=400, detail="Неверный email или пароль")
-    access_token = create_access_token(data={"sub": str(user.user_id)})
+    if new_hash:
+        # хэш со старой стоимостью bcrypt — прозрачно перехэшируем
+        user.password_hash = new_hash
+        await db.commit()
+    access_token = create_user_token(user)
     
     return access_token
 
 def get_points_logs(
     db: Session,
-    current_user: models.User
+    current_user: Principal
 ):
     logs = (
         db.query(models.PointsLog)
@@ -105,6 +470,15 @@ def get_points_logs(
 
     return logs
 
+def get_user_balance(db: Session, user_id: int):
+    """Актуальные очки и монеты (в кэше Principal их нет — они меняются слишком часто)"""
+    row = db.execute(
+        select(models.User.points, models.User.coins).where(models.User.user_id == user_id)
+    ).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Пользователь не найден")
+    return row
+
 def get_points_rules(db: Session):
     return db.query(models.PointsRule).all()
 
@@ -114,7 +488,10 @@ def update_points_rule(action: str, update: schemas.PointsRuleUpdate, db: Sessio
         raise HTTPException(status_code=404, detail="Правило не найдено")
     rule.points_amount = update.points
     rule.coins_amount = update.coins
+    # сигнал остальным воркерам: версия справочника изменилась
+    catalog_cache.bump_version(db)
     db.commit()
+    catalog_cache.clear()
     db.refresh(rule)
     return rule
 
@@ -1,24 +1,109 @@
-
-import os
+import asyncio
+import time
 from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from app.models import Base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.settings import settings
+from app.services.metrics import DB_POOL_CHECKOUT
+
+SEARCH_PATH = "ideabridge,public"
+
+# общие настройки пула для sync и async движков
+POOL_OPTIONS = dict(
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+)
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool, замеряющий ожидание соединения (включая открытие нового) для /metrics"""
+    metric_label = "sync"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT.observe(time.perf_counter() - started, self.metric_label)
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    metric_label = "async"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT.observe(time.perf_counter() - started, self.metric_label)
+
+
+def _url_with_driver(url: str, driver: str) -> str:
+    """postgresql://... -> postgresql+<driver>://..."""
+    return make_url(url).set(drivername=f"postgresql+{driver}").render_as_string(hide_password=False)
+
 
 #заменить на DATABASE_URL
 engine = create_engine(
     settings.DATABASE_URL_LOCAL,
-    connect_args={"options": "-c search_path=ideabridge,public"}
+    connect_args={
+        "options": f"-c search_path={SEARCH_PATH} -c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+    },
+    poolclass=TimedQueuePool if settings.METRICS_ENABLED else QueuePool,
+    **POOL_OPTIONS,
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-def init_db():
-    # create schema and tables if not exists (for dev; in prod use alembic)
-    with engine.connect() as conn:
-        conn.execute(text("CREATE SCHEMA IF NOT EXISTS ideabridge"))
-        conn.commit()
-    Base.metadata.create_all(bind=engine)
+# async движок (asyncpg) для горячих эндпоинтов
+async_engine = create_async_engine(
+    _url_with_driver(settings.DATABASE_URL_LOCAL, "asyncpg"),
+    connect_args={
+        "server_settings": {
+            "search_path": SEARCH_PATH,
+            "statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS),
+        }
+    },
+    poolclass=TimedAsyncQueuePool if settings.METRICS_ENABLED else AsyncAdaptedQueuePool,
+    **POOL_OPTIONS,
+)
+
+# expire_on_commit=False: объекты остаются читаемыми после commit без ленивых запросов вне greenlet
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+# DSN для отдельного asyncpg-соединения под LISTEN (вне пула)
+LISTEN_DSN = make_url(settings.DATABASE_URL_LOCAL).set(drivername="postgresql").render_as_string(hide_password=False)
+
+# Схема БД создаётся и обновляется миграциями: alembic upgrade head
+
+def _warm_sync_pool(size: int):
+    connections = [engine.connect() for _ in range(size)]
+    for conn in connections:
+        conn.close()
+
+
+async def warm_up_pools(size: int = settings.DB_POOL_WARMUP):
+    """Открывает size соединений в обоих пулах, чтобы первые запросы не платили за подключение"""
+    if size <= 0:
+        return
+    connections = [await async_engine.connect() for _ in range(size)]
+    for conn in connections:
+        await conn.close()
+    await asyncio.to_thread(_warm_sync_pool, size)
+
+
+async def ping_db(timeout: float = 2.0):
+    """SELECT 1 через async-пул; исключение, если БД недоступна"""
+    async def _ping():
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.wait_for(_ping(), timeout)
 
 def get_db():
     db = SessionLocal()
@@ -26,3 +111,7 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
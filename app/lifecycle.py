@@ -0,0 +1,80 @@
+"""
+Жизненный цикл web-процесса. Импорт приложения не обращается к БД; при старте
+поднимаются фоновые компоненты, а прогрев (пулы, рейтинг, индекс похожих идей)
+идёт фоновой задачей с повторами — процесс стартует и при недоступной БД,
+/health/ready отвечает 503, пока прогрев не завершится.
+"""
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI
+from app.database import SessionLocal, warm_up_pools
+from app.services.pubsub import listener
+from app.services.connection_manager import manager as ws_manager
+from app.services.password_hasher import password_hasher
+from app.services.leaderboard import leaderboard
+from app.services.similarity import similarity_index
+
+logger = logging.getLogger(__name__)
+
+
+class WarmUpState:
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.ready_at = None
+        self.last_error = None
+
+    @property
+    def ready(self) -> bool:
+        return self.ready_at is not None
+
+    def as_dict(self) -> dict:
+        return {
+            "ready": self.ready,
+            "seconds": round((self.ready_at or time.monotonic()) - self.started_at, 3),
+            "last_error": self.last_error,
+        }
+
+
+warm_up_state = WarmUpState()
+
+
+async def warm_up(state: WarmUpState = warm_up_state):
+    delay = 1.0
+    while True:
+        try:
+            await warm_up_pools()
+            await leaderboard.start(SessionLocal)
+            await similarity_index.start(SessionLocal)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            state.last_error = repr(e)
+            logger.warning("Прогрев не удался: %r, повтор через %.0f c", e, delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+            continue
+        state.last_error = None
+        state.ready_at = time.monotonic()
+        return
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # один LISTEN на процесс: доставка уведомлений из любых воркеров в локальные сокеты
+    await listener.start()
+    password_hasher.start()
+    warm_up_task = asyncio.create_task(warm_up())
+    try:
+        yield
+    finally:
+        warm_up_task.cancel()
+        try:
+            await warm_up_task
+        except asyncio.CancelledError:
+            pass
+        await listener.stop()
+        await ws_manager.stop()
+        await leaderboard.stop()
+        password_hasher.shutdown()
@@ -1,93 +1,146 @@
 
-from fastapi import FastAPI, Depends, HTTPException, status
+from typing import List, Optional
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app import models, crud, schemas
-from app.database import engine, SessionLocal, init_db, get_db
+from app.database import get_db, get_async_db
 from app.auth import get_password_hash, verify_password, create_access_token, get_current_user
-from app.services.reward_achievements_service import RewardAchievementService
-from app.services.notifications_service import NotificationService
-from app.routers import achievements, notifications, websocket, admin
-
-app = FastAPI(title="IdeaBridge API (MVP)")
+from app.services.principal_cache import Principal
+from app.services import outbox_service as outbox
+from app.services.response_cache import response_cache, invalidate_responses, TAG_IDEAS, idea_tag
+from app.utils.pagination import encode_cursor
+from app.lifecycle import lifespan
+from app.observability import setup_logging, install as install_observability
+from app.routers import (
+    achievements, notifications, websocket, admin, health, metrics, rewards, leaderboard as leaderboard_router
+)
+
+setup_logging()
+
+app = FastAPI(title="IdeaBridge API (MVP)", lifespan=lifespan)
+install_observability(app)
+app.include_router(health.router)
+app.include_router(metrics.router)
 app.include_router(achievements.router)
 app.include_router(notifications.router)
 app.include_router(websocket.router)
 app.include_router(admin.router)
-
-models.Base.metadata.create_all(bind=engine)
-
-# initialize DB (dev only)
-init_db()
+app.include_router(leaderboard_router.router)
+app.include_router(rewards.router)
 
 @app.get("/")
 def root():
     return {"message": "IdeaBridge backend is running"}
 
-@app.get("/ideas/", response_model=list[schemas.IdeaOut])
-def get_ideas(skip: int = 0, limit: int = 50, db: Session = Depends(get_db)):
-    return crud.list_ideas(db, skip, limit)
+@app.get("/ideas/", response_model=schemas.IdeaPage)
+async def get_ideas(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    skip: Optional[int] = Query(None, ge=0, deprecated=True, description="Устарело, используйте cursor"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    # закэшированная страница (или 304) отдаётся без обращения к БД
+    cached = response_cache.lookup(request)
+    if cached is not None:
+        return cached
+    generation = response_cache.generation((TAG_IDEAS,))
+    if skip is not None and cursor is None:
+        ideas = await db.run_sync(crud.list_ideas, skip, limit)
+        # курсор для перехода клиентов с offset на keyset
+        next_cursor = encode_cursor(ideas[-1].created_at, ideas[-1].idea_id) if len(ideas) == limit else None
+    else:
+        ideas, next_cursor = await db.run_sync(crud.list_ideas_page, cursor, limit)
+    page = schemas.IdeaPage(items=[schemas.IdeaOut.model_validate(idea, from_attributes=True) for idea in ideas], next_cursor=next_cursor)
+    return response_cache.respond(request, page, (TAG_IDEAS,), generation)
+
+@app.get("/ideas/search", response_model=schemas.IdeaSearchPage)
+async def search_ideas(
+    q: str = Query(..., min_length=1, max_length=200),
+    category_id: Optional[int] = None,
+    status: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+):
+    rows, next_cursor = await db.run_sync(crud.search_ideas, q, category_id, status, cursor, limit)
+    items = [
+        schemas.IdeaSearchHit(
+            idea_id=idea.idea_id, title=idea.title, description=idea.description,
+            author_id=idea.author_id, status=idea.status,
+            vote_count=idea.vote_count, comment_count=idea.comment_count, rank=rank,
+        )
+        for idea, rank in rows
+    ]
+    return {"items": items, "next_cursor": next_cursor}
+
+@app.get("/ideas/similar", response_model=List[schemas.SimilarIdea])
+async def similar_ideas(
+    text: str = Query(..., min_length=3, max_length=5000),
+    limit: int = Query(5, ge=1, le=20),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Похожие уже поданные идеи — проверка перед отправкой"""
+    return await db.run_sync(crud.find_similar_ideas, text, limit)
 
 @app.post("/auth/register")
-def register_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    new_user = crud.create_user(user, db)
+async def register_user(user: schemas.UserCreate, db: AsyncSession = Depends(get_async_db)):
+    new_user = await crud.create_user(user, db)
     return {"id": new_user.user_id, "email": new_user.email}
 
 
 @app.post("/auth/login")
-def login_user(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    access_token = crud.login_user(form_data, db)
+async def login_user(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    access_token = await crud.login_user(form_data, db)
     return {"access_token": access_token, "token_type": "bearer"}
 
 
 @app.get("/auth/me")
-def read_users_me(current_user: models.User = Depends(get_current_user)):
+async def read_users_me(current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    balance = await db.run_sync(crud.get_user_balance, current_user.user_id)
     return {
         "user_id": current_user.user_id, 
         "email": current_user.email, 
         "full_name": current_user.full_name,
-        "points": current_user.points,
-        "coins": current_user.coins
+        "points": balance.points,
+        "coins": balance.coins
     }
 
 # ---------- Работа с идеями ----------
 @app.post("/ideas/create")
-def create_idea(
+async def create_idea(
     idea: schemas.IdeaCreate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Создание новой идеи и автоматическое начисление очков"""
-    new_idea = crud.create_idea(db, idea, current_user.user_id)
-    
-    service = NotificationService(db)
-    service.create_notification(
-        user_id=current_user.user_id,
-        title="Идея создана",
-        message=f"Ваша идея '{idea.title}' успешно добавлена!"
-    )
+    new_idea, similar = await db.run_sync(crud.create_idea, idea, current_user.user_id)
 
     return {
         "message": f"Идея '{new_idea.title}' успешно добавлена!",
         "idea_id": new_idea.idea_id,
-        "author": current_user.full_name
+        "author": current_user.full_name,
+        "similar_ideas": similar
     }
 
 
 # ---------- Просмотр баллов ----------
 @app.get("/users/me/points")
-def get_user_points(current_user: models.User = Depends(get_current_user)):
+async def get_user_points(current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    balance = await db.run_sync(crud.get_user_balance, current_user.user_id)
     return {
         "user_id": current_user.user_id,
         "full_name": current_user.full_name,
-        "points": current_user.points,
-        "coins": current_user.coins
+        "points": balance.points,
+        "coins": balance.coins
     }
 
 @app.get("/points/logs")
 def get_points_logs(
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     logs = crud.get_points_logs(db, current_user)
     return [
@@ -112,80 +165,41 @@ def update_points_rule(action: str, update: schemas.PointsRuleUpdate, db: Sessio
     return rule
 
 @app.post("/ideas/{idea_id}/comment")
-def add_comment(
+async def add_comment(
     idea_id: int,
     comment: schemas.CommentCreate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    new_comment = crud.create_comment(idea_id, comment, db, current_user)
-
-    idea = db.query(models.Idea).filter(models.Idea.idea_id == new_comment.idea_id).first()
-    if idea and idea.author_id != current_user.user_id:
-        notification_service = NotificationService(db)
-        notification_service.create_notification(
-            user_id=idea.author_id,
-            title="Новый комментарий к вашей идее",
-            message=f"Пользователь {current_user.email} оставил комментарий: «{new_comment.text[:80]}...»"
-        )
-
+    new_comment = await db.run_sync(
+        lambda session: crud.create_comment(idea_id, comment, session, current_user)
+    )
     return {"message": "Комментарий добавлен", "comment_id": new_comment.comment_id}
 
 @app.post("/ideas/{idea_id}/vote")
-def vote_idea(
+async def vote_idea(
     idea_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    service = RewardAchievementService(db)
-    
-    idea = db.query(models.Idea).filter(models.Idea.idea_id == idea_id).first()
-    if not idea:
-        raise HTTPException(status_code=404, detail="Идея не найдена")
-
-    # проверка, чтобы не голосовать дважды
-    existing_vote = db.query(models.Vote).filter(
-        models.Vote.idea_id == idea_id,
-        models.Vote.user_id == current_user.user_id
-    ).first()
-    if existing_vote:
-        db.delete(existing_vote)
-        db.commit()
-        return {"message": "Голос удалён"}
-
-    new_vote = models.Vote(idea_id=idea_id, user_id=current_user.user_id, vote_type=1)
-    db.add(new_vote)
-    db.commit()
-    db.refresh(new_vote)
-    
-     # автор идеи получает бонус за голос
-    if idea.author_id != current_user.user_id:
-        service.add_points(idea.author_id, "idea_like")
-    
-    # начисляем награду
-    service.add_points(current_user.user_id, "vote")
-
-    #Уведомление автора о голосе к его идее
-    if idea.author_id != current_user.user_id:
-        notification_service = NotificationService(db)
-        notification_service.create_notification(
-            user_id=idea.author_id,
-            title="Новый лайк вашей идеи",
-            message=f"Пользователь {current_user.email} проголосовал за вашу идею «{idea.title}»"
-        )
+    return await db.run_sync(crud.vote_idea, idea_id, current_user)
 
-    return {"message": "Голос принят", "vote_id": new_vote.vote_id}
+@app.post("/ideas/votes:batch", response_model=schemas.VoteBatchResult)
+async def vote_ideas_batch(
+    batch: schemas.VoteBatch,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Голоса по многим идеям одной транзакцией (экран «листания» идей в мобильном приложении)"""
+    return await db.run_sync(crud.vote_ideas_batch, batch.votes, current_user)
 
 @app.post("/expert/ideas/{idea_id}/status")
 def update_idea_status(
     idea_id: int,
     status_data: schemas.IdeaStatusCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
-    service = RewardAchievementService(db)
-    notification_service = NotificationService(db)
-    
     # проверяем, что идея существует
     idea = db.query(models.Idea).filter(models.Idea.idea_id == idea_id).first()
     if not idea:
@@ -212,32 +226,33 @@ def update_idea_status(
     )
     db.add(new_status)
     idea.status = status_data.status
-    db.commit()
-    # если статус "Реализована" — начисляем награду автору
-    service = RewardAchievementService(db)
 
-    notification_service.create_notification(
-        user_id=idea.author_id,
-        title="Статус вашей идеи изменён",
-        message=f"Ваша идея «{idea.title}» теперь имеет статус: {status_data.status}"
-    )
-
-
-    if status_data.status.lower() in ["реализована", "утверждена"]:
-        service.add_points(idea.author_id, "idea_approved")
+    # уведомление и награда за "Реализована"/"Утверждена" — через outbox-воркер
+    outbox.enqueue(db, "idea_status_changed", {
+        "idea_id": idea_id,
+        "author_id": idea.author_id,
+        "title": idea.title,
+        "status": status_data.status,
+    })
+    invalidate_responses(db, TAG_IDEAS, idea_tag(idea_id))
+    db.commit()
     return {"message": f"Статус идеи обновлён на '{status_data.status}'"}
 
 @app.get("/ideas/{idea_id}/history")
-def get_idea_history(idea_id: int, db: Session = Depends(get_db)):
+def get_idea_history(idea_id: int, request: Request, db: Session = Depends(get_db)):
+    cached = response_cache.lookup(request)
+    if cached is not None:
+        return cached
+    generation = response_cache.generation((idea_tag(idea_id),))
     history = db.query(models.IdeaStatus).filter(
         models.IdeaStatus.idea_id == idea_id
     ).order_by(models.IdeaStatus.created_at.desc()).all()
-    return history    
+    return response_cache.respond(request, history, (idea_tag(idea_id),), generation)
 
 
 
 
 # --- Пример защищённого маршрута ---
 @app.get("/ideas/protected")
-def protected_test(current_user: models.User = Depends(get_current_user)):
+def protected_test(current_user: Principal = Depends(get_current_user)):
     return {"message": f"Привет, {current_user.full_name}! Это защищённый маршрут"}
\ No newline at end of file
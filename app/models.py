@@ -1,17 +1,19 @@
 
 from sqlalchemy import (
-    Column, Integer, String, Text, Boolean, DateTime, ForeignKey, UniqueConstraint, JSON
+    Column, Integer, BigInteger, String, Text, Boolean, DateTime, ForeignKey, UniqueConstraint, JSON, Index, Computed,
+    LargeBinary, Date, CheckConstraint
 )
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func, text
+from sqlalchemy.orm import relationship, deferred
 
 Base = declarative_base()
 SCHEMA = "ideabridge"
 
 class User(Base):
     __tablename__ = "users"
-    __table_args__ = ({'schema': SCHEMA},)
+    __table_args__ = (CheckConstraint('coins >= 0', name='ck_users_coins_non_negative'), {'schema': SCHEMA})
 
     user_id = Column(Integer, primary_key=True)
     full_name = Column(String(150), nullable=False)
@@ -21,6 +23,8 @@ class User(Base):
     points = Column(Integer, nullable=False, default=0)
     coins = Column(Integer, nullable=False, default=0)
     department = Column(String(150))
+    # растёт при смене роли: токены со старой версией перестают приниматься
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     #связи
@@ -32,6 +36,19 @@ class User(Base):
     notifications = relationship("Notification", back_populates="user", cascade="all, delete-orphan")
 
 
+class UserStats(Base):
+    """Счётчики активности пользователя, обновляются в той же транзакции, что и запись-источник"""
+    __tablename__ = "user_stats"
+    __table_args__ = ({'schema': SCHEMA},)
+
+    user_id = Column(Integer, ForeignKey(f"{SCHEMA}.users.user_id", ondelete="CASCADE"), primary_key=True)
+    ideas_count = Column(Integer, nullable=False, default=0, server_default="0")
+    comments_count = Column(Integer, nullable=False, default=0, server_default="0")
+    likes_received = Column(Integer, nullable=False, default=0, server_default="0")
+    votes_cast = Column(Integer, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
 class Category(Base):
     __tablename__ = "categories"
     __table_args__ = ({'schema': SCHEMA},)
@@ -40,7 +57,12 @@ class Category(Base):
 
 class Idea(Base):
     __tablename__ = "ideas"
-    __table_args__ = ({'schema': SCHEMA},)
+    __table_args__ = (
+        # keyset-пагинация ленты: ORDER BY created_at DESC, idea_id DESC
+        Index("ix_ideas_created_at_idea_id", text("created_at DESC"), text("idea_id DESC")),
+        Index("ix_ideas_search_vector", "search_vector", postgresql_using="gin"),
+        {'schema': SCHEMA},
+    )
     idea_id = Column(Integer, primary_key=True)
     title = Column(String(300), nullable=False)
     description = Column(Text, nullable=False)
@@ -48,6 +70,15 @@ class Idea(Base):
     category_id = Column(Integer, ForeignKey(f"{SCHEMA}.categories.category_id"))
     status = Column(String(50), nullable=False, default='new')
     ai_generated = Column(Boolean, nullable=False, default=False)
+    # денормализованные счётчики, меняются атомарно вместе с голосами и комментариями
+    vote_count = Column(Integer, nullable=False, default=0, server_default="0")
+    comment_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # полнотекстовый поиск: заголовок (вес A) важнее описания (вес B); в обычные запросы не грузится
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('russian', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('russian', coalesce(description, '')), 'B')",
+        persisted=True,
+    )))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
@@ -58,6 +89,23 @@ class Idea(Base):
     statuses = relationship("IdeaStatus", back_populates="idea", cascade="all, delete-orphan")
 
 
+class IdeaTeamMember(Base):
+    __tablename__ = "idea_team_members"
+    __table_args__ = ({'schema': SCHEMA},)
+    idea_id = Column(Integer, ForeignKey(f"{SCHEMA}.ideas.idea_id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(Integer, ForeignKey(f"{SCHEMA}.users.user_id", ondelete="CASCADE"), primary_key=True)
+    is_primary = Column(Boolean, nullable=False, default=False, server_default="false")
+
+
+class IdeaSignature(Base):
+    """MinHash-подпись идеи для поиска похожих (uint32 x SIMILARITY_NUM_PERM)"""
+    __tablename__ = "idea_signatures"
+    __table_args__ = ({'schema': SCHEMA},)
+    idea_id = Column(Integer, ForeignKey(f"{SCHEMA}.ideas.idea_id", ondelete="CASCADE"), primary_key=True)
+    params = Column(String(50), nullable=False)
+    signature = Column(LargeBinary, nullable=False)
+
+
 class IdeaStatus(Base):
     __tablename__ = "idea_statuses"
     __table_args__ = ({'schema': SCHEMA},)
@@ -108,7 +156,7 @@ class Vote(Base):
 
 class Reward(Base):
     __tablename__ = "rewards"
-    __table_args__ = ({'schema': SCHEMA},)
+    __table_args__ = (CheckConstraint('stock >= 0', name='ck_rewards_stock_non_negative'), {'schema': SCHEMA})
     reward_id = Column(Integer, primary_key=True)
     name = Column(String(200), nullable=False)
     description = Column(Text)
@@ -119,13 +167,15 @@ class Reward(Base):
 
 class RewardPurchase(Base):
     __tablename__ = "reward_purchases"
-    __table_args__ = ({'schema': SCHEMA},)
+    __table_args__ = (Index('ix_reward_purchases_user_reward', 'user_id', 'reward_id'), {'schema': SCHEMA})
     purchase_id = Column(Integer, primary_key=True)
     reward_id = Column(Integer, ForeignKey(f"{SCHEMA}.rewards.reward_id"), nullable=False)
-    user_id = Column(Integer, ForeignKey(f"{SCHEMA}.users.user_id"), nullable=False)
+    user_id = Column(Integer, ForeignKey(f"{SCHEMA}.users.user_id", ondelete="CASCADE"), nullable=False)
     status = Column(String(30), nullable=False, default='requested')
     cost = Column(Integer, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # транзакция списания; по ней повтор запроса с тем же Idempotency-Key находит покупку
+    transaction_id = Column(Integer, ForeignKey(f"{SCHEMA}.transactions.transaction_id", ondelete="SET NULL"), unique=True)
 
 class Transaction(Base):
     __tablename__ = "transactions"
@@ -136,7 +186,7 @@ class Transaction(Base):
     amount = Column(Integer, nullable=False)
     description = Column(Text)
     related_type = Column(String(50))
-    related_id = Column(Integer)
+    related_id = Column(BigInteger)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 class PointsRule(Base):
@@ -149,6 +199,37 @@ class PointsRule(Base):
     coins_amount = Column(Integer, default=0)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now())
 
+class CacheVersion(Base):
+    """Версии кэшируемых справочников: рост версии сигнализирует всем воркерам о сбросе кэша"""
+    __tablename__ = "cache_versions"
+    __table_args__ = {"schema": "ideabridge"}
+
+    name = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class SystemCounter(Base):
+    """Глобальные счётчики админ-статистики; строки разбиты на шарды, значение = SUM(value) по шардам"""
+    __tablename__ = "system_counters"
+    __table_args__ = {"schema": "ideabridge"}
+
+    name = Column(String(50), primary_key=True)
+    shard = Column(Integer, primary_key=True)
+    value = Column(BigInteger, nullable=False, default=0, server_default="0")
+
+
+class DailyActivity(Base):
+    """Суточный rollup активности (UTC) для графиков админки; шарды как у system_counters"""
+    __tablename__ = "daily_activity"
+    __table_args__ = {"schema": "ideabridge"}
+
+    day = Column(Date, primary_key=True)
+    shard = Column(Integer, primary_key=True)
+    ideas = Column(Integer, nullable=False, default=0, server_default="0")
+    votes = Column(Integer, nullable=False, default=0, server_default="0")
+    comments = Column(Integer, nullable=False, default=0, server_default="0")
+
+
 class PointsLog(Base):
     __tablename__ = "points_log"
     __table_args__ = {"schema": "ideabridge"}
@@ -192,13 +273,56 @@ class UserAchievement(Base):
 
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        # лента уведомлений: keyset по (created_at, notification_id) внутри пользователя
+        Index("ix_notifications_user_created", "user_id", text("created_at DESC"), text("notification_id DESC")),
+        # непрочитанные: счётчик и фильтр unread_only читают только маленький частичный индекс
+        Index(
+            "ix_notifications_user_unread",
+            "user_id", text("created_at DESC"), text("notification_id DESC"),
+            postgresql_where=text("is_read = false"),
+        ),
+        {"schema": "ideabridge"},
+    )
 
     notification_id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, ForeignKey("ideabridge.users.user_id", ondelete="CASCADE"), nullable=False)
     title = Column(String(255), nullable=False)
     message = Column(Text, nullable=False)
-    is_read = Column(Boolean, default=False)
+    is_read = Column(Boolean, nullable=False, default=False, server_default="false")
     created_at = Column(DateTime, server_default=func.now())
 
     user = relationship("User", back_populates="notifications") 
 
+
+class OutboxEvent(Base):
+    """Доменные события, записанные в одной транзакции с основной записью; разбираются воркером"""
+    __tablename__ = "outbox_events"
+    __table_args__ = (
+        Index("ix_outbox_events_pending", "available_at", "event_id", postgresql_where=text("status = 'pending'")),
+        {"schema": "ideabridge"},
+    )
+
+    event_id = Column(BigInteger, primary_key=True)
+    event_type = Column(String(50), nullable=False)
+    payload = Column(JSON, nullable=False)
+    status = Column(String(20), nullable=False, default='pending', server_default='pending')  # pending / done / failed
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    last_error = Column(Text)
+    available_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    processed_at = Column(DateTime(timezone=True))
+
+class NotificationArchive(Base):
+    """Архив прочитанных уведомлений старше NOTIFICATION_RETENTION_DAYS, помесячные партиции по created_at"""
+    __tablename__ = "notifications_archive"
+    __table_args__ = {"schema": "ideabridge", "postgresql_partition_by": "RANGE (created_at)"}
+
+    # ключ партиционирования обязан входить в первичный ключ
+    notification_id = Column(Integer, primary_key=True)
+    created_at = Column(DateTime, primary_key=True)
+    user_id = Column(Integer, ForeignKey("ideabridge.users.user_id", ondelete="CASCADE"), nullable=False, index=True)
+    title = Column(String(255), nullable=False)
+    message = Column(Text, nullable=False)
+    is_read = Column(Boolean, nullable=False, default=True)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,190 @@
+"""
+Диагностика web-процесса: логирование, метрики запросов и учёт SQL.
+
+- Каждый HTTP-запрос попадает в гистограмму ideabridge_http_request_duration_seconds
+  (метка — шаблон маршрута, а не сырой путь).
+- Доля запросов SQL_SAMPLE_RATE сэмплируется: хуки движков SQLAlchemy считают
+  запросы и время в БД, в ответ добавляется заголовок Server-Timing. При
+  SQL_SAMPLE_RATE = 0 хуки не ставятся вовсе.
+- Запросы дольше SLOW_REQUEST_MS пишутся в лог; для сэмплированных — вместе
+  с самыми долгими SQL-запросами.
+"""
+import heapq
+import logging
+import random
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+from fastapi import FastAPI
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+from app.settings import settings
+from app.database import engine, async_engine
+from app.services import metrics
+from app.services.connection_manager import manager as ws_manager
+from app.services.principal_cache import principal_cache
+from app.services.response_cache import response_cache
+
+logger = logging.getLogger("ideabridge.requests")
+
+# длина текста SQL в логе медленных запросов
+LOGGED_STATEMENT_CHARS = 500
+
+
+def setup_logging():
+    logging.basicConfig(
+        level=settings.LOG_LEVEL.upper(),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+
+
+@dataclass
+class RequestStats:
+    statements: int = 0
+    db_time: float = 0.0
+    # самые долгие запросы: min-heap из (секунды, порядковый номер, SQL)
+    slowest: List[Tuple[float, int, str]] = field(default_factory=list)
+
+    def record(self, elapsed: float, statement: str):
+        self.statements += 1
+        self.db_time += elapsed
+        item = (elapsed, self.statements, statement)
+        if len(self.slowest) < settings.SLOW_REQUEST_LOG_STATEMENTS:
+            heapq.heappush(self.slowest, item)
+        elif self.slowest and elapsed > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, item)
+
+
+# статистика текущего запроса; None — запрос не сэмплирован.
+# Синхронные эндпоинты и run_sync выполняются в копии контекста и пишут в тот же объект.
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_request.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_request.get()
+    started = conn.info.get("query_started")
+    if stats is not None and started:
+        stats.record(time.perf_counter() - started.pop(), statement)
+
+
+def _install_sql_hooks():
+    for sync_engine in (engine, async_engine.sync_engine):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _route_template(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def _server_timing(stats: RequestStats, elapsed: float) -> str:
+    return (
+        f'db;dur={stats.db_time * 1000:.1f};desc="{stats.statements} SQL", '
+        f"app;dur={max(elapsed - stats.db_time, 0) * 1000:.1f}"
+    )
+
+
+def _log_slow_request(method: str, path: str, elapsed: float, stats: Optional[RequestStats]):
+    if stats is None:
+        logger.warning("Медленный запрос %s %s: %.0f мс", method, path, elapsed * 1000)
+        return
+    statements = "\n".join(
+        f"  {seconds * 1000:.1f} мс: {' '.join(statement.split())[:LOGGED_STATEMENT_CHARS]}"
+        for seconds, _, statement in sorted(stats.slowest, reverse=True)
+    )
+    logger.warning(
+        "Медленный запрос %s %s: %.0f мс, SQL: %d за %.0f мс; самые долгие:\n%s",
+        method, path, elapsed * 1000, stats.statements, stats.db_time * 1000, statements,
+    )
+
+
+class RequestMetricsMiddleware:
+    """Чистый ASGI-middleware: без BaseHTTPMiddleware и лишней задачи на каждый запрос"""
+
+    def __init__(self, app, sample_rate: float = settings.SQL_SAMPLE_RATE):
+        self.app = app
+        self.sample_rate = sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        stats = RequestStats() if self.sample_rate and random.random() < self.sample_rate else None
+        token = current_request.set(stats)
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if stats is not None:
+                    MutableHeaders(scope=message).append(
+                        "Server-Timing", _server_timing(stats, time.perf_counter() - started)
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_request.reset(token)
+            elapsed = time.perf_counter() - started
+            method, route = scope["method"], _route_template(scope)
+            metrics.HTTP_LATENCY.observe(elapsed, method, route)
+            metrics.HTTP_REQUESTS.inc(method, route, str(status_code))
+            if stats is not None:
+                metrics.DB_STATEMENTS.observe(stats.statements, route)
+                metrics.DB_TIME.observe(stats.db_time, route)
+            if elapsed * 1000 >= settings.SLOW_REQUEST_MS:
+                metrics.SLOW_REQUESTS.inc(method, route)
+                _log_slow_request(method, scope["path"], elapsed, stats)
+
+
+def _pool_connections():
+    for label, pool in (("sync", engine.pool), ("async", async_engine.pool)):
+        yield (label, "checked_out"), pool.checkedout()
+        yield (label, "idle"), pool.checkedin()
+
+
+def _cache_requests():
+    yield ("response", "hit"), response_cache.hits
+    yield ("response", "miss"), response_cache.misses
+    yield ("principal", "hit"), principal_cache.hits
+    yield ("principal", "miss"), principal_cache.misses
+
+
+def _register_process_metrics():
+    metrics.registry.register(metrics.CallbackMetric(
+        "ideabridge_db_pool_connections", "Соединения пулов по состоянию", "gauge",
+        ("pool", "state"), _pool_connections,
+    ))
+    metrics.registry.register(metrics.CallbackMetric(
+        "ideabridge_websocket_connections", "Открытые WebSocket-соединения этого воркера", "gauge",
+        (), lambda: [((), ws_manager.connection_count)],
+    ))
+    metrics.registry.register(metrics.CallbackMetric(
+        "ideabridge_cache_requests_total", "Обращения к in-process кэшам по результату", "counter",
+        ("cache", "result"), _cache_requests,
+    ))
+    metrics.registry.register(metrics.CallbackMetric(
+        "ideabridge_response_cache_not_modified_total", "Ответы 304 по If-None-Match", "counter",
+        (), lambda: [((), response_cache.not_modified)],
+    ))
+
+
+def install(app: FastAPI):
+    """Подключает middleware метрик и, если включено сэмплирование, хуки SQLAlchemy"""
+    if not settings.METRICS_ENABLED:
+        return
+    _register_process_metrics()
+    if settings.SQL_SAMPLE_RATE > 0:
+        _install_sql_hooks()
+    app.add_middleware(RequestMetricsMiddleware)
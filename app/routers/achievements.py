@@ -2,12 +2,13 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from app import models, database, schemas
 from app.auth import get_current_user
+from app.services.principal_cache import Principal
 from typing import List
 
 router = APIRouter(prefix="/achievements", tags=["Achievements"])
 
 @router.get("/my", response_model=List[dict])
-def get_my_achievements(db: Session = Depends(database.get_db), current_user: models.User = Depends(get_current_user)):
+def get_my_achievements(db: Session = Depends(database.get_db), current_user: Principal = Depends(get_current_user)):
     achievements = (
         db.query(models.Achievement, models.UserAchievement.received_at)
         .join(models.UserAchievement)
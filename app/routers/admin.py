@@ -1,59 +1,230 @@
-from fastapi import APIRouter, Depends, HTTPException
+import io
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, update as sa_update
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app import models, schemas
+from app.database import get_db, SessionLocal
+from app import crud, models, schemas
 from app.auth import get_current_user
+from app.services.principal_cache import Principal, invalidate_principal, principal_cache
+from app.services.response_cache import response_cache, invalidate_responses, TAG_IDEAS, idea_tag
+from app.services.system_counters_service import SystemCountersService, stats_snapshot
+from app.services.export_service import TableExporter, MEDIA_TYPES
+from app.services.idea_import import IdeaImporter
+from app.services.reward_shop import RewardShopService
+from app.utils.pagination import encode_id_cursor, decode_id_cursor
+
+# тегов в одном сообщении сброса кэша ответов
+INVALIDATE_TAGS_BATCH = 200
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
-def require_admin(user: models.User):
+def require_admin(user: Principal):
     if user.role != "admin":
         raise HTTPException(status_code=403, detail="Доступ запрещён. Требуется роль администратора.")
 
 # ---------- ПОЛЬЗОВАТЕЛИ ----------
-@router.get("/users")
-def list_users(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+@router.get("/users", response_model=schemas.AdminUserPage)
+def list_users(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Keyset-страница пользователей по user_id; полная выгрузка — /admin/export/users"""
     require_admin(current_user)
-    return db.query(models.User).all()
+    columns = [getattr(models.User, name) for name in schemas.AdminUserOut.model_fields]
+    query = select(*columns).order_by(models.User.user_id).limit(limit + 1)
+    after = decode_id_cursor(cursor)
+    if after is not None:
+        query = query.where(models.User.user_id > after)
+    rows = db.execute(query).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_id_cursor(rows[-1].user_id)
+    return {"items": [dict(row._mapping) for row in rows], "next_cursor": next_cursor}
 
 @router.delete("/users/{user_id}")
-def delete_user(user_id: int, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+def delete_user(user_id: int, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_user)):
     require_admin(current_user)
     user = db.query(models.User).filter(models.User.user_id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="Пользователь не найден")
+    # каскадное удаление уносит идеи, голоса, комментарии и достижения — поправляем счётчики
+    crud.account_user_deletion(db, user_id)
+    idea_ids = db.execute(select(models.Idea.idea_id).where(models.Idea.author_id == user_id)).scalars().all()
     db.delete(user)
+    invalidate_principal(db, user_id)
+    # лента (в ней и счётчики чужих идей) и история удалённых идей; теги пачками —
+    # payload pg_notify ограничен 8000 байт
+    invalidate_responses(db, TAG_IDEAS)
+    for start in range(0, len(idea_ids), INVALIDATE_TAGS_BATCH):
+        invalidate_responses(db, *(idea_tag(idea_id) for idea_id in idea_ids[start:start + INVALIDATE_TAGS_BATCH]))
     db.commit()
     return {"message": "Пользователь удалён"}
 
+@router.put("/users/{user_id}/role")
+def change_user_role(
+    user_id: int,
+    update: schemas.UserRoleUpdate,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    require_admin(current_user)
+    # смена роли отзывает все выданные токены пользователя
+    updated = db.execute(
+        sa_update(models.User)
+        .where(models.User.user_id == user_id)
+        .values(role=update.role, token_version=models.User.token_version + 1)
+    ).rowcount
+    if not updated:
+        raise HTTPException(status_code=404, detail="Пользователь не найден")
+    invalidate_principal(db, user_id)
+    db.commit()
+    return {"message": f"Роль пользователя изменена на {update.role}"}
+
 # ---------- ИДЕИ ----------
-@router.get("/ideas")
-def list_ideas(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+@router.get("/ideas", response_model=schemas.IdeaPage)
+def list_ideas(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Keyset-страница идей (как лента /ideas/); полная выгрузка — /admin/export/ideas"""
     require_admin(current_user)
-    return db.query(models.Idea).all()
+    ideas, next_cursor = crud.list_ideas_page(db, cursor, limit)
+    return {"items": ideas, "next_cursor": next_cursor}
 
 @router.put("/ideas/{idea_id}/status")
 def admin_update_idea_status(
     idea_id: int,
     status: str,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     require_admin(current_user)
     idea = db.query(models.Idea).filter(models.Idea.idea_id == idea_id).first()
     if not idea:
         raise HTTPException(status_code=404, detail="Идея не найдена")
     idea.status = status
+    invalidate_responses(db, TAG_IDEAS, idea_tag(idea_id))
     db.commit()
     return {"message": f"Статус идеи обновлён на {status}"}
 
+@router.post("/ideas/import")
+def import_ideas(
+    file: UploadFile = File(...),
+    fmt: Optional[Literal["csv", "ndjson"]] = Query(None, alias="format"),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Пакетный импорт идей из CSV/NDJSON (COPY пачками); формат по умолчанию — по расширению файла"""
+    require_admin(current_user)
+    if fmt is None:
+        fmt = "ndjson" if (file.filename or "").lower().endswith((".ndjson", ".jsonl")) else "csv"
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    return IdeaImporter(db).run(stream, fmt).as_dict()
+
+# ---------- ВЫГРУЗКА ----------
+@router.get("/export/{kind}")
+def export_table(
+    kind: Literal["users", "ideas"],
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Потоковая выгрузка всей таблицы в NDJSON или CSV с постоянным расходом памяти"""
+    require_admin(current_user)
+    exporter = TableExporter(SessionLocal, kind)
+    return StreamingResponse(
+        exporter.stream(fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{kind}.{fmt}"'},
+    )
+
+# ---------- НАГРАДЫ ----------
+@router.get("/rewards", response_model=List[schemas.RewardOut])
+def list_rewards(db: Session = Depends(get_db), current_user: Principal = Depends(get_current_user)):
+    """Все награды, включая распроданные"""
+    require_admin(current_user)
+    return RewardShopService(db).list_rewards(in_stock_only=False)
+
+@router.post("/rewards", response_model=schemas.RewardOut)
+def create_reward(
+    reward: schemas.RewardCreate,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    require_admin(current_user)
+    new_reward = models.Reward(**reward.model_dump())
+    db.add(new_reward)
+    db.commit()
+    db.refresh(new_reward)
+    return new_reward
+
+@router.post("/rewards/{reward_id}/stock")
+def restock_reward(
+    reward_id: int,
+    restock: schemas.RewardRestock,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Изменение остатка на delta одним условным UPDATE — не конфликтует с идущими покупками"""
+    require_admin(current_user)
+    return {"reward_id": reward_id, "stock": RewardShopService(db).restock(reward_id, restock.delta)}
+
+# ---------- КЭШИ ----------
+@router.get("/cache")
+def get_cache_stats(current_user: Principal = Depends(get_current_user)):
+    """Счётчики in-process кэшей этого воркера"""
+    require_admin(current_user)
+    return {
+        "response_cache": response_cache.stats(),
+        "principal_cache": {"hits": principal_cache.hits, "misses": principal_cache.misses},
+    }
+
 # ---------- СТАТИСТИКА ----------
 @router.get("/stats")
-def get_system_stats(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+def get_system_stats(
+    mode: Literal["counters", "estimate", "exact"] = "counters",
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    counters — поддерживаемые счётчики system_counters (по умолчанию),
+    estimate — оценки pg_class.reltuples, exact — COUNT(*) по таблицам (медленно).
+    Ответ кэшируется на STATS_SNAPSHOT_TTL_SECONDS.
+    """
     require_admin(current_user)
-    return {
-        "users_total": db.query(models.User).count(),
-        "ideas_total": db.query(models.Idea).count(),
-        "comments_total": db.query(models.Comment).count(),
-        "achievements_given": db.query(models.UserAchievement).count()
+    snapshot = stats_snapshot.get(mode)
+    if snapshot is not None:
+        return snapshot
+    counters = SystemCountersService(db)
+    values = {"counters": counters.totals, "estimate": counters.estimates, "exact": counters.exact}[mode]()
+    snapshot = {
+        "users_total": values["users"],
+        "ideas_total": values["ideas"],
+        "comments_total": values["comments"],
+        "votes_total": values["votes"],
+        "achievements_given": values["achievements"],
+        "mode": mode,
     }
+    stats_snapshot.put(mode, snapshot)
+    return snapshot
+
+@router.get("/stats/daily")
+def get_daily_stats(
+    days: int = Query(30, ge=1, le=366),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Идеи, голоса и комментарии по дням (UTC) из rollup-таблицы daily_activity"""
+    require_admin(current_user)
+    cached = stats_snapshot.get(("daily", days))
+    if cached is not None:
+        return cached
+    series = SystemCountersService(db).daily(days)
+    stats_snapshot.put(("daily", days), series)
+    return series
@@ -0,0 +1,30 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from app.database import ping_db
+from app.lifecycle import warm_up_state
+from app.services.pubsub import listener
+
+router = APIRouter(prefix="/health", tags=["Health"])
+
+
+@router.get("/live")
+async def live():
+    """Процесс жив и обслуживает event loop; БД не проверяется"""
+    return {"status": "alive"}
+
+
+@router.get("/ready")
+async def ready():
+    """Готовность принимать трафик: прогрев завершён, БД отвечает, LISTEN-соединение поднято"""
+    checks = {"warm_up": warm_up_state.as_dict(), "listener": listener.is_connected}
+    try:
+        await ping_db()
+        checks["database"] = True
+    except Exception as e:
+        checks["database"] = False
+        checks["database_error"] = repr(e)
+    is_ready = warm_up_state.ready and checks["database"] and checks["listener"]
+    return JSONResponse(
+        status_code=200 if is_ready else 503,
+        content={"status": "ready" if is_ready else "not_ready", "checks": checks},
+    )
@@ -0,0 +1,47 @@
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import crud
+from app.auth import get_current_user
+from app.database import get_async_db
+from app.services.leaderboard import LeaderboardEntry, leaderboard
+from app.services.principal_cache import Principal
+
+router = APIRouter(prefix="/leaderboard", tags=["Leaderboard"])
+
+
+@router.get("")
+async def get_leaderboard(
+    scope: Literal["global", "department"] = "global",
+    limit: int = Query(20, ge=1, le=100),
+    around: Optional[Literal["me"]] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    department = None
+    if scope == "department":
+        if not current_user.department:
+            raise HTTPException(status_code=400, detail="У пользователя не указан отдел")
+        department = current_user.department
+
+    me = leaderboard.get(current_user.user_id)
+    if me is None:
+        # пользователь ещё не попал в рейтинг (новый или без начислений) — добавляем по данным БД;
+        # нет в БД — 404 из get_user_balance
+        balance = await db.run_sync(crud.get_user_balance, current_user.user_id)
+        me = leaderboard.ensure(LeaderboardEntry(
+            current_user.user_id, current_user.full_name, current_user.department, balance.points
+        ))
+
+    # запись могла исчезнуть при сверке с БД — тогда место пустое, очки из взятой записи
+    my_rank = leaderboard.rank(current_user.user_id, department)
+    start = 0
+    if around == "me" and my_rank is not None:
+        start = max(0, my_rank - 1 - limit // 2)
+
+    return {
+        "scope": scope,
+        "total": leaderboard.total(department),
+        "me": {"rank": my_rank, "points": me.points},
+        "items": leaderboard.page(start, limit, department),
+    }
@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+from app.services.metrics import registry, CONTENT_TYPE
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Метрики этого воркера в формате Prometheus"""
+    return Response(registry.render(), media_type=CONTENT_TYPE)
@@ -1,20 +1,53 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.database import get_db
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import schemas
+from app.database import get_async_db
 from app.auth import get_current_user
 from app.services.notifications_service import NotificationService
 
 router = APIRouter(prefix="/notifications", tags=["Notifications"])
 
-@router.get("/")
-def get_my_notifications(db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    service = NotificationService(db)
-    return service.get_user_notifications(current_user.user_id)
+@router.get("/", response_model=schemas.NotificationPage)
+async def get_my_notifications(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    unread_only: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user),
+):
+    items, next_cursor = await db.run_sync(
+        lambda session: NotificationService(session).get_user_notifications(
+            current_user.user_id, cursor, limit, unread_only
+        )
+    )
+    return {"items": items, "next_cursor": next_cursor}
+
+@router.get("/unread_count")
+async def get_unread_count(db: AsyncSession = Depends(get_async_db), current_user=Depends(get_current_user)):
+    count = await db.run_sync(lambda session: NotificationService(session).unread_count(current_user.user_id))
+    return {"unread_count": count}
+
+@router.post("/read")
+async def mark_notifications_as_read(
+    body: schemas.NotificationsRead,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user),
+):
+    if (body.ids is None) == (body.all_before is None):
+        raise HTTPException(status_code=400, detail="Укажите либо ids, либо all_before")
+    updated = await db.run_sync(
+        lambda session: NotificationService(session).mark_many_as_read(
+            current_user.user_id, ids=body.ids, all_before=body.all_before
+        )
+    )
+    return {"message": "Уведомления отмечены как прочитанные", "updated": updated}
 
 @router.post("/{notification_id}/read")
-def mark_notification_as_read(notification_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    service = NotificationService(db)
-    result = service.mark_as_read(notification_id, current_user.user_id)
+async def mark_notification_as_read(notification_id: int, db: AsyncSession = Depends(get_async_db), current_user=Depends(get_current_user)):
+    result = await db.run_sync(
+        lambda session: NotificationService(session).mark_as_read(notification_id, current_user.user_id)
+    )
     if not result:
         raise HTTPException(status_code=404, detail="Уведомление не найдено")
     return {"message": "Уведомление отмечено как прочитанное"}
@@ -0,0 +1,39 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import schemas
+from app.auth import get_current_user
+from app.database import get_async_db
+from app.services.principal_cache import Principal
+from app.services.reward_shop import RewardShopService
+
+router = APIRouter(prefix="/rewards", tags=["Rewards"])
+
+
+@router.get("/", response_model=List[schemas.RewardOut])
+async def list_rewards(db: AsyncSession = Depends(get_async_db)):
+    """Награды в наличии"""
+    return await db.run_sync(lambda session: RewardShopService(session).list_rewards())
+
+
+@router.get("/purchases/my", response_model=List[schemas.RewardPurchaseOut])
+async def my_purchases(db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)):
+    return await db.run_sync(lambda session: RewardShopService(session).user_purchases(current_user.user_id))
+
+
+@router.post("/{reward_id}/purchase", response_model=schemas.RewardPurchaseResult)
+async def purchase_reward(
+    reward_id: int,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", min_length=1, max_length=255),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Покупка за монеты. Повтор запроса с тем же заголовком Idempotency-Key (например, UUID)
+    возвращает уже оформленную покупку (already_purchased=true); без заголовка каждый запрос —
+    новая покупка. 409 — не хватает монет или награда закончилась, 422 — ключ уже использован
+    для другой награды.
+    """
+    return await db.run_sync(
+        lambda session: RewardShopService(session).purchase(current_user.user_id, reward_id, idempotency_key)
+    )
@@ -1,36 +1,42 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends
-from typing import Dict
-from app.auth import get_current_user
-from app import models
-from app.database import get_db
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, WebSocket
+from app.auth import authenticate_websocket
+from app.services.connection_manager import manager
+from app.services.pubsub import listener, CHANNEL_NOTIFICATIONS
 
 router = APIRouter(prefix="/ws", tags=["WebSocket"])
 
-active_connections: Dict[int, WebSocket] = {}
-
 
 @router.websocket("/notifications")
 async def websocket_notifications(
     websocket: WebSocket,
     token: str,
-    db: Session = Depends(get_db)
 ):
-    # Авторизация по токену (передаётся в query params)
-    from app.auth import decode_access_token
-    user_data = decode_access_token(token)
-    if not user_data:
+    """
+    Поток уведомлений. Одно уведомление приходит объектом, пачка — JSON-массивом.
+    Живость проверяется протокольными ping/pong uvicorn; сообщения клиента не нужны и игнорируются.
+    """
+    # Авторизация по токену (передаётся в query params): те же проверки версии и роли, что в HTTP
+    principal = await authenticate_websocket(token)
+    if principal is None:
         await websocket.close(code=1008)
         return
 
-    user_id = user_data.get("user_id")
     await websocket.accept()
-    active_connections[user_id] = websocket
-    print(f"Пользователь {user_id} подключился к уведомлениям")
+    session = manager.connect(websocket, principal.user_id)
 
     try:
         while True:
-            await websocket.receive_text()  # держим соединение открытым
-    except WebSocketDisconnect:
-        print(f"Пользователь {user_id} отключился")
-        del active_connections[user_id]
+            await websocket.receive_text()
+    except Exception:
+        # WebSocketDisconnect, обрыв сети, ошибки протокола — сессию убираем в любом случае
+        pass
+    finally:
+        manager.disconnect(session)
+
+
+async def dispatch_notification(data: dict):
+    """Обработчик канала уведомлений: отправка на локальные сокеты получателя"""
+    manager.send(data.get("user_id"), {"title": data["title"], "message": data["message"], "id": data["id"]})
+
+
+listener.subscribe(CHANNEL_NOTIFICATIONS, dispatch_notification)
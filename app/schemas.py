@@ -1,28 +1,125 @@
 
-from pydantic import BaseModel, Field
-from typing import Any, Optional, List
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import Any, Literal, Optional, List
+from datetime import datetime
 
 class UserCreate(BaseModel):
     full_name: str
     email: str
     password: str= Field(..., min_length=6, max_length=72)
 
+class UserRoleUpdate(BaseModel):
+    role: Literal["user", "expert", "admin"]
+
 class IdeaCreate(BaseModel):
     title: str
     description: str
     category_id: Optional[int] = None
     team_member_ids: Optional[List[int]] = []
 
+class IdeaImportRow(BaseModel):
+    """Строка пакетного импорта (CSV или NDJSON); автор — по author_id или author_email"""
+    title: str = Field(..., min_length=1, max_length=300)
+    description: str = Field(..., min_length=1)
+    author_id: Optional[int] = None
+    author_email: Optional[str] = None
+    category_id: Optional[int] = None
+    status: str = Field("new", min_length=1, max_length=50)
+    created_at: Optional[datetime] = None
+    team_member_ids: List[int] = []
+
+    @field_validator("team_member_ids", mode="before")
+    @classmethod
+    def split_ids(cls, value):
+        # в CSV участники перечисляются через ";"
+        if isinstance(value, str):
+            return [part for part in value.replace(",", ";").split(";") if part.strip()]
+        return value or []
+
+    @model_validator(mode="after")
+    def require_author(self):
+        if self.author_id is None and not self.author_email:
+            raise ValueError("нужен author_id или author_email")
+        return self
+
 class IdeaOut(BaseModel):
     idea_id: int
     title: str
     description: str
     author_id: int
     status: str
+    vote_count: int = 0
+    comment_count: int = 0
+
+    class Config:
+        orm_mode = True
+
+class IdeaPage(BaseModel):
+    items: List[IdeaOut]
+    next_cursor: Optional[str] = None
+
+class AdminUserOut(BaseModel):
+    user_id: int
+    full_name: str
+    email: str
+    role: str
+    department: Optional[str] = None
+    points: int
+    coins: int
+    created_at: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
+
+class AdminUserPage(BaseModel):
+    items: List[AdminUserOut]
+    next_cursor: Optional[str] = None
+
+class NotificationOut(BaseModel):
+    notification_id: int
+    title: str
+    message: str
+    is_read: bool
+    created_at: Optional[datetime] = None
 
     class Config:
         orm_mode = True
 
+class NotificationPage(BaseModel):
+    items: List[NotificationOut]
+    next_cursor: Optional[str] = None
+
+class NotificationsRead(BaseModel):
+    """Либо список id, либо all_before — все уведомления до указанного момента"""
+    ids: Optional[List[int]] = None
+    all_before: Optional[datetime] = None
+
+class IdeaSearchHit(IdeaOut):
+    rank: float
+
+class IdeaSearchPage(BaseModel):
+    items: List[IdeaSearchHit]
+    next_cursor: Optional[str] = None
+
+class SimilarIdea(BaseModel):
+    idea_id: int
+    title: str
+    similarity: float
+
+VOTE_BATCH_MAX_ITEMS = 200
+
+class VoteBatchItem(BaseModel):
+    idea_id: int
+    vote: bool = True  # True — голос стоит, False — снят
+
+class VoteBatch(BaseModel):
+    votes: List[VoteBatchItem] = Field(..., min_length=1, max_length=VOTE_BATCH_MAX_ITEMS)
+
+class VoteBatchResult(BaseModel):
+    added: List[int]
+    removed: List[int]
+    unchanged: List[int]  # голос уже был в нужном состоянии или идеи нет
+
 class CommentCreate(BaseModel):
     idea_id: int
     user_id: int
@@ -35,6 +132,42 @@ class PointsRuleUpdate(BaseModel):
 class VoteCreate(BaseModel):
     idea_id: int
 
+class RewardCreate(BaseModel):
+    name: str = Field(..., min_length=1, max_length=200)
+    description: Optional[str] = None
+    image_url: Optional[str] = None
+    cost: int = Field(..., gt=0)
+    stock: int = Field(0, ge=0)
+
+class RewardOut(BaseModel):
+    reward_id: int
+    name: str
+    description: Optional[str] = None
+    image_url: Optional[str] = None
+    cost: int
+    stock: int
+
+    class Config:
+        orm_mode = True
+
+class RewardRestock(BaseModel):
+    delta: int  # положительное — пополнение, отрицательное — списание остатка
+
+class RewardPurchaseResult(BaseModel):
+    purchase_id: int
+    reward_id: int
+    cost: int
+    coins_left: int
+    already_purchased: bool  # повтор запроса с тем же Idempotency-Key: покупка была оформлена раньше
+
+class RewardPurchaseOut(BaseModel):
+    purchase_id: int
+    reward_id: int
+    name: str
+    status: str
+    cost: int
+    created_at: Optional[datetime] = None
+
 class IdeaStatusCreate(BaseModel):
     idea_id: int
     status: str
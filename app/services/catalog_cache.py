@@ -0,0 +1,123 @@
+import threading
+import time
+from typing import Dict, NamedTuple, Optional
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app import models
+from app.settings import settings
+
+
+class RuleEntry(NamedTuple):
+    action_key: str
+    points_amount: int
+    coins_amount: int
+
+
+class AchievementEntry(NamedTuple):
+    achievement_id: int
+    condition_key: str
+    name: str
+    reward_points: int
+    reward_coins: int
+
+
+class CatalogSnapshot(NamedTuple):
+    version: int
+    rules: Dict[str, RuleEntry]
+    achievements: Dict[str, AchievementEntry]
+
+
+class CatalogCache:
+    """
+    Версионированный in-process кэш правил начисления (points_rules) и каталога достижений.
+
+    Версия хранится в строке cache_versions; каждый воркер сверяет её не чаще, чем раз в
+    CATALOG_CACHE_CHECK_SECONDS, и перечитывает справочники только при изменении версии.
+
+    Запросы к БД идут вне блокировки: проверку берёт на себя один поток, остальные до её
+    конца читают текущий снимок. Правила и достижения лежат в одном неизменяемом снимке,
+    который подменяется целиком, поэтому читатели не видят их из разных версий.
+    """
+
+    NAME = "catalog"
+
+    def __init__(self, check_interval: float):
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._checked_at = 0.0
+        # растёт при clear(): снимок, прочитанный до сброса, не подменяет текущий
+        self._generation = 0
+
+    def rules(self, db: Session) -> Dict[str, RuleEntry]:
+        return self._fresh(db).rules
+
+    def achievements(self, db: Session) -> Dict[str, AchievementEntry]:
+        return self._fresh(db).achievements
+
+    def bump_version(self, db: Session):
+        """Увеличивает версию в транзакции вызывающего кода; после commit вызовите clear()"""
+        table = models.CacheVersion.__table__
+        stmt = insert(table).values(name=self.NAME, version=1)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.name], set_={"version": table.c.version + 1}
+        )
+        db.execute(stmt)
+
+    def clear(self):
+        """Сбрасывает локальную копию — следующее чтение перечитает справочники"""
+        with self._lock:
+            self._snapshot = None
+            self._generation += 1
+
+    def _fresh(self, db: Session) -> CatalogSnapshot:
+        now = time.monotonic()
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and now - self._checked_at < self.check_interval:
+                return snapshot
+            self._checked_at = now
+            generation = self._generation
+        try:
+            version = db.execute(
+                select(models.CacheVersion.version).where(models.CacheVersion.name == self.NAME)
+            ).scalar() or 0
+            if snapshot is None or version != snapshot.version:
+                snapshot = self._load(db, version)
+        except Exception:
+            with self._lock:
+                self._checked_at = float("-inf")
+            raise
+        with self._lock:
+            if generation == self._generation:
+                self._snapshot = snapshot
+        return snapshot
+
+    @staticmethod
+    def _load(db: Session, version: int) -> CatalogSnapshot:
+        rules = db.execute(
+            select(models.PointsRule.action_key, models.PointsRule.points_amount, models.PointsRule.coins_amount)
+        ).all()
+        achievements = db.execute(
+            select(
+                models.Achievement.achievement_id,
+                models.Achievement.condition_key,
+                models.Achievement.name,
+                models.Achievement.reward_points,
+                models.Achievement.reward_coins,
+            )
+        ).all()
+        return CatalogSnapshot(
+            version,
+            {r.action_key: RuleEntry(r.action_key, r.points_amount or 0, r.coins_amount or 0) for r in rules},
+            {
+                a.condition_key: AchievementEntry(
+                    a.achievement_id, a.condition_key, a.name, a.reward_points or 0, a.reward_coins or 0
+                )
+                for a in achievements
+            },
+        )
+
+
+catalog_cache = CatalogCache(settings.CATALOG_CACHE_CHECK_SECONDS)
@@ -0,0 +1,124 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict, deque
+from typing import Dict, Set
+from fastapi import WebSocket
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ClientSession:
+    """Одно WebSocket-соединение пользователя с ограниченной очередью исходящих сообщений"""
+
+    __slots__ = ("websocket", "user_id", "queue", "dropped", "flushing")
+
+    def __init__(self, websocket: WebSocket, user_id: int, queue_size: int):
+        self.websocket = websocket
+        self.user_id = user_id
+        # при переполнении deque сам вытесняет самые старые сообщения
+        self.queue: deque = deque(maxlen=queue_size)
+        self.dropped = 0
+        self.flushing = False
+
+
+class ConnectionManager:
+    """
+    Реестр WebSocket-сессий процесса: несколько вкладок на пользователя, ограниченная
+    очередь на соединение (медленный клиент теряет старые сообщения, а не память сервера),
+    пачка уведомлений за окно WS_BATCH_WINDOW_MS уходит одним кадром.
+
+    Живость соединения проверяет сам uvicorn протокольными ping/pong (--ws-ping-interval,
+    --ws-ping-timeout): на них отвечает любой клиент, включая браузер, без кода приложения.
+    Соединение без pong uvicorn закрывает, receive в эндпоинте падает и сессия снимается.
+
+    Задача отправки создаётся только пока у сессии есть данные, поэтому простаивающее
+    соединение не держит своих задач.
+    """
+
+    def __init__(
+        self,
+        queue_size: int = settings.WS_QUEUE_SIZE,
+        batch_window: float = settings.WS_BATCH_WINDOW_MS / 1000,
+        send_timeout: float = settings.WS_SEND_TIMEOUT,
+    ):
+        self.queue_size = queue_size
+        self.batch_window = batch_window
+        self.send_timeout = send_timeout
+        self._sessions: Dict[int, Set[ClientSession]] = defaultdict(set)
+        # ссылки на задачи отправки: event loop хранит только слабые
+        self._tasks: Set[asyncio.Task] = set()
+
+    @property
+    def connection_count(self) -> int:
+        return sum(len(sessions) for sessions in self._sessions.values())
+
+    def connect(self, websocket: WebSocket, user_id: int) -> ClientSession:
+        session = ClientSession(websocket, user_id, self.queue_size)
+        self._sessions[user_id].add(session)
+        return session
+
+    def disconnect(self, session: ClientSession):
+        sessions = self._sessions.get(session.user_id)
+        if sessions is None:
+            return
+        sessions.discard(session)
+        if not sessions:
+            del self._sessions[session.user_id]
+
+    def send(self, user_id: int, message: dict):
+        """Ставит сообщение в очереди всех сессий пользователя; не блокирует"""
+        for session in self._sessions.get(user_id, ()):
+            self._enqueue(session, message)
+
+    def _enqueue(self, session: ClientSession, message):
+        if len(session.queue) == session.queue.maxlen:
+            session.dropped += 1
+        session.queue.append(message)
+        if not session.flushing:
+            session.flushing = True
+            task = asyncio.create_task(self._flush(session))
+            self._tasks.add(task)
+            task.add_done_callback(self._task_done)
+
+    def _task_done(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Задача отправки WebSocket завершилась ошибкой", exc_info=task.exception())
+
+    async def _flush(self, session: ClientSession):
+        try:
+            # собираем всплеск уведомлений в один кадр
+            await asyncio.sleep(self.batch_window)
+            while session.queue:
+                notifications = list(session.queue)
+                session.queue.clear()
+                frame = notifications[0] if len(notifications) == 1 else notifications
+                await self._send_text(session, json.dumps(frame, ensure_ascii=False))
+        except Exception as e:
+            logger.warning("Ошибка отправки WebSocket пользователю %s: %r", session.user_id, e)
+            await self._close(session)
+        finally:
+            session.flushing = False
+
+    async def _send_text(self, session: ClientSession, text: str):
+        await asyncio.wait_for(session.websocket.send_text(text), timeout=self.send_timeout)
+
+    async def _close(self, session: ClientSession, code: int = 1011):
+        self.disconnect(session)
+        try:
+            await session.websocket.close(code=code)
+        except Exception:
+            pass
+
+    async def stop(self):
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        for sessions in list(self._sessions.values()):
+            for session in list(sessions):
+                await self._close(session, code=1001)
+
+
+manager = ConnectionManager()
@@ -0,0 +1,89 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Callable, Iterator
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app import models
+
+# только нужные колонки: без password_hash и без сборки ORM-объектов
+EXPORT_COLUMNS = {
+    "users": (
+        models.User.user_id, models.User.full_name, models.User.email, models.User.role,
+        models.User.department, models.User.points, models.User.coins, models.User.created_at,
+    ),
+    "ideas": (
+        models.Idea.idea_id, models.Idea.title, models.Idea.description, models.Idea.author_id,
+        models.Idea.category_id, models.Idea.status, models.Idea.vote_count, models.Idea.comment_count,
+        models.Idea.created_at,
+    ),
+}
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} не сериализуется в JSON")
+
+
+class TableExporter:
+    """
+    Потоковая выгрузка таблицы: серверный курсор (stream_results + yield_per), проекция колонок,
+    вывод кусками по batch_size строк — память не зависит от размера таблицы.
+
+    Сессия своя, а не из Depends(get_db): ответ отдаётся уже после выхода из зависимостей.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], kind: str, batch_size: int = 1000):
+        if kind not in EXPORT_COLUMNS:
+            raise ValueError(f"Неизвестная выгрузка: {kind}")
+        self.session_factory = session_factory
+        self.columns = EXPORT_COLUMNS[kind]
+        self.batch_size = batch_size
+
+    @property
+    def field_names(self):
+        return [column.key for column in self.columns]
+
+    def _batches(self) -> Iterator[list]:
+        db = self.session_factory()
+        try:
+            result = db.execute(
+                select(*self.columns)
+                .order_by(self.columns[0])
+                .execution_options(stream_results=True, yield_per=self.batch_size)
+            )
+            for partition in result.partitions():
+                yield partition
+        finally:
+            db.close()
+
+    def ndjson(self) -> Iterator[str]:
+        names = self.field_names
+        for rows in self._batches():
+            yield "".join(
+                json.dumps(dict(zip(names, row)), ensure_ascii=False, default=_json_default) + "\n"
+                for row in rows
+            )
+
+    def csv(self) -> Iterator[str]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(self.field_names)
+        for rows in self._batches():
+            writer.writerows(
+                [value.isoformat() if isinstance(value, (datetime, date)) else value for value in row]
+                for row in rows
+            )
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        # пустая таблица — только заголовок
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    def stream(self, fmt: str) -> Iterator[str]:
+        return self.ndjson() if fmt == "ndjson" else self.csv()
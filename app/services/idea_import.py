@@ -0,0 +1,232 @@
+import csv
+import io
+import json
+import logging
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Tuple
+import psycopg2
+from pydantic import ValidationError
+from sqlalchemy import or_, select, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from app import models, schemas
+from app.settings import settings
+from app.services import outbox_service as outbox
+from app.services.user_stats_service import UserStatsService
+from app.services.system_counters_service import SystemCountersService
+from app.services.similarity import similarity_index, idea_text
+from app.services.response_cache import invalidate_responses, TAG_IDEAS
+
+logger = logging.getLogger(__name__)
+
+# сколько ошибок валидации вернуть в отчёте (остальные только считаются)
+MAX_REPORTED_ERRORS = 100
+
+IDEA_COPY_COLUMNS = ("idea_id", "title", "description", "author_id", "category_id", "status", "ai_generated", "created_at")
+
+
+@dataclass
+class ImportReport:
+    rows_read: int = 0
+    imported: int = 0
+    rejected: int = 0
+    batches: int = 0
+    # строки пачек, откаченных из-за ошибки БД (их можно загрузить повторно)
+    failed: int = 0
+    seconds: float = 0.0
+    errors: List[dict] = field(default_factory=list)
+    failed_batches: List[dict] = field(default_factory=list)
+
+    def reject(self, line: int, reason: str):
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": reason})
+
+    def fail_batch(self, first_line: int, last_line: int, rows: int, reason: str):
+        self.failed += rows
+        if len(self.failed_batches) < MAX_REPORTED_ERRORS:
+            self.failed_batches.append({"first_line": first_line, "last_line": last_line, "rows": rows, "error": reason})
+
+    def as_dict(self) -> dict:
+        return {
+            "rows_read": self.rows_read,
+            "imported": self.imported,
+            "rejected": self.rejected,
+            "batches": self.batches,
+            "failed": self.failed,
+            "seconds": round(self.seconds, 2),
+            "rows_per_sec": round(self.imported / self.seconds) if self.seconds else 0,
+            "errors": self.errors,
+            "failed_batches": self.failed_batches,
+        }
+
+
+def read_rows(stream: Iterable[str], fmt: str) -> Iterator[Tuple[int, dict]]:
+    """Строки файла по одной: (номер строки, сырые поля)"""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            # пустые ячейки CSV — отсутствующие значения
+            yield reader.line_num, {key: value for key, value in row.items() if key and value not in ("", None)}
+    elif fmt == "ndjson":
+        for line_no, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield line_no, json.loads(line)
+            except json.JSONDecodeError as exc:
+                yield line_no, {"__error__": f"некорректный JSON: {exc.msg}"}
+    else:
+        raise ValueError(f"Неизвестный формат: {fmt}")
+
+
+class IdeaImporter:
+    """
+    Пакетный импорт идей. Строки валидируются по мере чтения, пачка из batch_size строк:
+      1. проверка ссылок (авторы, участники, категории) одним запросом на вид;
+      2. резервирование idea_id через nextval и загрузка ideas / idea_team_members через COPY;
+      3. счётчики user_stats / system_counters одним запросом на пачку;
+      4. outbox-событие ideas_imported на автора — очки, достижения и уведомление
+         начисляются воркером один раз за пачку, а не за каждую идею.
+    Каждая пачка — отдельная транзакция; при ошибке БД откатывается только она, строки
+    пачки попадают в отчёт (failed, failed_batches), импорт продолжается со следующей.
+    """
+
+    def __init__(self, db: Session, batch_size: int = settings.IMPORT_BATCH_SIZE):
+        self.db = db
+        self.batch_size = batch_size
+
+    def run(self, stream: Iterable[str], fmt: str) -> ImportReport:
+        report = ImportReport()
+        started = time.perf_counter()
+        batch: List[Tuple[int, schemas.IdeaImportRow]] = []
+        for line_no, raw in read_rows(stream, fmt):
+            report.rows_read += 1
+            if "__error__" in raw:
+                report.reject(line_no, raw["__error__"])
+                continue
+            try:
+                batch.append((line_no, schemas.IdeaImportRow.model_validate(raw)))
+            except ValidationError as exc:
+                report.reject(line_no, "; ".join(
+                    f"{'.'.join(map(str, err['loc'])) or 'row'}: {err['msg']}" for err in exc.errors()
+                ))
+                continue
+            if len(batch) >= self.batch_size:
+                self._load_batch_safely(batch, report)
+                batch = []
+        if batch:
+            self._load_batch_safely(batch, report)
+        report.seconds = time.perf_counter() - started
+        return report
+
+    # ---------- пачка ----------
+    def _load_batch_safely(self, batch, report: ImportReport):
+        """Ошибка БД в пачке не прерывает импорт: пачка откатывается и записывается в отчёт"""
+        rejected = report.rejected
+        try:
+            self._load_batch(batch, report)
+        except (SQLAlchemyError, psycopg2.Error) as exc:
+            # COPY идёт через курсор psycopg2 — его ошибки не обёрнуты SQLAlchemy
+            self.db.rollback()
+            # отказы валидации этой пачки уже посчитаны — в failed только остальные строки
+            rows = len(batch) - (report.rejected - rejected)
+            logger.exception("Импорт идей: пачка строк %d-%d откачена", batch[0][0], batch[-1][0])
+            reason = str(getattr(exc, "orig", None) or exc).strip().splitlines()[0]
+            report.fail_batch(batch[0][0], batch[-1][0], rows, reason)
+
+    def _resolve(self, batch) -> Tuple[Dict[str, int], set, set]:
+        """email -> user_id, существующие user_id и category_id, упомянутые в пачке"""
+        emails = {row.author_email for _, row in batch if row.author_id is None}
+        user_ids = {row.author_id for _, row in batch if row.author_id is not None}
+        user_ids.update(uid for _, row in batch for uid in row.team_member_ids)
+        category_ids = {row.category_id for _, row in batch if row.category_id is not None}
+
+        users = self.db.execute(
+            select(models.User.user_id, models.User.email)
+            .where(or_(models.User.user_id.in_(user_ids), models.User.email.in_(emails)))
+        ).all()
+        by_email = {email: user_id for user_id, email in users}
+        known_users = {user_id for user_id, _ in users}
+        known_categories = set()
+        if category_ids:
+            known_categories = set(self.db.execute(
+                select(models.Category.category_id).where(models.Category.category_id.in_(category_ids))
+            ).scalars())
+        return by_email, known_users, known_categories
+
+    def _load_batch(self, batch, report: ImportReport):
+        by_email, known_users, known_categories = self._resolve(batch)
+        accepted = []
+        now = datetime.now(timezone.utc)
+        for line_no, row in batch:
+            author_id = row.author_id if row.author_id is not None else by_email.get(row.author_email)
+            if author_id is None or author_id not in known_users:
+                report.reject(line_no, "автор не найден")
+                continue
+            if row.category_id is not None and row.category_id not in known_categories:
+                report.reject(line_no, f"категория {row.category_id} не найдена")
+                continue
+            missing = [uid for uid in row.team_member_ids if uid not in known_users]
+            if missing:
+                report.reject(line_no, f"участники не найдены: {missing}")
+                continue
+            created_at = row.created_at or now
+            if created_at.tzinfo is None:
+                # даты без часового пояса считаем UTC
+                created_at = created_at.replace(tzinfo=timezone.utc)
+            accepted.append((author_id, created_at, row))
+        if not accepted:
+            return
+
+        idea_ids = self.db.execute(
+            text("SELECT nextval(pg_get_serial_sequence('ideabridge.ideas', 'idea_id')) "
+                 "FROM generate_series(1, :n)"),
+            {"n": len(accepted)},
+        ).scalars().all()
+        ideas, members = [], []
+        for idea_id, (author_id, created_at, row) in zip(idea_ids, accepted):
+            ideas.append((
+                idea_id, row.title, row.description, author_id, row.category_id, row.status, "false",
+                created_at.isoformat(),
+            ))
+            members.extend((idea_id, uid, "false") for uid in dict.fromkeys(row.team_member_ids))
+        self._copy("ideabridge.ideas", IDEA_COPY_COLUMNS, ideas)
+        self._copy("ideabridge.idea_team_members", ("idea_id", "user_id", "is_primary"), members)
+
+        signatures = similarity_index.hasher.signatures([idea_text(r.title, r.description) for _, _, r in accepted])
+        similarity_index.stage_signatures(self.db, idea_ids, signatures)
+        self._apply_counters(accepted)
+        invalidate_responses(self.db, TAG_IDEAS)
+        self.db.commit()
+        report.imported += len(accepted)
+        report.batches += 1
+
+    def _copy(self, table: str, columns: Tuple[str, ...], rows: List[tuple]):
+        """COPY ... FROM STDIN (CSV) на соединении сессии — в её транзакции"""
+        if not rows:
+            return
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        buffer.seek(0)
+        cursor = self.db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+        finally:
+            cursor.close()
+
+    def _apply_counters(self, accepted):
+        per_author = Counter(author_id for author_id, _, _ in accepted)
+        UserStatsService(self.db).increment_many(
+            {author_id: {"ideas_count": count} for author_id, count in per_author.items()}
+        )
+        counters = SystemCountersService(self.db)
+        counters.increment(ideas=len(accepted))
+        per_day = Counter(created_at.astimezone(timezone.utc).date() for _, created_at, _ in accepted)
+        for day, count in per_day.items():
+            counters.record_activity(day=day, ideas=count)
+        for author_id, count in per_author.items():
+            outbox.enqueue(self.db, "ideas_imported", {"author_id": author_id, "count": count})
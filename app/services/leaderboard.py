@@ -0,0 +1,198 @@
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app import models
+from app.settings import settings
+from app.services.pubsub import listener
+from app.utils.ranked_index import RankedIndex
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_LEADERBOARD = "ideabridge_leaderboard"
+
+
+@dataclass
+class LeaderboardEntry:
+    user_id: int
+    full_name: str
+    department: Optional[str]
+    points: int
+    # time.monotonic() последнего изменения: сверка не перезаписывает записи новее своего снимка
+    updated_at: float = field(default_factory=time.monotonic, compare=False)
+
+    @property
+    def key(self):
+        # больше очков — выше; при равенстве порядок по user_id
+        return (-self.points, self.user_id)
+
+
+class Leaderboard:
+    """
+    In-process рейтинг по User.points: глобальный и по отделам, на RankedIndex.
+    Обновляется сообщениями канала ideabridge_leaderboard (их публикует add_points
+    с абсолютным значением очков), при старте строится из БД, а периодическая
+    сверка с БД исправляет расхождения (потерянные сообщения, удалённые пользователи).
+
+    Сверка сравнивает снимок БД с копией записей вне блокировки и применяет только
+    расхождения, пачками по apply_batch под короткой блокировкой. Запись, обновлённая
+    сообщением после начала снимка, новее снимка и не трогается.
+    """
+
+    def __init__(self, reconcile_interval: float, apply_batch: int = 1000):
+        self.reconcile_interval = reconcile_interval
+        self.apply_batch = apply_batch
+        self._lock = threading.Lock()
+        self._entries: Dict[int, LeaderboardEntry] = {}
+        self._global = RankedIndex()
+        self._departments: Dict[str, RankedIndex] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    # ---------- обновление ----------
+    def update(self, user_id: int, points: int, full_name: str, department: Optional[str]):
+        with self._lock:
+            self._upsert(LeaderboardEntry(user_id, full_name, department, points))
+
+    def ensure(self, entry: LeaderboardEntry) -> LeaderboardEntry:
+        """Добавляет запись, если пользователя ещё нет в рейтинге; возвращает актуальную"""
+        with self._lock:
+            current = self._entries.get(entry.user_id)
+            if current is not None:
+                return current
+            self._upsert(entry)
+            return entry
+
+    def reconcile(self, db: Session) -> int:
+        """Сверяет рейтинг с таблицей users; возвращает число исправленных записей"""
+        started = time.monotonic()
+        rows = db.execute(
+            select(models.User.user_id, models.User.full_name, models.User.department, models.User.points)
+        ).all()
+        # копия словаря атомарна под GIL; сравнение идёт без блокировки
+        entries = dict(self._entries)
+        changes: List[tuple] = []
+        for row in rows:
+            current = entries.pop(row.user_id, None)
+            if current is None or (current.points, current.department, current.full_name) != (
+                row.points, row.department, row.full_name
+            ):
+                changes.append((row.user_id, LeaderboardEntry(
+                    row.user_id, row.full_name, row.department, row.points, updated_at=started
+                )))
+        # оставшихся нет в снимке — удалены из БД (или созданы после него)
+        changes.extend((user_id, None) for user_id in entries)
+
+        fixed = 0
+        for offset in range(0, len(changes), self.apply_batch):
+            with self._lock:
+                for user_id, entry in changes[offset:offset + self.apply_batch]:
+                    current = self._entries.get(user_id)
+                    if current is not None and current.updated_at > started:
+                        continue
+                    if entry is not None:
+                        self._upsert(entry)
+                    elif current is not None:
+                        self._remove(current)
+                    else:
+                        continue
+                    fixed += 1
+        return fixed
+
+    def _upsert(self, entry: LeaderboardEntry):
+        current = self._entries.get(entry.user_id)
+        if current is not None:
+            self._remove(current)
+        self._entries[entry.user_id] = entry
+        self._global.insert(entry.key)
+        if entry.department:
+            self._departments.setdefault(entry.department, RankedIndex(1 << 16)).insert(entry.key)
+
+    def _remove(self, entry: LeaderboardEntry):
+        del self._entries[entry.user_id]
+        self._global.remove(entry.key)
+        if entry.department:
+            index = self._departments[entry.department]
+            index.remove(entry.key)
+            if not len(index):
+                del self._departments[entry.department]
+
+    # ---------- чтение ----------
+    def get(self, user_id: int) -> Optional[LeaderboardEntry]:
+        return self._entries.get(user_id)
+
+    def rank(self, user_id: int, department: Optional[str] = None) -> Optional[int]:
+        """1-based место пользователя за O(log n)"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            index = self._index(department)
+            if entry is None or index is None:
+                return None
+            return index.rank(entry.key) + 1
+
+    def page(self, start: int, limit: int, department: Optional[str] = None) -> List[dict]:
+        """Записи с места start + 1 (0-based start)"""
+        with self._lock:
+            index = self._index(department)
+            if index is None:
+                return []
+            return [
+                {
+                    "rank": start + offset + 1,
+                    "user_id": user_id,
+                    "full_name": self._entries[user_id].full_name,
+                    "department": self._entries[user_id].department,
+                    "points": -neg_points,
+                }
+                for offset, (neg_points, user_id) in enumerate(index.slice(start, start + limit))
+            ]
+
+    def total(self, department: Optional[str] = None) -> int:
+        index = self._index(department)
+        return len(index) if index is not None else 0
+
+    def _index(self, department: Optional[str]) -> Optional[RankedIndex]:
+        return self._global if department is None else self._departments.get(department)
+
+    # ---------- жизненный цикл ----------
+    async def start(self, session_factory: Callable[[], Session]):
+        await asyncio.to_thread(self._reconcile_with, session_factory)
+        if self._task is None:
+            self._task = asyncio.create_task(self._reconcile_loop(session_factory))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _reconcile_loop(self, session_factory: Callable[[], Session]):
+        while True:
+            await asyncio.sleep(self.reconcile_interval)
+            try:
+                fixed = await asyncio.to_thread(self._reconcile_with, session_factory)
+                if fixed:
+                    logger.info("Рейтинг: исправлено расхождений с БД: %d", fixed)
+            except Exception as e:
+                logger.exception("Ошибка сверки рейтинга: %r", e)
+
+    def _reconcile_with(self, session_factory: Callable[[], Session]) -> int:
+        db = session_factory()
+        try:
+            return self.reconcile(db)
+        finally:
+            db.close()
+
+
+async def _on_points_changed(data: dict):
+    leaderboard.update(data["user_id"], data["points"], data["full_name"], data.get("department"))
+
+
+leaderboard = Leaderboard(settings.LEADERBOARD_RECONCILE_SECONDS)
+listener.subscribe(CHANNEL_LEADERBOARD, _on_points_changed)
@@ -0,0 +1,139 @@
+"""
+Метрики процесса в текстовом формате Prometheus (без внешних зависимостей).
+
+Значения хранятся в памяти процесса: при нескольких uvicorn-воркерах каждый отдаёт
+свои метрики, поэтому Prometheus должен опрашивать воркеры по отдельности
+(или по одному воркеру на контейнер).
+"""
+import bisect
+import threading
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+WAIT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+COUNT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+Samples = Iterable[Tuple[Tuple[str, ...], float]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(v)}" for labels, v in values]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [счётчики по корзинам (последняя — +Inf), сумма]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            snapshot = [(labels, list(counts), total) for labels, (counts, total) in self._series.items()]
+        lines = []
+        for labels, counts, total in snapshot:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{float(bound)!r}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {total!r}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class CallbackMetric:
+    """Gauge/counter, значения которого читаются из callback в момент опроса"""
+
+    def __init__(self, name: str, help: str, kind: str, labelnames: Sequence[str], collect: Callable[[], Samples]):
+        self.name, self.help, self.kind, self.labelnames = name, help, kind, tuple(labelnames)
+        self.collect = collect
+
+    def render(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in self.collect()
+        ]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+HTTP_REQUESTS = registry.register(Counter(
+    "ideabridge_http_requests_total", "HTTP-запросы по маршруту и статусу", ("method", "route", "status"),
+))
+HTTP_LATENCY = registry.register(Histogram(
+    "ideabridge_http_request_duration_seconds", "Время обработки HTTP-запроса", ("method", "route"),
+))
+SLOW_REQUESTS = registry.register(Counter(
+    "ideabridge_http_slow_requests_total", "Запросы дольше SLOW_REQUEST_MS", ("method", "route"),
+))
+DB_POOL_CHECKOUT = registry.register(Histogram(
+    "ideabridge_db_pool_checkout_seconds", "Ожидание соединения из пула", ("pool",), buckets=WAIT_BUCKETS,
+))
+DB_STATEMENTS = registry.register(Histogram(
+    "ideabridge_db_statements_per_request", "SQL-запросов на HTTP-запрос (только сэмплированные запросы)",
+    ("route",), buckets=COUNT_BUCKETS,
+))
+DB_TIME = registry.register(Histogram(
+    "ideabridge_db_time_seconds", "Время в БД на HTTP-запрос (только сэмплированные запросы)", ("route",),
+))
@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+from typing import Set
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.settings import settings
+
+
+class NotificationRetention:
+    """
+    Переносит прочитанные уведомления старше retention_days из горячей таблицы notifications
+    в помесячно партиционированную notifications_archive. Работает пачками, каждая пачка —
+    отдельная транзакция (DELETE ... RETURNING -> INSERT), недостающие партиции создаются по ходу.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        retention_days: int = settings.NOTIFICATION_RETENTION_DAYS,
+        batch_size: int = settings.NOTIFICATION_ARCHIVE_BATCH_SIZE,
+    ):
+        self.db = db
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+        self._partitions: Set[datetime] = set()
+
+    def run(self) -> int:
+        cutoff = datetime.utcnow() - timedelta(days=self.retention_days)
+        moved_total = 0
+        while True:
+            moved = self._move_batch(cutoff)
+            self.db.commit()
+            moved_total += moved
+            if moved < self.batch_size:
+                return moved_total
+
+    def _move_batch(self, cutoff: datetime) -> int:
+        rows = self.db.execute(text("""
+            SELECT notification_id, date_trunc('month', created_at) AS month
+            FROM ideabridge.notifications
+            WHERE is_read AND created_at < :cutoff
+            ORDER BY notification_id
+            LIMIT :batch
+            FOR UPDATE SKIP LOCKED
+        """), {"cutoff": cutoff, "batch": self.batch_size}).all()
+        if not rows:
+            return 0
+
+        for month in {row.month for row in rows}:
+            self._ensure_partition(month)
+
+        self.db.execute(text("""
+            WITH moved AS (
+                DELETE FROM ideabridge.notifications
+                WHERE notification_id = ANY(:ids)
+                RETURNING notification_id, user_id, title, message, is_read, created_at
+            )
+            INSERT INTO ideabridge.notifications_archive
+                (notification_id, user_id, title, message, is_read, created_at, archived_at)
+            SELECT notification_id, user_id, title, message, is_read, created_at, now() FROM moved
+        """), {"ids": [row.notification_id for row in rows]})
+        return len(rows)
+
+    def _ensure_partition(self, month: datetime):
+        if month in self._partitions:
+            return
+        next_month = (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+        name = f"notifications_archive_y{month:%Y}m{month:%m}"
+        self.db.execute(text(
+            f"CREATE TABLE IF NOT EXISTS ideabridge.{name} "
+            f"PARTITION OF ideabridge.notifications_archive "
+            f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{next_month:%Y-%m-%d}')"
+        ))
+        self._partitions.add(month)
@@ -1,39 +1,100 @@
 from app import models
+from typing import List, Optional
+from sqlalchemy import func, insert, select, tuple_, update, Text
 from sqlalchemy.orm import Session
-from datetime import datetime
-from app.routers.websocket import active_connections
-import json, asyncio
+from datetime import datetime, timezone
+from app.services.pubsub import CHANNEL_NOTIFICATIONS
+from app.utils.pagination import encode_cursor, decode_cursor
+
+# лимит payload у pg_notify — 8000 байт, длинный текст обрезаем
+PUSH_MESSAGE_LIMIT = 2000
 
 class NotificationService:
-    def __init__(self, db: Session):
+    """
+    Уведомления пишутся в БД и публикуются в канал Postgres (pg_notify) тем же запросом.
+    Доставка в WebSocket происходит после commit в каждом web-воркере (см. app.services.pubsub).
+
+    autocommit=False — режим unit of work: сервис не коммитит, это делает вызывающий код.
+    """
+
+    def __init__(self, db: Session, autocommit: bool = True):
         self.db = db
+        self.autocommit = autocommit
 
-    def create_notification(self, user_id: int, title: str, message: str):
-        notification = models.Notification(
-            user_id=user_id,
-            title=title,
-            message=message,
-            created_at=datetime.utcnow()
+    def create_notification(self, user_id: int, title: str, message: str) -> int:
+        table = models.Notification.__table__
+        inserted = (
+            insert(table)
+            .values(user_id=user_id, title=title, message=message, is_read=False, created_at=datetime.utcnow())
+            .returning(table.c.notification_id, table.c.user_id, table.c.title, table.c.message)
+            .cte("inserted")
         )
-        self.db.add(notification)
-        self.db.commit()
-        self.db.refresh(notification)
-
-        if user_id in active_connections:
-            websocket = active_connections[user_id]
-            
-            data = {"title": title, "message": message, "id": notification.notification_id}
-            try:
-                asyncio.create_task(websocket.send_text(json.dumps(data)))
-            except Exception as e:
-                print(f"Ошибка при отправке WebSocket уведомления: {e}")
-        
-        return notification
-
-    def get_user_notifications(self, user_id: int):
-        return self.db.query(models.Notification).filter(
-            models.Notification.user_id == user_id
-        ).order_by(models.Notification.created_at.desc()).all()
+        push = func.json_build_object(
+            "user_id", inserted.c.user_id,
+            "id", inserted.c.notification_id,
+            "title", inserted.c.title,
+            "message", func.left(inserted.c.message, PUSH_MESSAGE_LIMIT),
+        )
+        notification_id = self.db.execute(
+            select(inserted.c.notification_id, func.pg_notify(CHANNEL_NOTIFICATIONS, push.cast(Text)))
+        ).scalar_one()
+
+        if self.autocommit:
+            self.db.commit()
+        return notification_id
+
+    def get_user_notifications(
+        self, user_id: int, cursor: Optional[str] = None, limit: int = 50, unread_only: bool = False
+    ):
+        """Страница уведомлений (keyset по created_at, notification_id); возвращает (items, next_cursor)"""
+        query = self.db.query(models.Notification).filter(models.Notification.user_id == user_id)
+        if unread_only:
+            query = query.filter(models.Notification.is_read == False)
+        after = decode_cursor(cursor)
+        if after:
+            query = query.filter(
+                tuple_(models.Notification.created_at, models.Notification.notification_id) < after
+            )
+        items = (
+            query.order_by(models.Notification.created_at.desc(), models.Notification.notification_id.desc())
+            .limit(limit + 1)
+            .all()
+        )
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            next_cursor = encode_cursor(items[-1].created_at, items[-1].notification_id)
+        return items, next_cursor
+
+    def unread_count(self, user_id: int) -> int:
+        """Число непрочитанных — index-only scan по частичному индексу ix_notifications_user_unread"""
+        return self.db.execute(
+            select(func.count())
+            .select_from(models.Notification)
+            .where(models.Notification.user_id == user_id, models.Notification.is_read == False)
+        ).scalar_one()
+
+    def mark_many_as_read(
+        self, user_id: int, ids: Optional[List[int]] = None, all_before: Optional[datetime] = None
+    ) -> int:
+        """Одним UPDATE отмечает прочитанными уведомления по списку id или все до all_before"""
+        stmt = (
+            update(models.Notification)
+            .where(models.Notification.user_id == user_id, models.Notification.is_read == False)
+            .values(is_read=True)
+            .execution_options(synchronize_session=False)
+        )
+        if ids is not None:
+            stmt = stmt.where(models.Notification.notification_id.in_(ids))
+        if all_before is not None:
+            # created_at хранится в UTC без часового пояса
+            if all_before.tzinfo is not None:
+                all_before = all_before.astimezone(timezone.utc).replace(tzinfo=None)
+            stmt = stmt.where(models.Notification.created_at < all_before)
+        updated = self.db.execute(stmt).rowcount
+        if self.autocommit:
+            self.db.commit()
+        return updated
 
     def mark_as_read(self, notification_id: int, user_id: int):
         notification = self.db.query(models.Notification).filter(
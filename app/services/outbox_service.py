@@ -0,0 +1,167 @@
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app import models
+from app.settings import settings
+from app.services.reward_achievements_service import RewardAchievementService
+from app.services.notifications_service import NotificationService
+
+APPROVED_STATUSES = ("реализована", "утверждена")
+
+
+def enqueue(db: Session, event_type: str, payload: dict):
+    """Записывает событие в outbox в текущей транзакции; commit делает вызывающий код"""
+    if event_type not in HANDLERS:
+        raise ValueError(f"Неизвестный тип события: {event_type}")
+    db.add(models.OutboxEvent(event_type=event_type, payload=payload))
+
+
+# ---------- Обработчики событий ----------
+# Каждый обработчик работает в транзакции воркера и ничего не коммитит сам.
+
+def _on_idea_created(db: Session, payload: dict):
+    RewardAchievementService(db, autocommit=False).add_points(payload["author_id"], "create_idea")
+    NotificationService(db, autocommit=False).create_notification(
+        user_id=payload["author_id"],
+        title="Идея создана",
+        message=f"Ваша идея '{payload['title']}' успешно добавлена!"
+    )
+
+
+def _on_ideas_imported(db: Session, payload: dict):
+    """Итог пакетного импорта по одному автору: одно начисление, одна проверка достижений, одно уведомление"""
+    count = payload["count"]
+    RewardAchievementService(db, autocommit=False).add_points(payload["author_id"], "create_idea", times=count)
+    NotificationService(db, autocommit=False).create_notification(
+        user_id=payload["author_id"],
+        title="Идеи импортированы",
+        message=f"Импортировано ваших идей: {count}"
+    )
+
+
+def _on_comment_added(db: Session, payload: dict):
+    service = RewardAchievementService(db, autocommit=False)
+    is_foreign = payload["idea_author_id"] != payload["user_id"]
+    # автор идеи получает бонус за комментарии других пользователей
+    if is_foreign:
+        service.add_points(payload["idea_author_id"], "comment_received")
+    service.add_points(payload["user_id"], "comment_add")
+    if is_foreign:
+        NotificationService(db, autocommit=False).create_notification(
+            user_id=payload["idea_author_id"],
+            title="Новый комментарий к вашей идее",
+            message=f"Пользователь {payload['user_email']} оставил комментарий: «{payload['text'][:80]}...»"
+        )
+
+
+def _on_vote_added(db: Session, payload: dict):
+    service = RewardAchievementService(db, autocommit=False)
+    is_foreign = payload["idea_author_id"] != payload["user_id"]
+    # автор идеи получает бонус за голос
+    if is_foreign:
+        service.add_points(payload["idea_author_id"], "idea_like")
+    service.add_points(payload["user_id"], "vote")
+    if is_foreign:
+        NotificationService(db, autocommit=False).create_notification(
+            user_id=payload["idea_author_id"],
+            title="Новый лайк вашей идеи",
+            message=f"Пользователь {payload['user_email']} проголосовал за вашу идею «{payload['title']}»"
+        )
+
+
+def _on_idea_status_changed(db: Session, payload: dict):
+    NotificationService(db, autocommit=False).create_notification(
+        user_id=payload["author_id"],
+        title="Статус вашей идеи изменён",
+        message=f"Ваша идея «{payload['title']}» теперь имеет статус: {payload['status']}"
+    )
+    # если статус "Реализована" — начисляем награду автору
+    if payload["status"].lower() in APPROVED_STATUSES:
+        RewardAchievementService(db, autocommit=False).add_points(payload["author_id"], "idea_approved")
+
+
+def _on_reward_purchased(db: Session, payload: dict):
+    NotificationService(db, autocommit=False).create_notification(
+        user_id=payload["user_id"],
+        title="Заказ награды принят",
+        message=f"{payload['description']} оформлена, ожидайте выдачи"
+    )
+
+
+HANDLERS: Dict[str, Callable[[Session, dict], None]] = {
+    "idea_created": _on_idea_created,
+    "ideas_imported": _on_ideas_imported,
+    "comment_added": _on_comment_added,
+    "vote_added": _on_vote_added,
+    "idea_status_changed": _on_idea_status_changed,
+    "reward_purchased": _on_reward_purchased,
+}
+
+
+class OutboxProcessor:
+    """
+    Разбор outbox пачками. Строки берутся через FOR UPDATE SKIP LOCKED, поэтому
+    несколько воркеров не обработают одно событие дважды; побочные эффекты и отметка
+    о выполнении фиксируются одним commit. Ошибка события откатывает только его
+    savepoint и планирует повтор с экспоненциальной задержкой.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        batch_size: int = settings.OUTBOX_BATCH_SIZE,
+        max_attempts: int = settings.OUTBOX_MAX_ATTEMPTS,
+        retry_base_seconds: float = settings.OUTBOX_RETRY_BASE_SECONDS,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+
+    def drain_once(self) -> int:
+        """Обрабатывает одну пачку, возвращает число взятых событий"""
+        db = self.session_factory()
+        try:
+            events = (
+                db.query(models.OutboxEvent)
+                .filter(
+                    models.OutboxEvent.status == "pending",
+                    models.OutboxEvent.available_at <= func.now(),
+                )
+                .order_by(models.OutboxEvent.available_at, models.OutboxEvent.event_id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+                .all()
+            )
+            for event in events:
+                self._process(db, event)
+            db.commit()
+            return len(events)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _process(self, db: Session, event: models.OutboxEvent):
+        now = datetime.now(timezone.utc)
+        handler = HANDLERS.get(event.event_type)
+        try:
+            if handler is None:
+                raise ValueError(f"Нет обработчика для события {event.event_type}")
+            with db.begin_nested():
+                handler(db, event.payload)
+                db.flush()
+        except Exception as exc:
+            # pg_notify из откатившегося savepoint Postgres тоже отбрасывает
+            event.attempts += 1
+            event.last_error = repr(exc)[:2000]
+            if event.attempts >= self.max_attempts:
+                event.status = "failed"
+            else:
+                delay = self.retry_base_seconds * 2 ** (event.attempts - 1)
+                event.available_at = now + timedelta(seconds=delay)
+            return
+        event.status = "done"
+        event.processed_at = now
@@ -0,0 +1,120 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Tuple
+from fastapi import HTTPException
+from passlib.context import CryptContext
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# дочерние процессы не наследуют через fork потоки, пулы соединений и event loop web-процесса
+_MP_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+# min = max = default: хэши с другой стоимостью помечаются на перехэширование при входе
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+
+# функции верхнего уровня — выполняются в дочерних процессах
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_and_update(password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(password, password_hash)
+
+
+def _unavailable() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Сервис аутентификации перегружен, повторите попытку",
+        headers={"Retry-After": "1"},
+    )
+
+
+class PasswordHasher:
+    """
+    bcrypt в отдельном пуле процессов ограниченного размера, чтобы всплеск входов
+    не занимал общий threadpool и GIL. Если в очереди больше max_pending операций,
+    запрос сразу получает 503 вместо ожидания.
+
+    Пул создаётся в lifespan (start) с forkserver/spawn и там же закрывается (shutdown).
+    Если дочерний процесс умер (BrokenProcessPool), пул пересоздаётся, операция
+    повторяется один раз.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._pending = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(_hash, password)
+
+    async def verify_and_update(self, password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+        """(совпал ли пароль, новый хэш или None, если перехэширование не нужно)"""
+        return await self._submit(_verify_and_update, password, password_hash)
+
+    def start(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context(_MP_START_METHOD)
+            )
+
+    async def _submit(self, fn, *args):
+        if self._pending >= self.max_pending:
+            raise _unavailable()
+        self._pending += 1
+        try:
+            try:
+                return await self._run(fn, *args)
+            except BrokenProcessPool:
+                try:
+                    return await self._run(fn, *args)
+                except BrokenProcessPool:
+                    raise _unavailable()
+        finally:
+            self._pending -= 1
+
+    async def _run(self, fn, *args):
+        # вне lifespan (скрипты, тесты без него) пул создаётся при первом вызове
+        self.start()
+        executor = self._executor
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            self._restart(executor)
+            raise
+
+    def _restart(self, broken: ProcessPoolExecutor):
+        # пул ломается сразу для всех ожидающих операций — пересоздаёт его только первая
+        if self._executor is not broken:
+            return
+        logger.warning("Пул хэширования паролей сломан (умер дочерний процесс), пересоздаём")
+        broken.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+        self.start()
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
@@ -0,0 +1,113 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app import models
+from app.settings import settings
+from app.services.pubsub import listener, publish
+
+CHANNEL_PRINCIPALS = "ideabridge_principals"
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Аутентифицированный пользователь без привязки к сессии БД"""
+    user_id: int
+    email: str
+    full_name: str
+    role: str
+    department: Optional[str]
+    token_version: int
+
+
+class PrincipalCache:
+    """
+    LRU-кэш Principal по user_id с TTL. Сбрасывается явно (invalidate / канал
+    ideabridge_principals из других воркеров); TTL ограничивает устаревание, если сигнал потерян.
+
+    Каждый invalidate увеличивает поколение кэша. load запоминает поколение до чтения БД
+    и кладёт результат, только если за время чтения сбросов не было: иначе загрузка,
+    начатая до invalidate, вернула бы в кэш устаревшую запись.
+    """
+
+    def __init__(self, max_size: int, ttl: float, enabled: bool = True):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._generation = 0
+
+    def get(self, user_id: int) -> Optional[Principal]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[user_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def put(self, principal: Principal, generation: Optional[int] = None):
+        """generation — поколение на момент чтения из БД; если с тех пор был сброс, запись не кладётся"""
+        if not self.enabled:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[principal.user_id] = (time.monotonic() + self.ttl, principal)
+            self._entries.move_to_end(principal.user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(user_id, None)
+
+    def load(self, db: Session, user_id: int) -> Optional[Principal]:
+        """Читает пользователя из БД и кладёт в кэш"""
+        generation = self._generation
+        row = db.execute(
+            select(
+                models.User.user_id, models.User.email, models.User.full_name,
+                models.User.role, models.User.department, models.User.token_version,
+            ).where(models.User.user_id == user_id)
+        ).first()
+        if row is None:
+            self.invalidate(user_id)
+            return None
+        principal = Principal(**row._mapping)
+        self.put(principal, generation)
+        return principal
+
+
+def invalidate_principal(db: Session, user_id: int):
+    """Сброс кэша во всех воркерах после commit текущей транзакции (и сразу — в этом процессе)"""
+    principal_cache.invalidate(user_id)
+    publish(db, CHANNEL_PRINCIPALS, {"user_id": user_id})
+
+
+async def _on_principal_invalidated(data: dict):
+    principal_cache.invalidate(data.get("user_id"))
+
+
+principal_cache = PrincipalCache(
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    enabled=settings.PRINCIPAL_CACHE_ENABLED,
+)
+listener.subscribe(CHANNEL_PRINCIPALS, _on_principal_invalidated)
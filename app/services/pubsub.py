@@ -0,0 +1,113 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.database import LISTEN_DSN
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[dict], Awaitable[None]]
+
+CHANNEL_NOTIFICATIONS = "ideabridge_notifications"
+
+
+def publish(db: Session, channel: str, payload: dict):
+    """
+    pg_notify в текущей транзакции: сообщение уйдёт слушателям только после commit
+    и будет отброшено при rollback (в том числе savepoint).
+    """
+    db.execute(select(func.pg_notify(channel, json.dumps(payload, ensure_ascii=False, default=str))))
+
+
+class PgListener:
+    """
+    Один LISTEN-соединение asyncpg на процесс: принимает сообщения Postgres-каналов
+    и передаёт их подписчикам. При обрыве соединения переподключается.
+    """
+
+    def __init__(self, dsn: str, healthcheck_interval: float = 30.0):
+        self.dsn = dsn
+        self.healthcheck_interval = healthcheck_interval
+        self._handlers: Dict[str, List[Handler]] = defaultdict(list)
+        self._task: Optional[asyncio.Task] = None
+        # ссылки на задачи обработчиков: event loop хранит только слабые
+        self._dispatching: Set[asyncio.Task] = set()
+        self._connected = asyncio.Event()
+
+    def subscribe(self, channel: str, handler: Handler):
+        self._handlers[channel].append(handler)
+
+    @property
+    def is_connected(self) -> bool:
+        return self._connected.is_set()
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for task in list(self._dispatching):
+            task.cancel()
+        await asyncio.gather(*self._dispatching, return_exceptions=True)
+
+    async def _run(self):
+        import asyncpg
+
+        delay = 1.0
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(self.dsn)
+                for channel in self._handlers:
+                    await conn.add_listener(channel, self._on_message)
+                self._connected.set()
+                delay = 1.0
+                # держим соединение и периодически проверяем, что оно живо
+                while not conn.is_closed():
+                    await asyncio.sleep(self.healthcheck_interval)
+                    await conn.execute("SELECT 1")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("LISTEN-соединение потеряно: %r, повтор через %.0f c", e, delay)
+            finally:
+                self._connected.clear()
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+    def _on_message(self, connection, pid, channel: str, payload: str):
+        try:
+            data = json.loads(payload)
+        except ValueError:
+            return
+        for handler in self._handlers.get(channel, ()):
+            task = asyncio.create_task(self._dispatch(handler, data))
+            self._dispatching.add(task)
+            task.add_done_callback(self._dispatch_done)
+
+    def _dispatch_done(self, task: asyncio.Task):
+        self._dispatching.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Задача pub/sub завершилась ошибкой", exc_info=task.exception())
+
+    @staticmethod
+    async def _dispatch(handler: Handler, data: dict):
+        try:
+            await handler(data)
+        except Exception as e:
+            logger.exception("Ошибка обработчика pub/sub: %r", e)
+
+
+listener = PgListener(LISTEN_DSN)
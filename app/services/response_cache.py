@@ -0,0 +1,174 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+from app.settings import settings
+from app.services.pubsub import listener, publish
+
+CHANNEL_RESPONSE_CACHE = "ideabridge_response_cache"
+
+# теги, по которым сбрасываются закэшированные ответы
+TAG_IDEAS = "ideas"
+
+
+def idea_tag(idea_id: int) -> str:
+    return f"idea:{idea_id}"
+
+
+class _Entry:
+    __slots__ = ("body", "etag", "expires_at", "tags")
+
+    def __init__(self, body: bytes, etag: str, expires_at: float, tags: Tuple[str, ...]):
+        self.body = body
+        self.etag = etag
+        self.expires_at = expires_at
+        self.tags = tags
+
+
+class ResponseCache:
+    """
+    LRU-кэш готовых JSON-ответов публичных GET-эндпоинтов с бюджетом в байтах.
+    Ключ — путь и отсортированные query-параметры. Ответы отдаются со strong ETag,
+    If-None-Match на закэшированный ответ даёт 304 без обращения к БД.
+
+    Сброс — по тегам из write-путей (локально и через канал ideabridge_response_cache
+    в других воркерах). Поколения тегов не дают положить в кэш ответ, прочитанный
+    до параллельной инвалидации. TTL ограничивает устаревание счётчиков голосов
+    и комментариев, которые инвалидацию не вызывают.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float, enabled: bool = True):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.not_modified = 0
+        self.size_bytes = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+
+    # ---------- ключи и ETag ----------
+    @staticmethod
+    def key_for(request: Request) -> str:
+        params = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+        return f"{request.url.path}?{params}"
+
+    @staticmethod
+    def make_etag(body: bytes) -> str:
+        return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+    @staticmethod
+    def _etag_matches(request: Request, etag: str) -> bool:
+        header = request.headers.get("if-none-match")
+        if not header:
+            return False
+        candidates = {value.strip() for value in header.split(",")}
+        return "*" in candidates or etag in candidates
+
+    def generation(self, tags: Iterable[str]) -> Tuple[int, ...]:
+        with self._lock:
+            return tuple(self._generations.get(tag, 0) for tag in tags)
+
+    # ---------- чтение / запись ----------
+    def lookup(self, request: Request) -> Optional[Response]:
+        """Готовый ответ (200 или 304) из кэша либо None"""
+        if not self.enabled:
+            return None
+        key = self.key_for(request)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at < time.monotonic():
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            if self._etag_matches(request, entry.etag):
+                self.not_modified += 1
+                return self._not_modified(entry.etag)
+        return self._response(entry.body, entry.etag)
+
+    def respond(
+        self, request: Request, content: Any, tags: Tuple[str, ...], generation: Tuple[int, ...]
+    ) -> Response:
+        """
+        Сериализует ответ, кладёт его в кэш (если теги не сбрасывались с момента generation)
+        и отвечает 304, если клиент уже имеет эту версию.
+        """
+        body = JSONResponse(jsonable_encoder(content)).body
+        etag = self.make_etag(body)
+        if self.enabled and len(body) <= self.max_bytes:
+            key = self.key_for(request)
+            with self._lock:
+                if tuple(self._generations.get(tag, 0) for tag in tags) == generation:
+                    if key in self._entries:
+                        self._drop(key)
+                    self._entries[key] = _Entry(body, etag, time.monotonic() + self.ttl, tags)
+                    self.size_bytes += len(body)
+                    while self.size_bytes > self.max_bytes:
+                        self._drop(next(iter(self._entries)))
+                        self.evictions += 1
+        if self._etag_matches(request, etag):
+            self.not_modified += 1
+            return self._not_modified(etag)
+        return self._response(body, etag)
+
+    def _drop(self, key: str):
+        entry = self._entries.pop(key)
+        self.size_bytes -= len(entry.body)
+
+    @staticmethod
+    def _response(body: bytes, etag: str) -> Response:
+        return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+    @staticmethod
+    def _not_modified(etag: str) -> Response:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    # ---------- инвалидация ----------
+    def invalidate(self, *tags: str):
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+            stale = [key for key, entry in self._entries.items() if any(tag in entry.tags for tag in tags)]
+            for key in stale:
+                self._drop(key)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "size_bytes": self.size_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+                "evictions": self.evictions,
+            }
+
+
+def invalidate_responses(db: Session, *tags: str):
+    """Сброс ответов во всех воркерах после commit текущей транзакции (и сразу — в этом процессе)"""
+    response_cache.invalidate(*tags)
+    publish(db, CHANNEL_RESPONSE_CACHE, {"tags": list(tags)})
+
+
+async def _on_responses_invalidated(data: dict):
+    response_cache.invalidate(*data.get("tags", ()))
+
+
+response_cache = ResponseCache(
+    max_bytes=settings.RESPONSE_CACHE_MAX_BYTES,
+    ttl=settings.RESPONSE_CACHE_TTL_SECONDS,
+    enabled=settings.RESPONSE_CACHE_ENABLED,
+)
+listener.subscribe(CHANNEL_RESPONSE_CACHE, _on_responses_invalidated)
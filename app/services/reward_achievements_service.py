@@ -1,66 +1,71 @@
+import logging
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, func, select, update, Text
 from datetime import datetime
 from app import models
+from app.services.user_stats_service import UserStatsService
+from app.services.system_counters_service import SystemCountersService
+from app.services.catalog_cache import catalog_cache, AchievementEntry
+from app.services.leaderboard import CHANNEL_LEADERBOARD
+
+logger = logging.getLogger(__name__)
 
 
 class RewardAchievementService:
     """
     Универсальная система рейтинга и наград.
     Начисляет очки и монеты, проверяет достижения.
+
+    autocommit=False включает режим unit of work: сервис ничего не коммитит сам,
+    все побочные эффекты действия фиксируются одним commit вызывающего кода.
     """
 
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, autocommit: bool = True):
         self.db = db
+        self.autocommit = autocommit
 
-    def add_points(self, user_id: int, action_key: str):
+    def add_points(self, user_id: int, action_key: str, times: int = 1):
         """
         Начисление очков и монет пользователю по действию из таблицы points_rules.
+        times > 1 — одно начисление за несколько одинаковых действий (пакетный импорт).
         """
-        # Найти правило начисления
-        rule = self.db.query(models.PointsRule).filter_by(action_key=action_key).first()
+        # Найти правило начисления (из кэша справочников)
+        rule = catalog_cache.rules(self.db).get(action_key)
         if not rule:
             return None  # если нет правила, просто ничего не делаем
 
-        user = self.db.query(models.User).filter_by(user_id=user_id).first()
-        if not user:
-            return None
+        points = rule.points_amount * times
+        coins = rule.coins_amount * times
 
-        # Начисление очков и монет
-        user.points += rule.points_amount
-        user.coins += rule.coins_amount
+        # Начисление очков и монет атомарным UPDATE, без read-modify-write
+        if not self._credit(user_id, points, coins):
+            return None
 
         # Запись в лог
         log = models.PointsLog(
             user_id=user_id,
             action=action_key,
-            points=rule.points_amount,
-            coins=rule.coins_amount,
+            points=points,
+            coins=coins,
             # created_at=datetime.utcnow()
         )
         self.db.add(log)
-        self.db.commit()
-        
+
         # Проверяем достижения
         self.check_achievements(user_id)
 
-        
-        return {"points_added": rule.points_amount, "coins_added": rule.coins_amount}
+        self._commit()
+        return {"points_added": points, "coins_added": coins}
 
     def check_achievements(self, user_id: int):
         """
         Проверяет, есть ли новые достижения для пользователя.
         """
-        user = self.db.query(models.User).filter(models.User.user_id == user_id).first()
-        if not user:
-            return
-
-        # Получаем количество идей, комментариев и лайков пользователя
-        ideas_count = self.db.query(models.Idea).filter(models.Idea.author_id == user_id).count()
-        comments_count = self.db.query(models.Comment).filter(models.Comment.user_id == user_id).count()
-        likes_received = self.db.query(models.Vote).join(models.Idea).filter(
-            models.Idea.author_id == user_id, models.Vote.vote_type == True
-        ).count()
+        # Количество идей, комментариев и лайков пользователя — из счётчиков user_stats
+        stats = UserStatsService(self.db).get(user_id)
+        ideas_count = stats["ideas_count"]
+        comments_count = stats["comments_count"]
+        likes_received = stats["likes_received"]
 
         # Список возможных достижений
         rules = {
@@ -70,40 +75,77 @@ class RewardAchievementService:
             "hundred_likes": likes_received >= 100
         }
 
+        catalog = catalog_cache.achievements(self.db)
+        # уже выданные достижения — одним запросом
+        awarded = set(
+            self.db.execute(
+                select(models.UserAchievement.achievement_id)
+                .where(models.UserAchievement.user_id == user_id)
+            ).scalars()
+        )
+
         for key, condition in rules.items():
             if condition:
-                achievement = self.db.query(models.Achievement).filter(models.Achievement.condition_key == key).first()
+                achievement = catalog.get(key)
                 if achievement:
-                    already_awarded = self.db.query(models.UserAchievement).filter_by(
-                        user_id=user_id, achievement_id=achievement.achievement_id
-                    ).first()
-                    if not already_awarded:
-                        self._grant_achievement(user, achievement)
-                        print(f"✅ Достижение {achievement.name} выдано пользователю {user.email}")
+                    if achievement.achievement_id not in awarded:
+                        self._grant_achievement(user_id, achievement)
+                        awarded.add(achievement.achievement_id)
+                        logger.info("Достижение %s выдано пользователю %s", achievement.name, user_id)
 
-        self.db.commit()
+        self._commit()
 
-    def _grant_achievement(self, user: models.User, achievement: models.Achievement):
+    def _grant_achievement(self, user_id: int, achievement: AchievementEntry):
         """
         Выдает достижение пользователю.
         """
         user_ach = models.UserAchievement(
-            user_id=user.user_id,
+            user_id=user_id,
             achievement_id=achievement.achievement_id,
             # awarded_at=datetime.utcnow()
         )
         self.db.add(user_ach)
-        self.db.commit()
+        SystemCountersService(self.db).increment(achievements=1)
         # Можно также дать бонусные монеты/очки
         if achievement.reward_points or achievement.reward_coins:
-            user.points += achievement.reward_points
-            user.coins += achievement.reward_coins
-            self.db.refresh(user)
+            self._credit(user_id, achievement.reward_points, achievement.reward_coins)
 
         # 🔔 уведомление о достижении
         from app.services.notifications_service import NotificationService
-        NotificationService(self.db).create_notification(
-            user_id=user.user_id,
+        NotificationService(self.db, autocommit=self.autocommit).create_notification(
+            user_id=user_id,
             title="Новое достижение!",
             message=f"Поздравляем! Вы получили достижение «{achievement.name}» 🎉"
         )
+        self._commit()
+
+    def _credit(self, user_id: int, points: int, coins: int) -> bool:
+        """
+        UPDATE users SET points = points + :p, coins = coins + :c; False, если пользователя нет.
+        Если очки изменились, тем же запросом публикуется новое значение для рейтинга
+        (pg_notify уйдёт слушателям после commit).
+        """
+        credit = (
+            update(models.User)
+            .where(models.User.user_id == user_id)
+            .values(points=models.User.points + points, coins=models.User.coins + coins)
+            .returning(models.User.user_id, models.User.points, models.User.full_name, models.User.department)
+        )
+        if not points:
+            return self.db.execute(credit.execution_options(synchronize_session=False)).first() is not None
+
+        credited = credit.cte("credited")
+        message = func.json_build_object(
+            "user_id", credited.c.user_id,
+            "points", credited.c.points,
+            "full_name", credited.c.full_name,
+            "department", credited.c.department,
+        )
+        row = self.db.execute(
+            select(credited.c.user_id, func.pg_notify(CHANNEL_LEADERBOARD, message.cast(Text)))
+        ).first()
+        return row is not None
+
+    def _commit(self):
+        if self.autocommit:
+            self.db.commit()
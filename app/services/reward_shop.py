@@ -0,0 +1,202 @@
+import hashlib
+from typing import List, Optional
+from fastapi import HTTPException
+from sqlalchemy import BigInteger, func, literal, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app import models
+from app.services import outbox_service as outbox
+
+PURCHASE_TYPE = "purchase"
+PURCHASE_RELATED_TYPE = "reward_purchase"
+
+
+def idempotency_id(key: str) -> int:
+    """Ключ идемпотентности клиента -> related_id транзакции (знаковые 64 бита blake2b)"""
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big", signed=True)
+
+
+class RewardShopService:
+    """
+    Магазин наград под высокой конкуренцией. Покупка — одна транзакция без SELECT-then-UPDATE:
+      1. INSERT transactions ... ON CONFLICT (uq_transactions_event) DO NOTHING — идемпотентность
+         по ключу клиента (заголовок Idempotency-Key, его хэш — related_id): повтор запроса с тем же
+         ключом возвращает уже оформленную покупку. Без ключа каждый запрос — новая покупка;
+      2. UPDATE users SET coins = coins - cost WHERE coins >= cost — списание без ухода в минус;
+      3. UPDATE rewards SET stock = stock - 1 WHERE stock > 0 + INSERT reward_purchases одним запросом;
+         покупка ссылается на транзакцию, награда хранится в строке покупки, а не в ключе.
+    Строка награды — общая точка конкуренции, поэтому она блокируется последней и держится
+    только до commit. Любой неуспешный шаг откатывает всю транзакцию; перепродажа невозможна,
+    CHECK (stock >= 0) и CHECK (coins >= 0) страхуют на уровне схемы.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def list_rewards(self, in_stock_only: bool = True) -> List[models.Reward]:
+        query = select(models.Reward).order_by(models.Reward.cost, models.Reward.reward_id)
+        if in_stock_only:
+            query = query.where(models.Reward.stock > 0)
+        return list(self.db.execute(query).scalars())
+
+    def user_purchases(self, user_id: int) -> List[dict]:
+        rows = self.db.execute(
+            select(
+                models.RewardPurchase.purchase_id, models.RewardPurchase.reward_id, models.Reward.name,
+                models.RewardPurchase.status, models.RewardPurchase.cost, models.RewardPurchase.created_at,
+            )
+            .join(models.Reward, models.Reward.reward_id == models.RewardPurchase.reward_id)
+            .where(models.RewardPurchase.user_id == user_id)
+            .order_by(models.RewardPurchase.created_at.desc(), models.RewardPurchase.purchase_id.desc())
+        ).all()
+        return [dict(row._mapping) for row in rows]
+
+    def purchase(self, user_id: int, reward_id: int, idempotency_key: Optional[str] = None) -> dict:
+        related_id = idempotency_id(idempotency_key) if idempotency_key else None
+        try:
+            transaction = self._record_transaction(user_id, reward_id, idempotency_key, related_id)
+            if transaction is None:
+                self.db.rollback()
+                return self._existing_purchase(user_id, reward_id, related_id)
+            cost = -transaction.amount
+
+            coins_left = self._debit(user_id, cost)
+            if coins_left is None:
+                raise HTTPException(status_code=409, detail="Недостаточно монет")
+
+            # уведомление пользователю — через outbox, до блокировки строки награды
+            outbox.enqueue(self.db, "reward_purchased", {
+                "user_id": user_id,
+                "reward_id": reward_id,
+                "transaction_id": transaction.transaction_id,
+                "description": transaction.description,
+            })
+            self.db.flush()
+
+            reserved = self._reserve(user_id, reward_id, cost, transaction.transaction_id)
+            if reserved is None:
+                raise HTTPException(status_code=409, detail="Награда закончилась")
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return {
+            "purchase_id": reserved.purchase_id,
+            "reward_id": reward_id,
+            "cost": cost,
+            "coins_left": coins_left,
+            "already_purchased": False,
+        }
+
+    # ---------- шаги покупки ----------
+    def _record_transaction(self, user_id: int, reward_id: int, idempotency_key: Optional[str], related_id: Optional[int]):
+        """
+        Запись о списании с ценой из rewards; None — награды нет, она распродана
+        (проверка без блокировки) или покупка с этим ключом уже оформлена.
+        Без ключа related_id = NULL: строки не конфликтуют по uq_transactions_event.
+        """
+        key_note = f", ключ {idempotency_key}" if idempotency_key else ""
+        rewards = models.Reward.__table__
+        transactions = models.Transaction.__table__
+        stmt = (
+            insert(transactions)
+            .from_select(
+                ["user_id", "type", "amount", "description", "related_type", "related_id"],
+                select(
+                    literal(user_id), literal(PURCHASE_TYPE), -rewards.c.cost,
+                    func.concat("Покупка награды «", rewards.c.name, "»", key_note),
+                    literal(PURCHASE_RELATED_TYPE), literal(related_id, BigInteger),
+                ).where(rewards.c.reward_id == reward_id, rewards.c.stock > 0),
+            )
+            .on_conflict_do_nothing(constraint="uq_transactions_event")
+            .returning(transactions.c.transaction_id, transactions.c.amount, transactions.c.description)
+        )
+        return self.db.execute(stmt).first()
+
+    def _debit(self, user_id: int, cost: int) -> Optional[int]:
+        """Условное списание; None — монет не хватает"""
+        return self.db.execute(
+            update(models.User)
+            .where(models.User.user_id == user_id, models.User.coins >= cost)
+            .values(coins=models.User.coins - cost)
+            .returning(models.User.coins)
+            .execution_options(synchronize_session=False)
+        ).scalar()
+
+    def _reserve(self, user_id: int, reward_id: int, cost: int, transaction_id: int):
+        """Декремент остатка и строка покупки одним запросом; None — остаток исчерпан"""
+        rewards = models.Reward.__table__
+        purchases = models.RewardPurchase.__table__
+        reserved = (
+            update(rewards)
+            .where(rewards.c.reward_id == reward_id, rewards.c.stock > 0)
+            .values(stock=rewards.c.stock - 1)
+            .returning(rewards.c.reward_id)
+            .cte("reserved")
+        )
+        stmt = (
+            insert(purchases)
+            .from_select(
+                ["reward_id", "user_id", "status", "cost", "transaction_id"],
+                select(
+                    reserved.c.reward_id, literal(user_id), literal("requested"), literal(cost), literal(transaction_id),
+                ),
+            )
+            .add_cte(reserved)
+            .returning(purchases.c.purchase_id)
+        )
+        return self.db.execute(stmt).first()
+
+    def _existing_purchase(self, user_id: int, reward_id: int, related_id: Optional[int]) -> dict:
+        """Разбор случая, когда транзакция не записана: повтор по ключу, распродано или нет награды"""
+        purchase = None
+        if related_id is not None:
+            purchase = self.db.execute(
+                select(models.RewardPurchase.purchase_id, models.RewardPurchase.reward_id, models.RewardPurchase.cost)
+                .join(models.Transaction, models.Transaction.transaction_id == models.RewardPurchase.transaction_id)
+                .where(
+                    models.Transaction.user_id == user_id,
+                    models.Transaction.type == PURCHASE_TYPE,
+                    models.Transaction.related_type == PURCHASE_RELATED_TYPE,
+                    models.Transaction.related_id == related_id,
+                )
+            ).first()
+        if purchase is not None:
+            if purchase.reward_id != reward_id:
+                raise HTTPException(status_code=422, detail="Ключ идемпотентности уже использован для другой награды")
+            coins = self.db.execute(
+                select(models.User.coins).where(models.User.user_id == user_id)
+            ).scalar_one()
+            return {
+                "purchase_id": purchase.purchase_id,
+                "reward_id": reward_id,
+                "cost": purchase.cost,
+                "coins_left": coins,
+                "already_purchased": True,
+            }
+        stock = self.db.execute(
+            select(models.Reward.stock).where(models.Reward.reward_id == reward_id)
+        ).scalar()
+        if stock is None:
+            raise HTTPException(status_code=404, detail="Награда не найдена")
+        raise HTTPException(status_code=409, detail="Награда закончилась")
+
+    # ---------- администрирование ----------
+    def restock(self, reward_id: int, delta: int) -> int:
+        """Атомарное изменение остатка; не уводит stock ниже нуля"""
+        stock = self.db.execute(
+            update(models.Reward)
+            .where(models.Reward.reward_id == reward_id, models.Reward.stock + delta >= 0)
+            .values(stock=models.Reward.stock + delta)
+            .returning(models.Reward.stock)
+            .execution_options(synchronize_session=False)
+        ).scalar()
+        if stock is None:
+            exists = self.db.execute(
+                select(models.Reward.reward_id).where(models.Reward.reward_id == reward_id)
+            ).first()
+            if exists is None:
+                raise HTTPException(status_code=404, detail="Награда не найдена")
+            raise HTTPException(status_code=409, detail="Остаток не может стать отрицательным")
+        self.db.commit()
+        return stock
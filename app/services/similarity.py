@@ -0,0 +1,255 @@
+import asyncio
+import base64
+import logging
+import re
+import threading
+import zlib
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app import models
+from app.settings import settings
+from app.services.pubsub import listener, publish
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_SIMILARITY = "ideabridge_similarity"
+
+_PRIME = np.uint64(4294967311)  # простое > 2^32
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class MinHasher:
+    """
+    MinHash-подписи по символьным k-шинглам нормализованного текста.
+    h_i(x) = (a_i * x + b_i) mod p, a_i, b_i < 2^32 — произведение помещается в uint64.
+    """
+
+    def __init__(self, num_perm: int, shingle_size: int, seed: int):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.seed = seed
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 2 ** 32 - 1, size=num_perm, dtype=np.uint64)[:, None]
+        self._b = rng.randint(0, 2 ** 32 - 1, size=num_perm, dtype=np.uint64)[:, None]
+
+    @property
+    def params(self) -> str:
+        """Параметры, с которыми посчитаны сохранённые подписи; при смене — пересчёт"""
+        return f"minhash-p{self.num_perm}-k{self.shingle_size}-s{self.seed}"
+
+    def shingles(self, text: str) -> np.ndarray:
+        normalized = " ".join(_TOKEN_RE.findall(text.lower()))
+        k = self.shingle_size
+        if len(normalized) <= k:
+            grams = {normalized}
+        else:
+            grams = {normalized[i:i + k] for i in range(len(normalized) - k + 1)}
+        return np.fromiter((zlib.crc32(g.encode()) for g in grams), dtype=np.uint64, count=len(grams))
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = self.shingles(text)
+        return ((self._a * hashes + self._b) % _PRIME).min(axis=1).astype(np.uint32)
+
+    def signatures(self, texts: Sequence[str], chunk: int = 1000) -> np.ndarray:
+        """Подписи пачкой: все шинглы пачки хэшируются одной матричной операцией, минимумы — reduceat"""
+        result = np.empty((len(texts), self.num_perm), dtype=np.uint32)
+        for start in range(0, len(texts), chunk):
+            shingle_sets = [self.shingles(t) for t in texts[start:start + chunk]]
+            offsets = np.cumsum([0] + [len(s) for s in shingle_sets[:-1]])
+            hashed = (self._a * np.concatenate(shingle_sets) + self._b) % _PRIME
+            result[start:start + len(shingle_sets)] = np.minimum.reduceat(hashed, offsets, axis=1).T
+        return result
+
+
+class SimilarityIndex:
+    """
+    LSH-индекс по MinHash-подписям идей: подпись режется на bands полос, идеи с совпавшей
+    полосой становятся кандидатами, их сходство оценивается по доле совпавших позиций подписи.
+    Подписи хранятся в idea_signatures, поэтому перезапуск не требует пересчёта.
+    """
+
+    def __init__(self, hasher: MinHasher, bands: int, threshold: float):
+        if hasher.num_perm % bands:
+            raise ValueError("num_perm должно делиться на число полос")
+        self.hasher = hasher
+        self.bands = bands
+        self.rows = hasher.num_perm // bands
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._signatures: Dict[int, np.ndarray] = {}
+        self._session_factory: Optional[Callable[[], Session]] = None
+        self._buckets: List[Dict[int, Set[int]]] = [defaultdict(set) for _ in range(bands)]
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def _band_keys(self, signature: np.ndarray) -> Iterable[int]:
+        for band in range(self.bands):
+            yield hash(signature[band * self.rows:(band + 1) * self.rows].tobytes())
+
+    def add(self, idea_id: int, signature: np.ndarray):
+        with self._lock:
+            if idea_id in self._signatures:
+                return
+            self._signatures[idea_id] = signature
+            for band, key in enumerate(self._band_keys(signature)):
+                self._buckets[band][key].add(idea_id)
+
+    def query(self, signature: np.ndarray, limit: int = 5) -> List[Tuple[int, float]]:
+        """[(idea_id, оценка сходства Жаккара)] не ниже threshold, по убыванию"""
+        with self._lock:
+            candidates: Set[int] = set()
+            for band, key in enumerate(self._band_keys(signature)):
+                candidates.update(self._buckets[band].get(key, ()))
+            if not candidates:
+                return []
+            ids = list(candidates)
+            matrix = np.stack([self._signatures[i] for i in ids])
+        similarity = (matrix == signature).mean(axis=1)
+        hits = [(idea_id, float(score)) for idea_id, score in zip(ids, similarity) if score >= self.threshold]
+        hits.sort(key=lambda hit: hit[1], reverse=True)
+        return hits[:limit]
+
+    # ---------- БД ----------
+    def stage_signature(self, db: Session, idea_id: int, signature: np.ndarray):
+        """Сохраняет подпись новой идеи в транзакции вызывающего кода и оповещает воркеры"""
+        db.execute(
+            insert(models.IdeaSignature.__table__)
+            .values(idea_id=idea_id, params=self.hasher.params, signature=signature.tobytes())
+            .on_conflict_do_nothing()
+        )
+        publish(db, CHANNEL_SIMILARITY, {
+            "idea_id": idea_id, "signature": base64.b64encode(signature.tobytes()).decode()
+        })
+
+    def stage_signatures(self, db: Session, idea_ids: Sequence[int], signatures: np.ndarray):
+        """
+        Подписи пачки импортированных идей (id идут подряд). Воркерам уходит одно сообщение
+        с диапазоном id, подписи они дочитывают из idea_signatures.
+        """
+        if not len(idea_ids):
+            return
+        params = self.hasher.params
+        db.execute(
+            insert(models.IdeaSignature.__table__).on_conflict_do_nothing(),
+            [
+                {"idea_id": idea_id, "params": params, "signature": signature.tobytes()}
+                for idea_id, signature in zip(idea_ids, signatures)
+            ],
+        )
+        publish(db, CHANNEL_SIMILARITY, {"range": [min(idea_ids), max(idea_ids)]})
+
+    def load_range(self, db: Session, first_id: int, last_id: int):
+        rows = db.execute(
+            select(models.IdeaSignature.idea_id, models.IdeaSignature.signature)
+            .where(
+                models.IdeaSignature.idea_id.between(first_id, last_id),
+                models.IdeaSignature.params == self.hasher.params,
+            )
+        )
+        for idea_id, raw in rows:
+            self.add(idea_id, np.frombuffer(raw, dtype=np.uint32))
+
+    def load(self, db: Session, batch_size: int = 5000) -> int:
+        """
+        Загружает сохранённые подписи потоком (yield_per); возвращает их число. Только чтение:
+        недостающие подписи досчитывает однократно backfill (python -m app.cli backfill-similarity).
+        """
+        rows = db.execute(
+            select(models.IdeaSignature.idea_id, models.IdeaSignature.signature)
+            .where(models.IdeaSignature.params == self.hasher.params)
+            .execution_options(yield_per=batch_size)
+        )
+        loaded = 0
+        for idea_id, raw in rows:
+            self.add(idea_id, np.frombuffer(raw, dtype=np.uint32))
+            loaded += 1
+        return loaded
+
+    def backfill(self, session_factory: Callable[[], Session], batch_size: int = 5000) -> int:
+        """
+        Досчитывает подписи идей без подписи или с устаревшими параметрами. Идеи читаются
+        потоком (yield_per) отдельной сессией; каждая пачка записывается и коммитится своей
+        транзакцией, работающие воркеры дочитывают её по сообщению с диапазоном id.
+        Прерванный backfill можно просто запустить снова.
+        """
+        params = self.hasher.params
+        table = models.IdeaSignature.__table__
+        reader, writer = session_factory(), session_factory()
+        try:
+            rows = reader.execute(
+                select(models.Idea.idea_id, models.Idea.title, models.Idea.description)
+                .outerjoin(
+                    models.IdeaSignature,
+                    (models.IdeaSignature.idea_id == models.Idea.idea_id) & (models.IdeaSignature.params == params),
+                )
+                .where(models.IdeaSignature.idea_id.is_(None))
+                .order_by(models.Idea.idea_id)
+                .execution_options(yield_per=batch_size)
+            )
+            computed = 0
+            for chunk in rows.partitions():
+                signatures = self.hasher.signatures([idea_text(r.title, r.description) for r in chunk])
+                stmt = insert(table).values([
+                    {"idea_id": r.idea_id, "params": params, "signature": sig.tobytes()}
+                    for r, sig in zip(chunk, signatures)
+                ])
+                writer.execute(stmt.on_conflict_do_update(
+                    index_elements=[table.c.idea_id],
+                    set_={"params": stmt.excluded.params, "signature": stmt.excluded.signature},
+                ))
+                publish(writer, CHANNEL_SIMILARITY, {"range": [chunk[0].idea_id, chunk[-1].idea_id]})
+                writer.commit()
+                computed += len(chunk)
+            return computed
+        finally:
+            reader.close()
+            writer.close()
+
+    async def start(self, session_factory: Callable[[], Session]):
+        self._session_factory = session_factory
+
+        def _load():
+            db = session_factory()
+            try:
+                logger.info("Индекс похожих идей: загружено подписей: %d", self.load(db))
+            finally:
+                db.close()
+
+        await asyncio.to_thread(_load)
+
+
+def idea_text(title: str, description: str) -> str:
+    return f"{title} {description}"
+
+
+async def _on_signature(data: dict):
+    if "range" not in data:
+        similarity_index.add(data["idea_id"], np.frombuffer(base64.b64decode(data["signature"]), dtype=np.uint32))
+        return
+    factory = similarity_index._session_factory
+    if factory is None:
+        return
+
+    def _load_range():
+        db = factory()
+        try:
+            similarity_index.load_range(db, *data["range"])
+        finally:
+            db.close()
+
+    await asyncio.to_thread(_load_range)
+
+
+similarity_index = SimilarityIndex(
+    MinHasher(settings.SIMILARITY_NUM_PERM, settings.SIMILARITY_SHINGLE_SIZE, settings.SIMILARITY_SEED),
+    bands=settings.SIMILARITY_BANDS,
+    threshold=settings.SIMILARITY_THRESHOLD,
+)
+listener.subscribe(CHANNEL_SIMILARITY, _on_signature)
@@ -0,0 +1,193 @@
+import random
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from sqlalchemy import Date, cast, func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app import models
+from app.settings import settings
+
+# счётчик -> исходная таблица (для точного пересчёта и оценки по pg_class)
+COUNTER_TABLES = {
+    "users": "users",
+    "ideas": "ideas",
+    "comments": "comments",
+    "votes": "votes",
+    "achievements": "user_achievements",
+}
+ACTIVITY_COLUMNS = ("ideas", "votes", "comments")
+
+
+def _utc_today():
+    return cast(func.timezone("UTC", func.now()), Date)
+
+
+class SystemCountersService:
+    """
+    Глобальные счётчики (system_counters) и суточный rollup (daily_activity) для админ-статистики.
+    Обновляются в транзакции write-пути; чтобы параллельные транзакции не ждали блокировку
+    одной строки, каждое изменение попадает в случайный из SYSTEM_COUNTER_SHARDS шардов.
+    Не коммитит сам, кроме reconcile — его вызывает CLI.
+    """
+
+    def __init__(self, db: Session, shards: int = settings.SYSTEM_COUNTER_SHARDS):
+        self.db = db
+        self.shards = shards
+
+    def increment(self, **deltas: int):
+        """Пример: increment(ideas=1, comments=-3)"""
+        unknown = set(deltas) - set(COUNTER_TABLES)
+        if unknown:
+            raise ValueError(f"Неизвестные счётчики: {', '.join(sorted(unknown))}")
+        rows = [
+            {"name": name, "shard": random.randrange(self.shards), "value": delta}
+            for name, delta in deltas.items() if delta
+        ]
+        if not rows:
+            return
+        table = models.SystemCounter.__table__
+        stmt = insert(table).values(rows)
+        self.db.execute(stmt.on_conflict_do_update(
+            index_elements=[table.c.name, table.c.shard],
+            set_={"value": table.c.value + stmt.excluded.value},
+        ))
+
+    def record_activity(self, day: Optional[date] = None, **deltas: int):
+        """
+        Суточные счётчики; по умолчанию — текущий день UTC. Отрицательная дельта
+        с днём создания удалённой записи (отмена голоса) сохраняет ряд согласованным с reconcile.
+        """
+        unknown = set(deltas) - set(ACTIVITY_COLUMNS)
+        if unknown:
+            raise ValueError(f"Неизвестные счётчики: {', '.join(sorted(unknown))}")
+        if not any(deltas.values()):
+            return
+        table = models.DailyActivity.__table__
+        stmt = insert(table).values(
+            day=day if day is not None else _utc_today(),
+            shard=random.randrange(self.shards),
+            **deltas,
+        )
+        self.db.execute(stmt.on_conflict_do_update(
+            index_elements=[table.c.day, table.c.shard],
+            set_={name: table.c[name] + delta for name, delta in deltas.items()},
+        ))
+
+    def record_activity_many(self, deltas_by_day: Dict[date, Dict[str, int]]):
+        """
+        Суточные дельты для многих дней одним INSERT ... ON CONFLICT (удаление пользователя, снятие голосов).
+        Пример: record_activity_many({date(2024, 5, 1): {"votes": -2}, ...})
+        """
+        unknown = {name for deltas in deltas_by_day.values() for name in deltas} - set(ACTIVITY_COLUMNS)
+        if unknown:
+            raise ValueError(f"Неизвестные счётчики: {', '.join(sorted(unknown))}")
+        rows = [
+            {"day": day, "shard": random.randrange(self.shards),
+             **{name: deltas.get(name, 0) for name in ACTIVITY_COLUMNS}}
+            for day, deltas in deltas_by_day.items() if any(deltas.values())
+        ]
+        if not rows:
+            return
+        table = models.DailyActivity.__table__
+        stmt = insert(table).values(rows)
+        self.db.execute(stmt.on_conflict_do_update(
+            index_elements=[table.c.day, table.c.shard],
+            set_={name: table.c[name] + stmt.excluded[name] for name in ACTIVITY_COLUMNS},
+        ))
+
+    # ---------- чтение ----------
+    def totals(self) -> dict:
+        table = models.SystemCounter.__table__
+        rows = self.db.execute(
+            select(table.c.name, func.sum(table.c.value)).group_by(table.c.name)
+        ).all()
+        values = {name: int(total) for name, total in rows}
+        return {name: values.get(name, 0) for name in COUNTER_TABLES}
+
+    def estimates(self) -> dict:
+        """Оценки планировщика (pg_class.reltuples) — без чтения таблиц, точность — на момент ANALYZE"""
+        rows = self.db.execute(
+            text("""
+                SELECT c.relname, c.reltuples::bigint
+                FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE n.nspname = 'ideabridge' AND c.relname = ANY(:tables)
+            """),
+            {"tables": list(COUNTER_TABLES.values())},
+        ).all()
+        # reltuples = -1 у ещё ни разу не проанализированной таблицы
+        values = {relname: max(int(reltuples), 0) for relname, reltuples in rows}
+        return {name: values.get(table, 0) for name, table in COUNTER_TABLES.items()}
+
+    def exact(self) -> dict:
+        """Точные COUNT(*) — полный проход по таблицам, только для сверки"""
+        return {
+            name: self.db.execute(text(f"SELECT count(*) FROM ideabridge.{table}")).scalar_one()
+            for name, table in COUNTER_TABLES.items()
+        }
+
+    def daily(self, days: int) -> List[dict]:
+        table = models.DailyActivity.__table__
+        since = datetime.now(timezone.utc).date() - timedelta(days=days - 1)
+        rows = self.db.execute(
+            select(table.c.day, *(func.sum(table.c[name]).label(name) for name in ACTIVITY_COLUMNS))
+            .where(table.c.day >= since)
+            .group_by(table.c.day)
+            .order_by(table.c.day)
+        ).all()
+        return [
+            {"day": row.day, **{name: int(row._mapping[name]) for name in ACTIVITY_COLUMNS}}
+            for row in rows
+        ]
+
+    # ---------- сверка ----------
+    def reconcile(self):
+        """Пересобирает счётчики и rollup из исходных таблиц (полные проходы — запускать из cron/CLI)"""
+        self.db.execute(text("LOCK TABLE ideabridge.system_counters, ideabridge.daily_activity IN EXCLUSIVE MODE"))
+        self.db.execute(text("DELETE FROM ideabridge.system_counters"))
+        for name, table in COUNTER_TABLES.items():
+            self.db.execute(
+                text(f"INSERT INTO ideabridge.system_counters (name, shard, value) "
+                     f"SELECT :name, 0, count(*) FROM ideabridge.{table}"),
+                {"name": name},
+            )
+        self.db.execute(text("DELETE FROM ideabridge.daily_activity"))
+        self.db.execute(text("""
+            INSERT INTO ideabridge.daily_activity (day, shard, ideas, votes, comments)
+            SELECT day, 0, sum(ideas), sum(votes), sum(comments)
+            FROM (
+                SELECT (created_at AT TIME ZONE 'UTC')::date AS day, 1 AS ideas, 0 AS votes, 0 AS comments
+                  FROM ideabridge.ideas
+                UNION ALL
+                SELECT (created_at AT TIME ZONE 'UTC')::date, 0, 1, 0 FROM ideabridge.votes
+                UNION ALL
+                SELECT (created_at AT TIME ZONE 'UTC')::date, 0, 0, 1 FROM ideabridge.comments
+            ) activity
+            WHERE day IS NOT NULL
+            GROUP BY day
+        """))
+        self.db.commit()
+
+
+class StatsSnapshot:
+    """Кэш готового ответа /admin/stats на STATS_SNAPSHOT_TTL_SECONDS — автообновление дашборда не ходит в БД"""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                return None
+            return entry[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+
+
+stats_snapshot = StatsSnapshot(settings.STATS_SNAPSHOT_TTL_SECONDS)
@@ -0,0 +1,111 @@
+from typing import Dict
+from sqlalchemy import select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from app import models
+
+
+class UserStatsService:
+    """
+    Инкрементальные счётчики активности пользователя (таблица user_stats).
+    Не коммитит сам: изменения попадают в транзакцию вызывающего кода.
+    """
+
+    COUNTERS = ("ideas_count", "comments_count", "likes_received", "votes_cast")
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def increment(self, user_id: int, **deltas: int):
+        """
+        Атомарно изменяет счётчики: INSERT ... ON CONFLICT DO UPDATE SET c = c + delta.
+        Пример: increment(author_id, likes_received=1)
+        """
+        unknown = set(deltas) - set(self.COUNTERS)
+        if unknown:
+            raise ValueError(f"Неизвестные счётчики: {', '.join(sorted(unknown))}")
+        if not any(deltas.values()):
+            return
+
+        table = models.UserStats.__table__
+        stmt = insert(table).values(
+            user_id=user_id,
+            **{name: max(delta, 0) for name, delta in deltas.items()}
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.user_id],
+            set_={
+                **{name: table.c[name] + delta for name, delta in deltas.items()},
+                "updated_at": func.now(),
+            },
+        )
+        self.db.execute(stmt)
+
+    def increment_many(self, deltas_by_user: Dict[int, Dict[str, int]]):
+        """
+        Те же приращения для многих пользователей одним INSERT ... ON CONFLICT (для пакетных операций).
+        Пример: increment_many({author_id: {"ideas_count": 12}, ...})
+        """
+        if not deltas_by_user:
+            return
+        unknown = {name for deltas in deltas_by_user.values() for name in deltas} - set(self.COUNTERS)
+        if unknown:
+            raise ValueError(f"Неизвестные счётчики: {', '.join(sorted(unknown))}")
+
+        table = models.UserStats.__table__
+        stmt = insert(table).values([
+            {"user_id": user_id, **{name: deltas.get(name, 0) for name in self.COUNTERS}}
+            for user_id, deltas in deltas_by_user.items()
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.user_id],
+            set_={
+                **{name: table.c[name] + stmt.excluded[name] for name in self.COUNTERS},
+                "updated_at": func.now(),
+            },
+        )
+        self.db.execute(stmt)
+
+    def get(self, user_id: int) -> dict:
+        """Счётчики пользователя одним чтением по первичному ключу"""
+        table = models.UserStats.__table__
+        row = self.db.execute(
+            select(*(table.c[name] for name in self.COUNTERS)).where(table.c.user_id == user_id)
+        ).first()
+        if row is None:
+            return {name: 0 for name in self.COUNTERS}
+        return dict(row._mapping)
+
+    def reconcile(self) -> int:
+        """
+        Пересчитывает user_stats из исходных таблиц одним set-based запросом.
+        Возвращает число созданных или исправленных строк.
+        """
+        result = self.db.execute(text("""
+            INSERT INTO ideabridge.user_stats (user_id, ideas_count, comments_count, likes_received, votes_cast, updated_at)
+            SELECT u.user_id,
+                   COALESCE(i.n, 0), COALESCE(c.n, 0), COALESCE(l.n, 0), COALESCE(v.n, 0), now()
+            FROM ideabridge.users u
+            LEFT JOIN (SELECT author_id, count(*) AS n FROM ideabridge.ideas GROUP BY author_id) i
+                   ON i.author_id = u.user_id
+            LEFT JOIN (SELECT user_id, count(*) AS n FROM ideabridge.comments GROUP BY user_id) c
+                   ON c.user_id = u.user_id
+            LEFT JOIN (SELECT ideas.author_id, count(*) AS n
+                         FROM ideabridge.votes JOIN ideabridge.ideas USING (idea_id)
+                        WHERE votes.vote_type
+                        GROUP BY ideas.author_id) l
+                   ON l.author_id = u.user_id
+            LEFT JOIN (SELECT user_id, count(*) AS n FROM ideabridge.votes GROUP BY user_id) v
+                   ON v.user_id = u.user_id
+            ON CONFLICT (user_id) DO UPDATE SET
+                ideas_count = EXCLUDED.ideas_count,
+                comments_count = EXCLUDED.comments_count,
+                likes_received = EXCLUDED.likes_received,
+                votes_cast = EXCLUDED.votes_cast,
+                updated_at = now()
+            WHERE (user_stats.ideas_count, user_stats.comments_count, user_stats.likes_received, user_stats.votes_cast)
+                  IS DISTINCT FROM
+                  (EXCLUDED.ideas_count, EXCLUDED.comments_count, EXCLUDED.likes_received, EXCLUDED.votes_cast)
+        """))
+        return result.rowcount
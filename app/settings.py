@@ -4,11 +4,24 @@ class Settings(BaseSettings):
     #DATABASE
     DATABASE_URL: str
     DATABASE_URL_LOCAL: str
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800
+    DB_STATEMENT_TIMEOUT_MS: int = 15000
+    DB_POOL_WARMUP: int = 5
 
     # AUTH
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    PRINCIPAL_CACHE_ENABLED: bool = True
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 60.0
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
 
     #EMAIL
     SMTP_SERVER: str = ""
@@ -20,6 +33,55 @@ class Settings(BaseSettings):
     DEBUG: bool = True
     ENV: str = "development"
 
+    #CACHE
+    CATALOG_CACHE_CHECK_SECONDS: float = 5.0
+
+    #OUTBOX WORKER
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_MAX_ATTEMPTS: int = 5
+    OUTBOX_RETRY_BASE_SECONDS: float = 5.0
+    OUTBOX_POLL_INTERVAL: float = 1.0
+    OUTBOX_CONCURRENCY: int = 2
+
+    #WEBSOCKET
+    WS_QUEUE_SIZE: int = 100
+    WS_BATCH_WINDOW_MS: int = 50
+    WS_SEND_TIMEOUT: float = 10.0
+
+    #NOTIFICATIONS RETENTION
+    NOTIFICATION_RETENTION_DAYS: int = 90
+    NOTIFICATION_ARCHIVE_BATCH_SIZE: int = 5000
+
+    #LEADERBOARD
+    LEADERBOARD_RECONCILE_SECONDS: float = 300.0
+
+    #RESPONSE CACHE
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    RESPONSE_CACHE_TTL_SECONDS: float = 30
+
+    #ADMIN STATS
+    SYSTEM_COUNTER_SHARDS: int = 16
+    STATS_SNAPSHOT_TTL_SECONDS: float = 10
+
+    #BULK IMPORT
+    IMPORT_BATCH_SIZE: int = 5000
+
+    #SIMILAR IDEAS (MinHash LSH)
+    SIMILARITY_NUM_PERM: int = 128
+    SIMILARITY_BANDS: int = 16
+    SIMILARITY_SHINGLE_SIZE: int = 5
+    SIMILARITY_SEED: int = 1
+    SIMILARITY_THRESHOLD: float = 0.5
+
+    #OBSERVABILITY
+    LOG_LEVEL: str = "INFO"
+    METRICS_ENABLED: bool = True
+    # доля запросов с подсчётом SQL и заголовком Server-Timing; 0 — хуки SQLAlchemy не ставятся
+    SQL_SAMPLE_RATE: float = 0.0
+    SLOW_REQUEST_MS: float = 1000
+    SLOW_REQUEST_LOG_STATEMENTS: int = 5
+
     #OTHER
     PROJECT_NAME: str = "IdeaBridge"
 
@@ -0,0 +1,55 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+from fastapi import HTTPException
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Непрозрачный курсор из пары (created_at, id) последней строки страницы"""
+    raw = json.dumps([created_at.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Некорректный курсор")
+
+
+def encode_rank_cursor(rank: float, row_id: int) -> str:
+    """Курсор для выдачи, упорядоченной по релевантности: (rank, id) последней строки"""
+    raw = json.dumps([rank, row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_rank_cursor(cursor: Optional[str]) -> Optional[Tuple[float, int]]:
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        rank, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return float(rank), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Некорректный курсор")
+
+
+def encode_id_cursor(row_id: int) -> str:
+    """Курсор для выдачи, упорядоченной по первичному ключу"""
+    return base64.urlsafe_b64encode(json.dumps([row_id]).encode()).decode().rstrip("=")
+
+
+def decode_id_cursor(cursor: Optional[str]) -> Optional[int]:
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        (row_id,) = json.loads(base64.urlsafe_b64decode(padded))
+        return int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Некорректный курсор")
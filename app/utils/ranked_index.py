@@ -0,0 +1,121 @@
+from math import log2
+from random import random
+from typing import Any, Iterator
+
+
+class _End:
+    """Сентинел конца списка: больше любого ключа"""
+    def __lt__(self, other): return False
+    def __le__(self, other): return False
+    def __gt__(self, other): return True
+    def __ge__(self, other): return True
+    def __eq__(self, other): return False
+    __hash__ = object.__hash__
+
+
+class _Node:
+    __slots__ = ("value", "next", "width")
+
+    def __init__(self, value, next, width):
+        self.value = value
+        self.next = next
+        self.width = width
+
+
+_NIL = _Node(_End(), [], [])
+
+
+class RankedIndex:
+    """
+    Индексируемый skip-list: отсортированное множество ключей с операциями
+    insert / remove / rank / __getitem__ за O(log n) в среднем.
+    Ключи должны быть уникальными и сравнимыми (например, кортеж (-points, user_id)).
+    """
+
+    def __init__(self, expected_size: int = 1 << 20):
+        self.size = 0
+        self.max_levels = int(1 + log2(max(expected_size, 2)))
+        self.head = _Node("HEAD", [_NIL] * self.max_levels, [1] * self.max_levels)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, index: int) -> Any:
+        if not 0 <= index < self.size:
+            raise IndexError(index)
+        node = self.head
+        i = index + 1
+        for level in reversed(range(self.max_levels)):
+            while node.width[level] <= i:
+                i -= node.width[level]
+                node = node.next[level]
+        return node.value
+
+    def slice(self, start: int, stop: int) -> Iterator[Any]:
+        """Ключи с позиций [start, stop): поиск первого за O(log n), дальше по нижнему уровню"""
+        start = max(start, 0)
+        stop = min(stop, self.size)
+        if start >= stop:
+            return
+        node = self.head
+        i = start + 1
+        for level in reversed(range(self.max_levels)):
+            while node.width[level] <= i:
+                i -= node.width[level]
+                node = node.next[level]
+        for _ in range(stop - start):
+            yield node.value
+            node = node.next[0]
+
+    def rank(self, value) -> int:
+        """0-based позиция ключа (= число ключей меньше него)"""
+        node = self.head
+        position = 0
+        for level in reversed(range(self.max_levels)):
+            while node.next[level].value < value:
+                position += node.width[level]
+                node = node.next[level]
+        return position
+
+    def insert(self, value):
+        chain = [None] * self.max_levels
+        steps_at_level = [0] * self.max_levels
+        node = self.head
+        for level in reversed(range(self.max_levels)):
+            while node.next[level].value <= value:
+                steps_at_level[level] += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+
+        height = min(self.max_levels, 1 - int(log2(random() or 1e-12)))
+        new_node = _Node(value, [None] * height, [None] * height)
+        steps = 0
+        for level in range(height):
+            prev = chain[level]
+            new_node.next[level] = prev.next[level]
+            prev.next[level] = new_node
+            new_node.width[level] = prev.width[level] - steps
+            prev.width[level] = steps + 1
+            steps += steps_at_level[level]
+        for level in range(height, self.max_levels):
+            chain[level].width[level] += 1
+        self.size += 1
+
+    def remove(self, value):
+        chain = [None] * self.max_levels
+        node = self.head
+        for level in reversed(range(self.max_levels)):
+            while node.next[level].value < value:
+                node = node.next[level]
+            chain[level] = node
+        target = chain[0].next[0]
+        if target is _NIL or target.value != value:
+            raise KeyError(value)
+
+        for level in range(len(target.next)):
+            prev = chain[level]
+            prev.width[level] += target.width[level] - 1
+            prev.next[level] = target.next[level]
+        for level in range(len(target.next), self.max_levels):
+            chain[level].width[level] -= 1
+        self.size -= 1
@@ -0,0 +1,46 @@
+"""
+Фоновый воркер побочных эффектов (очки, достижения, уведомления) из outbox.
+
+    python -m app.worker
+"""
+import asyncio
+import logging
+import signal
+
+from app.database import SessionLocal
+from app.services.outbox_service import OutboxProcessor
+from app.settings import settings
+from app.observability import setup_logging
+
+logger = logging.getLogger(__name__)
+
+
+async def drain_loop(processor: OutboxProcessor, stop: asyncio.Event):
+    while not stop.is_set():
+        try:
+            processed = await asyncio.to_thread(processor.drain_once)
+        except Exception as e:
+            logger.exception("Ошибка при разборе outbox: %r", e)
+            processed = 0
+        # пачка была полной — сразу берём следующую, иначе ждём новых событий
+        if processed < processor.batch_size:
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=settings.OUTBOX_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+
+async def main():
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    processor = OutboxProcessor(SessionLocal)
+    logger.info("Outbox-воркер запущен, параллельных обработчиков: %d", settings.OUTBOX_CONCURRENCY)
+    await asyncio.gather(*(drain_loop(processor, stop) for _ in range(settings.OUTBOX_CONCURRENCY)))
+
+
+if __name__ == "__main__":
+    setup_logging()
+    asyncio.run(main())
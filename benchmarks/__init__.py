@@ -0,0 +1 @@
+"""Бенчмарки IdeaBridge. Запускаются против локального Postgres (см. .env)."""
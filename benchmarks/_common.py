@@ -0,0 +1,139 @@
+"""Общие утилиты бенчмарков: запуск uvicorn, HTTP-нагрузка, перцентили."""
+import contextlib
+import http.client
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(values: List[float], p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, int(round(p / 100 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+@contextlib.contextmanager
+def run_server(app_path: str, port: int, workers: int = 1, env: Optional[Dict[str, str]] = None):
+    """Запускает uvicorn в отдельном процессе и ждёт, пока он начнёт отвечать."""
+    proc_env = dict(os.environ, **(env or {}))
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app_path, "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=ROOT, env=proc_env,
+    )
+    try:
+        wait_ready("127.0.0.1", port)
+        yield proc
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def wait_ready(host: str, port: int, path: str = "/", timeout: float = 30.0) -> float:
+    """Ждёт первый успешный ответ, возвращает затраченное время в секундах."""
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=1)
+            conn.request("GET", path)
+            if conn.getresponse().status < 500:
+                return time.perf_counter() - started
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"сервер на порту {port} не поднялся за {timeout} c")
+
+
+@dataclass
+class LoadResult:
+    requests: int = 0
+    errors: int = 0
+    elapsed: float = 0.0
+    latencies: List[float] = field(default_factory=list)
+    statuses: Dict[int, int] = field(default_factory=dict)
+
+    @property
+    def rps(self) -> float:
+        return self.requests / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "rps": round(self.rps, 1),
+            "p50_ms": round(percentile(self.latencies, 50) * 1000, 2),
+            "p95_ms": round(percentile(self.latencies, 95) * 1000, 2),
+            "p99_ms": round(percentile(self.latencies, 99) * 1000, 2),
+            "statuses": self.statuses,
+        }
+
+
+RequestSpec = Tuple[str, str, Optional[bytes], Dict[str, str]]
+
+
+def drive(
+    host: str,
+    port: int,
+    make_request: Callable[[int, int], RequestSpec],
+    concurrency: int = 32,
+    duration: float = 10.0,
+) -> LoadResult:
+    """
+    Нагружает сервер `concurrency` клиентами с keep-alive в течение `duration` секунд.
+    make_request(client_no, seq) -> (method, path, body, headers).
+    """
+    result = LoadResult()
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client(client_no: int):
+        conn = http.client.HTTPConnection(host, port, timeout=30)
+        seq = 0
+        local: List[float] = []
+        statuses: Dict[int, int] = {}
+        errors = 0
+        while time.perf_counter() < deadline:
+            method, path, body, headers = make_request(client_no, seq)
+            seq += 1
+            started = time.perf_counter()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                resp = conn.getresponse()
+                resp.read()
+                statuses[resp.status] = statuses.get(resp.status, 0) + 1
+                if resp.status >= 500:
+                    errors += 1
+            except (OSError, http.client.HTTPException):
+                errors += 1
+                conn.close()
+                conn = http.client.HTTPConnection(host, port, timeout=30)
+            local.append(time.perf_counter() - started)
+        with lock:
+            result.requests += len(local)
+            result.errors += errors
+            result.latencies.extend(local)
+            for code, n in statuses.items():
+                result.statuses[code] = result.statuses.get(code, 0) + n
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(client, range(concurrency)))
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+def json_request(method: str, path: str, payload=None, token: Optional[str] = None) -> RequestSpec:
+    headers = {"Content-Type": "application/json"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    body = json.dumps(payload).encode() if payload is not None else None
+    return method, path, body, headers
@@ -0,0 +1,85 @@
+"""Минимальный WebSocket-клиент на asyncio (RFC 6455) для нагрузочных скриптов без внешних зависимостей."""
+import asyncio
+import base64
+import os
+import struct
+from typing import Optional, Tuple
+
+OP_TEXT = 0x1
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+
+class WSClient:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, host: str, port: int, path: str) -> "WSClient":
+        reader, writer = await asyncio.open_connection(host, port)
+        key = base64.b64encode(os.urandom(16)).decode()
+        writer.write(
+            (
+                f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\nUpgrade: websocket\r\n"
+                f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n"
+            ).encode()
+        )
+        await writer.drain()
+        status_line = await reader.readline()
+        if b" 101 " not in status_line:
+            writer.close()
+            raise ConnectionError(f"handshake отклонён: {status_line!r}")
+        while (await reader.readline()) not in (b"\r\n", b""):
+            pass
+        return cls(reader, writer)
+
+    async def send_text(self, text: str):
+        self._send_frame(OP_TEXT, text.encode())
+        await self.writer.drain()
+
+    async def recv(self) -> Tuple[int, bytes]:
+        """Следующий кадр данных; служебные ping отвечаются автоматически"""
+        while True:
+            head = await self.reader.readexactly(2)
+            opcode = head[0] & 0x0F
+            length = head[1] & 0x7F
+            if length == 126:
+                (length,) = struct.unpack("!H", await self.reader.readexactly(2))
+            elif length == 127:
+                (length,) = struct.unpack("!Q", await self.reader.readexactly(8))
+            data = await self.reader.readexactly(length)
+            if opcode == OP_PING:
+                self._send_frame(OP_PONG, data)
+                await self.writer.drain()
+                continue
+            return opcode, data
+
+    async def recv_text(self, timeout: Optional[float] = None) -> str:
+        opcode, data = await asyncio.wait_for(self.recv(), timeout)
+        if opcode == OP_CLOSE:
+            raise ConnectionError("сервер закрыл соединение")
+        return data.decode()
+
+    async def close(self):
+        try:
+            self._send_frame(OP_CLOSE, struct.pack("!H", 1000))
+            await self.writer.drain()
+        except ConnectionError:
+            pass
+        self.writer.close()
+
+    def _send_frame(self, opcode: int, payload: bytes):
+        # клиентские кадры обязаны быть замаскированы
+        mask = os.urandom(4)
+        header = bytes([0x80 | opcode])
+        n = len(payload)
+        if n < 126:
+            header += bytes([0x80 | n])
+        elif n < 65536:
+            header += bytes([0x80 | 126]) + struct.pack("!H", n)
+        else:
+            header += bytes([0x80 | 127]) + struct.pack("!Q", n)
+        masked = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+        self.writer.write(header + mask + masked)
@@ -0,0 +1,64 @@
+"""
+Накладные расходы аутентификации на запрос: get_current_user с кэшем Principal и без него.
+
+    python -m benchmarks.auth_overhead --iterations 5000
+"""
+import argparse
+import json
+import time
+import uuid
+
+from app import models
+from app.auth import create_user_token, get_current_user
+from app.database import SessionLocal
+from app.services.principal_cache import principal_cache
+from benchmarks._common import percentile
+
+
+def measure(token: str, iterations: int):
+    latencies = []
+    for _ in range(iterations):
+        # как и в FastAPI, сессия на запрос; соединение берётся из пула только при обращении к БД
+        db = SessionLocal()
+        started = time.perf_counter()
+        get_current_user(token, db)
+        latencies.append(time.perf_counter() - started)
+        db.close()
+    return {
+        "mean_us": round(sum(latencies) / len(latencies) * 1e6, 1),
+        "p50_us": round(percentile(latencies, 50) * 1e6, 1),
+        "p99_us": round(percentile(latencies, 99) * 1e6, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    user = models.User(full_name="auth bench", email=f"auth-{uuid.uuid4().hex[:8]}@bench.local", password_hash="-")
+    db.add(user)
+    db.commit()
+    token = create_user_token(user)
+    user_id = user.user_id
+    db.close()
+
+    report = {}
+    try:
+        principal_cache.enabled = False
+        report["without_cache"] = measure(token, args.iterations)
+        principal_cache.enabled = True
+        report["with_cache"] = measure(token, args.iterations)
+        report["cache_hits"] = principal_cache.hits
+        report["cache_misses"] = principal_cache.misses
+    finally:
+        db = SessionLocal()
+        db.query(models.User).filter(models.User.user_id == user_id).delete(synchronize_session=False)
+        db.commit()
+        db.close()
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
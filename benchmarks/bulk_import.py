@@ -0,0 +1,89 @@
+"""
+Пакетный импорт идей: IdeaImporter (COPY пачками) против поштучного crud.create_idea.
+
+    python -m benchmarks.bulk_import --rows 100000 --baseline-rows 500
+
+Генерирует CSV с идеями нескольких синтетических авторов (с участниками команд),
+прогоняет импорт и печатает отчёт с rows/sec; для сравнения — create_idea на небольшой выборке.
+Созданные пользователи и их идеи удаляются в конце.
+"""
+import argparse
+import csv
+import io
+import json
+import random
+import time
+import uuid
+
+from app import crud, models, schemas
+from app.database import SessionLocal
+from app.services.idea_import import IdeaImporter
+from benchmarks.fts_search import WORDS
+
+
+def make_users(db, n: int):
+    suffix = uuid.uuid4().hex[:8]
+    users = [
+        models.User(full_name=f"import bench {i}", email=f"import-{suffix}-{i}@bench.local", password_hash="-")
+        for i in range(n)
+    ]
+    db.add_all(users)
+    db.commit()
+    return [(u.user_id, u.email) for u in users]
+
+
+def make_csv(users, rows: int, rng: random.Random) -> io.StringIO:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["title", "description", "author_email", "team_member_ids"])
+    ids = [user_id for user_id, _ in users]
+    for _ in range(rows):
+        _, email = rng.choice(users)
+        team = ";".join(str(uid) for uid in rng.sample(ids, rng.randint(0, 2)))
+        writer.writerow([
+            " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 7))),
+            " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 60))),
+            email,
+            team,
+        ])
+    buffer.seek(0)
+    return buffer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--authors", type=int, default=200)
+    parser.add_argument("--baseline-rows", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    db = SessionLocal()
+    users = make_users(db, args.authors)
+    report = {}
+    try:
+        report["bulk_import"] = IdeaImporter(db).run(make_csv(users, args.rows, rng), "csv").as_dict()
+
+        started = time.perf_counter()
+        for _ in range(args.baseline_rows):
+            author_id, _ = rng.choice(users)
+            crud.create_idea(db, schemas.IdeaCreate(title="bench", description="bench"), author_id)
+        elapsed = time.perf_counter() - started
+        report["create_idea_one_by_one"] = {
+            "rows": args.baseline_rows, "rows_per_sec": round(args.baseline_rows / elapsed)
+        }
+    finally:
+        db.rollback()
+        user_ids = [user_id for user_id, _ in users]
+        db.query(models.OutboxEvent).filter(
+            models.OutboxEvent.payload["author_id"].as_integer().in_(user_ids)
+        ).delete(synchronize_session=False)
+        db.query(models.Idea).filter(models.Idea.author_id.in_(user_ids)).delete(synchronize_session=False)
+        db.query(models.User).filter(models.User.user_id.in_(user_ids)).delete(synchronize_session=False)
+        db.commit()
+        db.close()
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Сравнение результатов benchmarks.hot_paths с базовым прогоном.
+
+    python -m benchmarks.compare baseline.json results.json --threshold 0.10
+
+Регрессия — ухудшение метрики сценария больше чем на threshold (доля):
+падение rps, рост p95/p99 или числа SQL-запросов на HTTP-запрос, а также ошибки 5xx.
+Код выхода 1, если найдена хотя бы одна регрессия.
+"""
+import argparse
+import json
+import sys
+from typing import List
+
+# метрика -> True, если больше — лучше
+METRICS = {
+    "rps": True,
+    "p95_ms": False,
+    "p99_ms": False,
+    "statements_per_request": False,
+}
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> List[str]:
+    """Список описаний регрессий (пустой — регрессий нет)"""
+    regressions = []
+    for name, base in baseline["scenarios"].items():
+        cur = current["scenarios"].get(name)
+        if cur is None:
+            regressions.append(f"{name}: сценарий отсутствует в текущем прогоне")
+            continue
+        if cur.get("errors") and not base.get("errors"):
+            regressions.append(f"{name}: {cur['errors']} ошибок (в базовом прогоне 0)")
+        for metric, higher_is_better in METRICS.items():
+            old, new = base.get(metric), cur.get(metric)
+            if old is None or new is None or old == 0:
+                continue
+            change = (new - old) / old
+            worse = -change if higher_is_better else change
+            if worse > threshold:
+                regressions.append(f"{name}: {metric} {old} -> {new} ({change:+.1%})")
+    return regressions
+
+
+def print_table(baseline: dict, current: dict):
+    print(f"{'сценарий':<16}{'метрика':<24}{'база':>12}{'сейчас':>12}{'изм.':>10}")
+    for name, base in baseline["scenarios"].items():
+        cur = current["scenarios"].get(name, {})
+        for metric in METRICS:
+            old, new = base.get(metric), cur.get(metric)
+            change = f"{(new - old) / old:+.1%}" if old and new is not None else "-"
+            print(f"{name:<16}{metric:<24}{str(old):>12}{str(new):>12}{change:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    print_table(baseline, current)
+    regressions = compare(baseline, current, args.threshold)
+    for line in regressions:
+        print(f"РЕГРЕССИЯ {line}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Сравнение пропускной способности sync (threadpool + psycopg2) и async (asyncpg)
+путей доступа к БД на одном и том же запросе ленты идей.
+
+    python -m benchmarks.db_paths --concurrency 64 --duration 15
+
+Скрипт поднимает два uvicorn-процесса с минимальными приложениями из этого модуля,
+поэтому разница отражает только слой БД, а не остальную логику эндпоинтов.
+"""
+import argparse
+import json
+
+from fastapi import Depends, FastAPI
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.database import get_async_db, get_db
+
+sync_app = FastAPI()
+async_app = FastAPI()
+
+
+@sync_app.get("/ideas/")
+def sync_ideas(limit: int = 50, db: Session = Depends(get_db)):
+    return [idea.idea_id for idea in crud.list_ideas(db, 0, limit)]
+
+
+@async_app.get("/ideas/")
+async def async_ideas(limit: int = 50, db: AsyncSession = Depends(get_async_db)):
+    ideas = await db.run_sync(crud.list_ideas, 0, limit)
+    return [idea.idea_id for idea in ideas]
+
+
+def main():
+    from benchmarks._common import drive, run_server
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=8101)
+    args = parser.parse_args()
+
+    report = {}
+    for name in ("sync_app", "async_app"):
+        with run_server(f"benchmarks.db_paths:{name}", args.port):
+            drive("127.0.0.1", args.port, lambda c, s: ("GET", "/ideas/", None, {}), 4, 2.0)  # прогрев
+            result = drive(
+                "127.0.0.1", args.port,
+                lambda c, s: ("GET", "/ideas/", None, {}),
+                concurrency=args.concurrency, duration=args.duration,
+            )
+        report[name] = result.summary()
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
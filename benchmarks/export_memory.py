@@ -0,0 +1,99 @@
+"""
+Потоковая выгрузка /admin/export/{users,ideas}: скорость и рост RSS воркера.
+
+    python -m benchmarks.export_memory --kind ideas --format csv
+
+Выгружает таблицу целиком через HTTP, параллельно раз в 50 мс снимает RSS процесса uvicorn.
+При потоковой выгрузке пик RSS не должен расти вместе с размером таблицы
+(для сравнения можно прогнать на fts_search-наборе в 1M идей).
+"""
+import argparse
+import http.client
+import json
+import threading
+import time
+import uuid
+
+from app import models
+from app.auth import create_user_token
+from app.database import SessionLocal
+from benchmarks._common import run_server
+from benchmarks.ws_idle import rss_kib
+
+HOST = "127.0.0.1"
+
+
+def make_admin():
+    db = SessionLocal()
+    admin = models.User(
+        full_name="export bench", email=f"export-{uuid.uuid4().hex[:8]}@bench.local", password_hash="-", role="admin"
+    )
+    db.add(admin)
+    db.commit()
+    token = create_user_token(admin)
+    user_id = admin.user_id
+    db.close()
+    return user_id, token
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--kind", choices=("users", "ideas"), default="ideas")
+    parser.add_argument("--format", choices=("ndjson", "csv"), default="ndjson")
+    parser.add_argument("--port", type=int, default=8107)
+    args = parser.parse_args()
+
+    admin_id, token = make_admin()
+    try:
+        with run_server("app.main:app", args.port, workers=1) as proc:
+            time.sleep(1.0)
+            baseline = rss_kib(proc.pid)
+            peak = baseline
+            done = threading.Event()
+
+            def sample():
+                nonlocal peak
+                while not done.is_set():
+                    peak = max(peak, rss_kib(proc.pid))
+                    time.sleep(0.05)
+
+            sampler = threading.Thread(target=sample, daemon=True)
+            sampler.start()
+
+            started = time.perf_counter()
+            conn = http.client.HTTPConnection(HOST, args.port, timeout=600)
+            conn.request(
+                "GET", f"/admin/export/{args.kind}?format={args.format}",
+                headers={"Authorization": f"Bearer {token}"},
+            )
+            resp = conn.getresponse()
+            size = lines = 0
+            while True:
+                chunk = resp.read(1 << 16)
+                if not chunk:
+                    break
+                size += len(chunk)
+                lines += chunk.count(b"\n")
+            elapsed = time.perf_counter() - started
+            done.set()
+            sampler.join()
+    finally:
+        db = SessionLocal()
+        db.query(models.User).filter(models.User.user_id == admin_id).delete(synchronize_session=False)
+        db.commit()
+        db.close()
+
+    rows = lines - 1 if args.format == "csv" else lines
+    print(json.dumps({
+        "status": resp.status,
+        "rows": rows,
+        "mib": round(size / 1024 / 1024, 1),
+        "rows_per_sec": round(rows / elapsed),
+        "seconds": round(elapsed, 2),
+        "rss_baseline_mib": round(baseline / 1024, 1),
+        "rss_peak_delta_mib": round((peak - baseline) / 1024, 1),
+    }, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Полнотекстовый поиск по синтетическому набору идей.
+
+    python -m benchmarks.fts_search --ideas 1000000      # сгенерировать набор и замерить
+    python -m benchmarks.fts_search --skip-seed          # только замер на уже загруженных данных
+    python -m benchmarks.fts_search --cleanup            # удалить синтетические идеи
+
+Идеи загружаются через COPY от имени отдельного пользователя fts-bench@bench.local,
+после загрузки выполняется ANALYZE. Затем crud.search_ideas выполняется для набора
+запросов (первая страница и страница по курсору), печатаются p50/p95/max в мс.
+"""
+import argparse
+import io
+import json
+import random
+import time
+
+from app import crud, models
+from app.database import SessionLocal, engine
+from benchmarks._common import percentile
+
+BENCH_EMAIL = "fts-bench@bench.local"
+
+WORDS = (
+    "автоматизация склад логистика доставка сотрудник обучение портал заявка согласование "
+    "отчёт аналитика клиент сервис качество производство энергия экономия бюджет закупка "
+    "договор документ цифровой платформа мобильный приложение офис безопасность охрана "
+    "экология отходы переработка транспорт маршрут оптимизация процесс контроль учёт "
+    "планирование график смена оборудование ремонт обслуживание датчик мониторинг "
+    "искусственный интеллект чат-бот поддержка клиентский опыт обратная связь"
+).split()
+
+QUERIES = [
+    "оптимизация логистики", "мобильное приложение", "экономия энергии", "обучение сотрудников",
+    "мониторинг оборудования", "переработка отходов", "чат-бот поддержки", "учёт закупок",
+    "цифровая платформа документов", "безопасность офиса",
+]
+
+
+def get_author_id(db) -> int:
+    user = db.query(models.User).filter(models.User.email == BENCH_EMAIL).first()
+    if user is None:
+        user = models.User(full_name="fts bench", email=BENCH_EMAIL, password_hash="-")
+        db.add(user)
+        db.commit()
+    return user.user_id
+
+
+def sentence(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def seed(total: int, chunk: int = 50000):
+    db = SessionLocal()
+    author_id = get_author_id(db)
+    db.close()
+
+    rng = random.Random(42)
+    statuses = ["new", "review", "approved", "rejected"]
+    started = time.perf_counter()
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        for offset in range(0, total, chunk):
+            buf = io.StringIO()
+            for _ in range(min(chunk, total - offset)):
+                title = sentence(rng, rng.randint(3, 7))
+                description = sentence(rng, rng.randint(20, 60))
+                buf.write(f"{title}\t{description}\t{author_id}\t{rng.choice(statuses)}\n")
+            buf.seek(0)
+            cursor.copy_expert(
+                "COPY ideabridge.ideas (title, description, author_id, status) FROM STDIN", buf
+            )
+            raw.commit()
+            print(f"  загружено {offset + chunk:>9,} идей", flush=True)
+        cursor.execute("ANALYZE ideabridge.ideas")
+        raw.commit()
+    finally:
+        raw.close()
+    return time.perf_counter() - started
+
+
+def measure(rounds: int):
+    db = SessionLocal()
+    first_page, next_page = [], []
+    try:
+        for _ in range(rounds):
+            for q in QUERIES:
+                started = time.perf_counter()
+                _, cursor = crud.search_ideas(db, q, limit=20)
+                first_page.append(time.perf_counter() - started)
+                if cursor:
+                    started = time.perf_counter()
+                    crud.search_ideas(db, q, status="approved", cursor=cursor, limit=20)
+                    next_page.append(time.perf_counter() - started)
+    finally:
+        db.close()
+
+    def summary(values):
+        return {
+            "queries": len(values),
+            "p50_ms": round(percentile(values, 50) * 1000, 1),
+            "p95_ms": round(percentile(values, 95) * 1000, 1),
+            "max_ms": round(max(values) * 1000, 1) if values else 0.0,
+        }
+
+    return {"first_page": summary(first_page), "cursor_page_filtered": summary(next_page)}
+
+
+def cleanup():
+    db = SessionLocal()
+    deleted = db.query(models.User).filter(models.User.email == BENCH_EMAIL).delete(synchronize_session=False)
+    db.commit()
+    db.close()
+    print(f"удалён пользователь бенчмарка и его идеи: {deleted}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ideas", type=int, default=1_000_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--skip-seed", action="store_true")
+    parser.add_argument("--cleanup", action="store_true")
+    args = parser.parse_args()
+
+    if args.cleanup:
+        cleanup()
+        return
+    report = {}
+    if not args.skip_seed:
+        report["seed_seconds"] = round(seed(args.ideas), 1)
+    report.update(measure(args.rounds))
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Нагрузочный и регрессионный прогон горячих путей API на наборе из benchmarks.seed.
+
+    python -m benchmarks.seed --users 1000 --ideas 10000
+    python -m benchmarks.hot_paths --concurrency 32 --duration 15 --output results.json
+    python -m benchmarks.hot_paths --output results.json --baseline baseline.json --threshold 0.10
+
+Сценарии (каждый отдельно, после прогрева): голос, пакет из 20 голосов, комментарий, создание идеи,
+лента GET /ideas/ и GET /notifications/. Для каждого — rps, p50/p95/p99 и число
+SQL-запросов на HTTP-запрос (по приросту calls в pg_stat_statements; null, если
+расширение не установлено). Воркер outbox на время прогона лучше остановить —
+иначе его запросы попадут в счёт.
+
+Результат сохраняется в JSON; с --baseline он сравнивается с базовым прогоном
+(см. benchmarks.compare), при регрессии код выхода 1.
+"""
+import argparse
+import json
+import random
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import text
+
+from app.auth import create_user_token
+from app.database import engine
+from benchmarks._common import ROOT, RequestSpec, drive, json_request, run_server
+from benchmarks.compare import compare
+from benchmarks.fts_search import WORDS
+from benchmarks.seed import EMAIL_DOMAIN
+
+STATEMENTS_SQL = text("""
+    SELECT coalesce(sum(calls), 0) FROM pg_stat_statements
+    WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+""")
+
+
+def statements_total() -> Optional[int]:
+    """Суммарное число выполненных запросов к текущей базе; None без pg_stat_statements"""
+    try:
+        with engine.connect() as conn:
+            return int(conn.execute(STATEMENTS_SQL).scalar_one())
+    except Exception:
+        return None
+
+
+def load_dataset():
+    with engine.connect() as conn:
+        users = conn.execute(
+            text("SELECT user_id, role, token_version FROM ideabridge.users WHERE email LIKE :p ORDER BY user_id"),
+            {"p": f"%@{EMAIL_DOMAIN}"},
+        ).all()
+        if not users:
+            raise SystemExit("набор не найден; сначала python -m benchmarks.seed")
+        idea_ids = conn.execute(
+            text("SELECT idea_id FROM ideabridge.ideas WHERE author_id = ANY(:ids)"),
+            {"ids": [u.user_id for u in users]},
+        ).scalars().all()
+    return [(u.user_id, create_user_token(u)) for u in users], idea_ids
+
+
+def build_scenarios(users, idea_ids) -> Dict[str, Callable[[int, int], RequestSpec]]:
+    def pick(client_no: int, seq: int):
+        rng = random.Random(client_no * 1_000_003 + seq)
+        return rng, rng.choice(users), rng.choice(idea_ids)
+
+    def vote(c, s):
+        _, (_, token), idea_id = pick(c, s)
+        return json_request("POST", f"/ideas/{idea_id}/vote", token=token)
+
+    def vote_batch(c, s):
+        rng, (_, token), _ = pick(c, s)
+        payload = {"votes": [{"idea_id": i, "vote": rng.random() < 0.7} for i in rng.sample(idea_ids, 20)]}
+        return json_request("POST", "/ideas/votes:batch", payload, token=token)
+
+    def comment(c, s):
+        rng, (user_id, token), idea_id = pick(c, s)
+        payload = {"idea_id": idea_id, "user_id": user_id, "text": " ".join(rng.choices(WORDS, k=12))}
+        return json_request("POST", f"/ideas/{idea_id}/comment", payload, token=token)
+
+    def create_idea(c, s):
+        rng, (_, token), _ = pick(c, s)
+        payload = {"title": " ".join(rng.choices(WORDS, k=5)), "description": " ".join(rng.choices(WORDS, k=40))}
+        return json_request("POST", "/ideas/create", payload, token=token)
+
+    def feed(c, s):
+        return json_request("GET", "/ideas/?limit=50")
+
+    def notifications(c, s):
+        _, (_, token), _ = pick(c, s)
+        return json_request("GET", "/notifications/?limit=50", token=token)
+
+    return {
+        "vote": vote, "vote_batch": vote_batch, "comment": comment,
+        "create_idea": create_idea, "feed": feed, "notifications": notifications,
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--warmup", type=float, default=3.0)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--port", type=int, default=8111)
+    parser.add_argument("--only", nargs="*", help="запустить только перечисленные сценарии")
+    parser.add_argument("--output", default="results.json")
+    parser.add_argument("--baseline")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args()
+
+    users, idea_ids = load_dataset()
+    scenarios = build_scenarios(users, idea_ids)
+    if args.only:
+        scenarios = {name: fn for name, fn in scenarios.items() if name in args.only}
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "workers": args.workers,
+            "users": len(users),
+            "ideas": len(idea_ids),
+        },
+        "scenarios": {},
+    }
+    with run_server("app.main:app", args.port, workers=args.workers):
+        for name, make_request in scenarios.items():
+            drive("127.0.0.1", args.port, make_request, concurrency=4, duration=args.warmup)
+            before = statements_total()
+            result = drive("127.0.0.1", args.port, make_request, concurrency=args.concurrency, duration=args.duration)
+            after = statements_total()
+            summary = result.summary()
+            summary["statements_per_request"] = (
+                round((after - before) / result.requests, 2)
+                if before is not None and after is not None and result.requests else None
+            )
+            report["scenarios"][name] = summary
+            print(f"{name}: {json.dumps(summary, ensure_ascii=False)}")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"результат сохранён в {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, report, args.threshold)
+        for line in regressions:
+            print(f"РЕГРЕССИЯ {line}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Задержка GET /ideas/ во время потока входов.
+
+    python -m benchmarks.login_flood --login-clients 64 --duration 15
+
+Сначала меряется /ideas/ без фоновой нагрузки, затем параллельно с непрерывными
+POST /auth/login. При вынесенном в пул процессов bcrypt p99 ленты должен оставаться
+близким к базовому, а лишние входы — получать быстрый 503.
+"""
+import argparse
+import json
+import threading
+import urllib.parse
+import uuid
+
+from benchmarks._common import drive, json_request, run_server
+
+HOST = "127.0.0.1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--login-clients", type=int, default=64)
+    parser.add_argument("--feed-clients", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=8104)
+    args = parser.parse_args()
+
+    email = f"flood-{uuid.uuid4().hex[:8]}@bench.local"
+    password = "bench-password"
+    form = urllib.parse.urlencode({"username": email, "password": password}).encode()
+    login = ("POST", "/auth/login", form, {"Content-Type": "application/x-www-form-urlencoded"})
+    feed = ("GET", "/ideas/?limit=20", None, {})
+
+    report = {}
+    with run_server("app.main:app", args.port):
+        drive(HOST, args.port, lambda c, s: json_request(
+            "POST", "/auth/register", {"full_name": "flood", "email": email, "password": password}
+        ), concurrency=1, duration=0.1)
+
+        report["feed_baseline"] = drive(HOST, args.port, lambda c, s: feed, args.feed_clients, args.duration).summary()
+
+        flood = {}
+        flood_thread = threading.Thread(
+            target=lambda: flood.update(
+                drive(HOST, args.port, lambda c, s: login, args.login_clients, args.duration).summary()
+            )
+        )
+        flood_thread.start()
+        report["feed_during_flood"] = drive(HOST, args.port, lambda c, s: feed, args.feed_clients, args.duration).summary()
+        flood_thread.join()
+        report["login_flood"] = flood
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
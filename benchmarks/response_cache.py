@@ -0,0 +1,47 @@
+"""
+Кэш ответов публичных эндпоинтов: GET /ideas/ без кэша, с кэшем и с If-None-Match (304).
+
+    python -m benchmarks.response_cache --concurrency 32 --duration 10
+
+Для каждого режима поднимается отдельный uvicorn (RESPONSE_CACHE_ENABLED задаётся через env).
+"""
+import argparse
+import http.client
+import json
+
+from benchmarks._common import drive, run_server
+
+HOST = "127.0.0.1"
+FEED = ("GET", "/ideas/?limit=50", None, {})
+
+
+def current_etag(port: int) -> str:
+    conn = http.client.HTTPConnection(HOST, port, timeout=10)
+    conn.request("GET", FEED[1])
+    resp = conn.getresponse()
+    resp.read()
+    return resp.getheader("ETag") or ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=8106)
+    args = parser.parse_args()
+
+    report = {}
+    with run_server("app.main:app", args.port, env={"RESPONSE_CACHE_ENABLED": "false"}):
+        report["no_cache"] = drive(HOST, args.port, lambda c, s: FEED, args.concurrency, args.duration).summary()
+
+    with run_server("app.main:app", args.port, env={"RESPONSE_CACHE_ENABLED": "true"}):
+        report["cached"] = drive(HOST, args.port, lambda c, s: FEED, args.concurrency, args.duration).summary()
+        revalidate = ("GET", FEED[1], None, {"If-None-Match": current_etag(args.port)})
+        report["if_none_match"] = drive(
+            HOST, args.port, lambda c, s: revalidate, args.concurrency, args.duration
+        ).summary()
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
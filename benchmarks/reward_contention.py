@@ -0,0 +1,127 @@
+"""
+Стресс-тест магазина наград: много покупателей одновременно берут одну награду.
+
+    python -m benchmarks.reward_contention --buyers 2000 --stock 100 --concurrency 64 --duration 10
+
+Создаёт покупателей (часть — без нужного числа монет) и одну награду с ограниченным остатком,
+нагружает POST /rewards/{id}/purchase (покупатели повторяют запросы с одним Idempotency-Key —
+проверка идемпотентности), затем сверяет инварианты по БД: нет перепродажи, не больше одной
+покупки на пользователя, списания монет и записи transactions совпадают с покупками, ответов 5xx нет.
+Код выхода 1, если хотя бы одна проверка не прошла. Созданные данные удаляются в конце.
+"""
+import argparse
+import json
+import random
+import sys
+import uuid
+
+from sqlalchemy import func, select, text
+
+from app import models
+from app.auth import create_user_token
+from app.database import SessionLocal
+from benchmarks._common import drive, json_request, run_server
+
+
+def setup(db, buyers: int, stock: int, cost: int, poor_share: float, rng: random.Random):
+    suffix = uuid.uuid4().hex[:8]
+    users = [
+        models.User(
+            full_name=f"shop bench {i}", email=f"shop-{suffix}-{i}@bench.local", password_hash="-",
+            coins=cost - 1 if rng.random() < poor_share else cost * 2,
+        )
+        for i in range(buyers)
+    ]
+    reward = models.Reward(name=f"bench merch {suffix}", cost=cost, stock=stock)
+    db.add_all(users + [reward])
+    db.commit()
+    return reward.reward_id, {u.user_id: (u.coins, create_user_token(u)) for u in users}
+
+
+def purchase_request(reward_id: int, token: str, key: str):
+    method, path, body, headers = json_request("POST", f"/rewards/{reward_id}/purchase", token=token)
+    return method, path, body, {**headers, "Idempotency-Key": key}
+
+
+def verify(db, reward_id: int, stock: int, cost: int, buyers: dict, statuses: dict) -> dict:
+    purchases = dict(db.execute(
+        select(models.RewardPurchase.user_id, func.count())
+        .where(models.RewardPurchase.reward_id == reward_id)
+        .group_by(models.RewardPurchase.user_id)
+    ).all())
+    sold = sum(purchases.values())
+    stock_left = db.execute(select(models.Reward.stock).where(models.Reward.reward_id == reward_id)).scalar_one()
+    transactions = db.execute(
+        select(func.count()).select_from(models.Transaction).where(
+            models.Transaction.type == "purchase",
+            models.Transaction.user_id.in_(list(buyers)),
+        )
+    ).scalar_one()
+    coins = dict(db.execute(
+        select(models.User.user_id, models.User.coins).where(models.User.user_id.in_(list(buyers)))
+    ).all())
+    wrong_debits = [
+        user_id for user_id, (initial, _) in buyers.items()
+        if initial - coins[user_id] != cost * purchases.get(user_id, 0)
+    ]
+    poor_buyers = {user_id for user_id, (initial, _) in buyers.items() if initial < cost}
+    checks = {
+        "no_oversell": stock_left >= 0 and sold + stock_left == stock,
+        "one_purchase_per_user": all(n == 1 for n in purchases.values()),
+        "transactions_match_purchases": transactions == sold,
+        "coins_debited_exactly": not wrong_debits,
+        "no_purchase_without_coins": not poor_buyers & set(purchases),
+        "no_server_errors": not any(code >= 500 for code in statuses),
+    }
+    return {"sold": sold, "stock_left": stock_left, "transactions": transactions, "checks": checks}
+
+
+def cleanup(db, reward_id: int, user_ids):
+    db.execute(
+        text("DELETE FROM ideabridge.outbox_events "
+             "WHERE event_type = 'reward_purchased' AND (payload->>'reward_id')::int = :reward_id"),
+        {"reward_id": reward_id},
+    )
+    db.query(models.RewardPurchase).filter(models.RewardPurchase.reward_id == reward_id).delete(synchronize_session=False)
+    db.query(models.Reward).filter(models.Reward.reward_id == reward_id).delete(synchronize_session=False)
+    db.query(models.User).filter(models.User.user_id.in_(user_ids)).delete(synchronize_session=False)
+    db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--buyers", type=int, default=2000)
+    parser.add_argument("--stock", type=int, default=100)
+    parser.add_argument("--cost", type=int, default=50)
+    parser.add_argument("--poor-share", type=float, default=0.1, help="доля покупателей без нужного числа монет")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--port", type=int, default=8112)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    db = SessionLocal()
+    reward_id, buyers = setup(db, args.buyers, args.stock, args.cost, args.poor_share, rng)
+    # один ключ на покупателя: все его запросы — повторы одной покупки
+    requests = [(token, str(uuid.uuid4())) for _, token in buyers.values()]
+    try:
+        with run_server("app.main:app", args.port, workers=args.workers):
+            result = drive(
+                "127.0.0.1", args.port,
+                lambda c, s: purchase_request(
+                    reward_id, *requests[random.Random(c * 1_000_003 + s).randrange(len(requests))]
+                ),
+                concurrency=args.concurrency, duration=args.duration,
+            )
+        report = {"load": result.summary(), **verify(db, reward_id, args.stock, args.cost, buyers, result.statuses)}
+    finally:
+        cleanup(db, reward_id, list(buyers))
+        db.close()
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    sys.exit(0 if all(report["checks"].values()) else 1)
+
+
+if __name__ == "__main__":
+    main()
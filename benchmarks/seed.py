@@ -0,0 +1,129 @@
+"""
+Синтетический набор данных для нагрузочных прогонов (benchmarks.hot_paths).
+
+    python -m benchmarks.seed --users 1000 --ideas 10000 --votes 50000 --comments 20000 --notifications 50000
+    python -m benchmarks.seed --cleanup
+
+Все строки загружаются через COPY; пользователи набора имеют email *@load.bench.local,
+удаление пользователей каскадно удаляет их идеи, голоса, комментарии и уведомления.
+После загрузки пересчитываются денормализованные счётчики и выполняется ANALYZE.
+"""
+import argparse
+import io
+import random
+import time
+
+from sqlalchemy import text
+
+from app import crud
+from app.database import SessionLocal, engine
+from app.services.system_counters_service import SystemCountersService
+from app.services.user_stats_service import UserStatsService
+from benchmarks.fts_search import WORDS
+
+EMAIL_DOMAIN = "load.bench.local"
+
+
+def sentence(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def copy_rows(cursor, table: str, columns: str, rows):
+    buf = io.StringIO()
+    for row in rows:
+        buf.write("\t".join("\\N" if v is None else str(v) for v in row) + "\n")
+    buf.seek(0)
+    cursor.copy_expert(f"COPY ideabridge.{table} ({columns}) FROM STDIN", buf)
+
+
+def seeded_user_ids(cursor):
+    cursor.execute("SELECT user_id FROM ideabridge.users WHERE email LIKE %s ORDER BY user_id", (f"%@{EMAIL_DOMAIN}",))
+    return [r[0] for r in cursor.fetchall()]
+
+
+def seed(args):
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        if seeded_user_ids(cursor):
+            raise SystemExit("набор уже загружен; сначала --cleanup")
+
+        copy_rows(cursor, "users", "full_name, email, password_hash, role, points, coins, department", (
+            (f"load user {i}", f"load-{i}@{EMAIL_DOMAIN}", "-", "user", 0, 0, rng.choice(("ИТ", "Логистика", "Финансы")))
+            for i in range(args.users)
+        ))
+        user_ids = seeded_user_ids(cursor)
+
+        copy_rows(cursor, "ideas", "title, description, author_id, status, ai_generated", (
+            (sentence(rng, rng.randint(3, 7)), sentence(rng, rng.randint(20, 60)), rng.choice(user_ids), "new", "f")
+            for _ in range(args.ideas)
+        ))
+        cursor.execute(
+            "SELECT idea_id FROM ideabridge.ideas WHERE author_id = ANY(%s) ORDER BY idea_id", (user_ids,)
+        )
+        idea_ids = [r[0] for r in cursor.fetchall()]
+
+        votes = set()
+        target = min(args.votes, len(idea_ids) * len(user_ids))
+        while len(votes) < target:
+            votes.add((rng.choice(idea_ids), rng.choice(user_ids)))
+        copy_rows(cursor, "votes", "idea_id, user_id, vote_type", ((i, u, "t") for i, u in votes))
+
+        copy_rows(cursor, "comments", "idea_id, user_id, text", (
+            (rng.choice(idea_ids), rng.choice(user_ids), sentence(rng, rng.randint(5, 25)))
+            for _ in range(args.comments)
+        ))
+        copy_rows(cursor, "notifications", "user_id, title, message, is_read", (
+            (rng.choice(user_ids), "Нагрузочный тест", sentence(rng, 12), "t" if rng.random() < 0.7 else "f")
+            for _ in range(args.notifications)
+        ))
+        raw.commit()
+    finally:
+        raw.close()
+
+    db = SessionLocal()
+    try:
+        crud.repair_idea_counters(db)
+        UserStatsService(db).reconcile()
+        db.commit()
+        SystemCountersService(db).reconcile()
+    finally:
+        db.close()
+    with engine.connect() as conn:
+        conn.execution_options(isolation_level="AUTOCOMMIT").execute(text("ANALYZE"))
+    print(f"набор загружен за {time.perf_counter() - started:.1f} с")
+
+
+def cleanup():
+    with engine.begin() as conn:
+        deleted = conn.execute(
+            text("DELETE FROM ideabridge.users WHERE email LIKE :pattern"), {"pattern": f"%@{EMAIL_DOMAIN}"}
+        ).rowcount
+    db = SessionLocal()
+    try:
+        SystemCountersService(db).reconcile()
+    finally:
+        db.close()
+    print(f"удалено пользователей набора: {deleted} (вместе с их данными)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--ideas", type=int, default=10_000)
+    parser.add_argument("--votes", type=int, default=50_000)
+    parser.add_argument("--comments", type=int, default=20_000)
+    parser.add_argument("--notifications", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--cleanup", action="store_true")
+    args = parser.parse_args()
+    if args.cleanup:
+        cleanup()
+    else:
+        seed(args)
+
+
+if __name__ == "__main__":
+    main()
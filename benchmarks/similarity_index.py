@@ -0,0 +1,73 @@
+"""
+Поиск похожих идей: LSH-индекс против полного перебора подписей.
+
+    python -m benchmarks.similarity_index --ideas 200000
+
+Строит индекс на синтетических текстах (пакетный расчёт подписей), затем для набора
+запросов-«перефразов» сравнивает задержку LSH-запроса и полного перебора всех подписей
+и долю найденных исходных идей (recall). БД не используется.
+"""
+import argparse
+import random
+import time
+
+from app.services.similarity import MinHasher, SimilarityIndex
+from app.settings import settings
+from benchmarks.fts_search import WORDS
+from benchmarks._common import percentile
+
+
+def make_text(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(12, 40)))
+
+
+def paraphrase(text: str, rng: random.Random) -> str:
+    words = text.split()
+    # заменяем ~10% слов — типичная повторная подача с правками
+    for _ in range(max(1, len(words) // 10)):
+        words[rng.randrange(len(words))] = rng.choice(WORDS)
+    return " ".join(words)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ideas", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    texts = [make_text(rng) for _ in range(args.ideas)]
+    hasher = MinHasher(settings.SIMILARITY_NUM_PERM, settings.SIMILARITY_SHINGLE_SIZE, settings.SIMILARITY_SEED)
+    index = SimilarityIndex(hasher, settings.SIMILARITY_BANDS, settings.SIMILARITY_THRESHOLD)
+
+    started = time.perf_counter()
+    signatures = hasher.signatures(texts)
+    hashed = time.perf_counter() - started
+    for idea_id, signature in enumerate(signatures):
+        index.add(idea_id, signature)
+    built = time.perf_counter() - started
+    print(f"подписи: {args.ideas / hashed:,.0f} идей/с, индекс построен за {built:.1f} с")
+
+    lsh_ms, scan_ms, found = [], [], 0
+    for target in rng.sample(range(args.ideas), args.queries):
+        query = hasher.signature(paraphrase(texts[target], rng))
+
+        t0 = time.perf_counter()
+        hits = index.query(query)
+        lsh_ms.append((time.perf_counter() - t0) * 1000)
+        found += any(idea_id == target for idea_id, _ in hits)
+
+        t0 = time.perf_counter()
+        (signatures == query).mean(axis=1).argsort()[-5:]
+        scan_ms.append((time.perf_counter() - t0) * 1000)
+
+    for name, samples in (("lsh", lsh_ms), ("full scan", scan_ms)):
+        print(
+            f"{name:10s} p50={percentile(samples, 50):.2f}ms p95={percentile(samples, 95):.2f}ms "
+            f"max={max(samples):.2f}ms"
+        )
+    print(f"recall: {found / args.queries:.1%}")
+
+
+if __name__ == "__main__":
+    main()
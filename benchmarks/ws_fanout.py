@@ -0,0 +1,107 @@
+"""
+Проверка доставки уведомлений между процессами: uvicorn с несколькими воркерами,
+сокеты распределяются по воркерам, уведомления создаются из отдельного процесса
+(как это делает outbox-воркер) и должны дойти до каждого сокета через LISTEN/NOTIFY.
+
+    python -m benchmarks.ws_fanout --workers 4 --users 40
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+from app import models
+from app.auth import create_access_token
+from app.database import SessionLocal
+from app.services.notifications_service import NotificationService
+from benchmarks._common import run_server
+from benchmarks._ws import WSClient
+
+
+def create_users(n: int):
+    db = SessionLocal()
+    suffix = uuid.uuid4().hex[:8]
+    users = [
+        models.User(full_name=f"ws {i}", email=f"ws-{suffix}-{i}@bench.local", password_hash="-")
+        for i in range(n)
+    ]
+    db.add_all(users)
+    db.commit()
+    ids = [u.user_id for u in users]
+    db.close()
+    return ids
+
+
+def delete_users(ids):
+    db = SessionLocal()
+    db.query(models.User).filter(models.User.user_id.in_(ids)).delete(synchronize_session=False)
+    db.commit()
+    db.close()
+
+
+def notify_all(ids):
+    db = SessionLocal()
+    service = NotificationService(db, autocommit=False)
+    for user_id in ids:
+        service.create_notification(user_id, "fanout", f"check {user_id}")
+    db.commit()
+    db.close()
+
+
+async def run(args, user_ids):
+    clients = {}
+    for user_id in user_ids:
+        token = create_access_token({"sub": str(user_id)})
+        clients[user_id] = await WSClient.connect("127.0.0.1", args.port, f"/ws/notifications?token={token}")
+    await asyncio.sleep(1.0)  # сокеты зарегистрированы во всех воркерах
+
+    started = time.perf_counter()
+    await asyncio.to_thread(notify_all, user_ids)
+
+    async def wait_for(user_id, client):
+        deadline = started + args.timeout
+        while time.perf_counter() < deadline:
+            try:
+                text = await client.recv_text(timeout=deadline - time.perf_counter())
+            except asyncio.TimeoutError:
+                break
+            data = json.loads(text)
+            # батч из нескольких уведомлений приходит списком
+            items = data if isinstance(data, list) else [data]
+            if any(item.get("message") == f"check {user_id}" for item in items):
+                return time.perf_counter() - started
+        return None
+
+    latencies = await asyncio.gather(*(wait_for(uid, c) for uid, c in clients.items()))
+    for client in clients.values():
+        await client.close()
+    delivered = [l for l in latencies if l is not None]
+    return {
+        "sockets": len(clients),
+        "delivered": len(delivered),
+        "max_latency_ms": round(max(delivered) * 1000, 1) if delivered else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--users", type=int, default=40)
+    parser.add_argument("--port", type=int, default=8102)
+    parser.add_argument("--timeout", type=float, default=5.0)
+    args = parser.parse_args()
+
+    user_ids = create_users(args.users)
+    try:
+        with run_server("app.main:app", args.port, workers=args.workers):
+            report = asyncio.run(run(args, user_ids))
+    finally:
+        delete_users(user_ids)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if report["delivered"] != report["sockets"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Память на простаивающее WebSocket-соединение в одном воркере.
+
+    python -m benchmarks.ws_idle --connections 10000
+
+Создаёт N пользователей, поднимает uvicorn с одним воркером, открывает N соединений,
+сравнивает RSS процесса до и после (в приросте есть и записи кэша Principal).
+Лимит открытых файлов поднимается до hard-лимита (нужно >= N + запас).
+"""
+import argparse
+import asyncio
+import json
+import resource
+
+from app.auth import create_access_token
+from benchmarks._common import run_server
+from benchmarks._ws import WSClient
+from benchmarks.ws_fanout import create_users, delete_users
+
+
+def rss_kib(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    raise RuntimeError("VmRSS не найден")
+
+
+async def open_connections(port: int, user_ids, parallel: int):
+    clients = []
+    semaphore = asyncio.Semaphore(parallel)
+
+    async def one(user_id):
+        async with semaphore:
+            token = create_access_token({"sub": str(user_id)})
+            clients.append(await WSClient.connect("127.0.0.1", port, f"/ws/notifications?token={token}"))
+
+    await asyncio.gather(*(one(user_id) for user_id in user_ids))
+    return clients
+
+
+async def run(args, pid: int, user_ids):
+    await asyncio.sleep(1.0)
+    before = rss_kib(pid)
+    clients = await open_connections(args.port, user_ids, args.parallel)
+    await asyncio.sleep(args.settle)
+    after = rss_kib(pid)
+    for client in clients:
+        client.writer.close()
+    return {
+        "connections": len(clients),
+        "rss_before_mib": round(before / 1024, 1),
+        "rss_after_mib": round(after / 1024, 1),
+        "kib_per_connection": round((after - before) / max(len(clients), 1), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--connections", type=int, default=10000)
+    parser.add_argument("--parallel", type=int, default=200)
+    parser.add_argument("--settle", type=float, default=3.0)
+    parser.add_argument("--port", type=int, default=8103)
+    args = parser.parse_args()
+
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+    # токен проверяется по версии в БД — нужны настоящие пользователи
+    user_ids = create_users(args.connections)
+    try:
+        with run_server("app.main:app", args.port, workers=1) as proc:
+            report = asyncio.run(run(args, proc.pid, user_ids))
+    finally:
+        delete_users(user_ids)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""baseline: схема ideabridge в том виде, в каком её создавал create_all при старте приложения
+
+Для уже существующей базы, созданной create_all:  alembic stamp 0001 && alembic upgrade head
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+SCHEMA = "ideabridge"
+
+
+def upgrade():
+    op.execute(f"CREATE SCHEMA IF NOT EXISTS {SCHEMA}")
+
+    op.create_table(
+        "users",
+        sa.Column("user_id", sa.Integer, primary_key=True),
+        sa.Column("full_name", sa.String(150), nullable=False),
+        sa.Column("email", sa.String(200), nullable=False, unique=True),
+        sa.Column("password_hash", sa.Text, nullable=False),
+        sa.Column("role", sa.String(20), nullable=False),
+        sa.Column("points", sa.Integer, nullable=False),
+        sa.Column("coins", sa.Integer, nullable=False),
+        sa.Column("department", sa.String(150)),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        schema=SCHEMA,
+    )
+    op.create_table(
+        "categories",
+        sa.Column("category_id", sa.Integer, primary_key=True),
+        sa.Column("name", sa.String(120), nullable=False, unique=True),
+        schema=SCHEMA,
+    )
+    op.create_table(
+        "ideas",
+        sa.Column("idea_id", sa.Integer, primary_key=True),
+        sa.Column("title", sa.String(300), nullable=False),
+        sa.Column("description", sa.Text, nullable=False),
+        sa.Column("author_id", sa.Integer, sa.ForeignKey(f"{SCHEMA}.users.user_id", ondelete="CASCADE"), nullable=False),
+        sa.Column("category_id", sa.Integer, sa.ForeignKey(f"{SCHEMA}.categories.category_id")),
+        sa.Column("status", sa.String(50), nullable=False),
+        sa.Column("ai_generated", sa.Boolean, nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        schema=SCHEMA,
+    )
+    op.create_table(
+        "idea_statuses",
+        sa.Column("status_id", sa.Integer, primary_key=True),
+        sa.Column("idea_id", sa.Integer, sa.ForeignKey(f"{SCHEMA}.ideas.idea_id", ondelete="CASCADE"), nullable=False),
+        sa.Column("expert_id", sa.Integer, sa.ForeignKey(f"{SCHEMA}.users.user_id")),
+        sa.Column("status", sa.String(80), nullable=False),
+        sa.Column("department", sa.String(150)),
+        sa.Column("need_type", sa.String(120)),
+        sa.Column("idea_type", sa.String(150)),
+        sa.Column("specialization", sa.String(200)),
+        sa.Column("time_frame", sa.String(80)),
+        sa.Column("budget_range", sa.String(120)),
+        sa.Column("level", sa.String(80)),
+        sa.Column("profit_estimation", sa.String(120)),
+        sa.Column("ai_scores", sa.JSON),
+        sa.Column("comment", sa.Text),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        schema=SCHEMA,
+    )
+    op.create_table(
+        "comments",
+        sa.Column("comment_id", sa.Integer, primary_key=True),
+        sa.Column("idea_id", sa.Integer, sa.ForeignKey(f"{SCHEMA}.ideas.idea_id", ondelete="CASCADE"), nullable=False),
+        sa.Column("user_id", sa.Integer, sa.ForeignKey(f"{SCHEMA}.users.user_id", ondelete="CASCADE"), nullable=False),
+        sa.Column("text", sa.Text, nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        schema=SCHEMA,
+    )
+    op.create_table(
+        "votes",
+        sa.Column("vote_id", sa.Integer, primary_key=True),
+        sa.Column("idea_id", sa.Integer, sa.ForeignKey(f"{SCHEMA}.ideas.idea_id", ondelete="CASCADE"), nullable=False),
+        sa.Column("user_id", sa.Integer, sa.ForeignKey(f"{SCHEMA}.users.user_id", ondelete="CASCADE"), nullable=False),
+        sa.Column("vote_type", sa.Boolean, nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.UniqueConstraint("idea_id", "user_id", name="uq_votes_idea_user"),
+        schema=SCHEMA,
+    )
+    op.create_table(
+        "rewards",
+        sa.Column("reward_id", sa.Integer, primary_key=True),
+        sa.Column("name", sa.String(200), nullable=False),
+        sa.Column("description", sa.Text),
+        sa.Column("image_url", sa.Text),
+        sa.Column("cost", sa.Integer, nullable=False),
+        sa.Column("stock", sa.Integer, nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        schema=SCHEMA,
+    )
+    op.create_table(
+        "reward_purchases",
+        sa.Column("purchase_id", sa.Integer, primary_key=True),
+        sa.Column("reward_id", sa.Integer, sa.ForeignKey(f"{SCHEMA}.rewards.reward_id"), nullable=False),
+        sa.Column("user_id", sa.Integer, sa.ForeignKey(f"{SCHEMA}.users.user_id"), nullable=False),
+        sa.Column("status", sa.String(30), nullable=False),
+        sa.Column("cost", sa.Integer, nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        schema=SCHEMA,
+    )
+    op.create_table(
+        "transactions",
+        sa.Column("transaction_id", sa.Integer, primary_key=True),
+        sa.Column("user_id", sa.Integer, sa.ForeignKey(f"{SCHEMA}.users.user_id", ondelete="CASCADE"), nullable=False),
+        sa.Column("type", sa.String(20), nullable=False),
+        sa.Column("amount", sa.Integer, nullable=False),
+        sa.Column("description", sa.Text),
+        sa.Column("related_type", sa.String(50)),
+        sa.Column("related_id", sa.Integer),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.UniqueConstraint("user_id", "type", "related_type", "related_id", name="uq_transactions_event"),
+        schema=SCHEMA,
+    )
+    op.create_table(
+        "points_rules",
+        sa.Column("rule_id", sa.Integer, primary_key=True),
+        sa.Column("action_key", sa.String, nullable=False, unique=True),
+        sa.Column("points_amount", sa.Integer),
+        sa.Column("coins_amount", sa.Integer),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        schema=SCHEMA,
+    )
+    op.create_index("ix_ideabridge_points_rules_rule_id", "points_rules", ["rule_id"], schema=SCHEMA)
+    op.create_table(
+        "points_log",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("user_id", sa.Integer, sa.ForeignKey(f"{SCHEMA}.users.user_id", ondelete="CASCADE")),
+        sa.Column("action", sa.String, nullable=False),
+        sa.Column("points", sa.Integer),
+        sa.Column("coins", sa.Integer),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        schema=SCHEMA,
+    )
+    op.create_index("ix_ideabridge_points_log_id", "points_log", ["id"], schema=SCHEMA)
+    op.create_table(
+        "achievements",
+        sa.Column("achievement_id", sa.Integer, primary_key=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("description", sa.Text),
+        sa.Column("condition_key", sa.String(100), nullable=False, unique=True),
+        sa.Column("reward_points", sa.Integer),
+        sa.Column("reward_coins", sa.Integer),
+        sa.Column("created_at", sa.DateTime, server_default=sa.func.now()),
+        schema=SCHEMA,
+    )
+    op.create_index("ix_ideabridge_achievements_achievement_id", "achievements", ["achievement_id"], schema=SCHEMA)
+    op.create_table(
+        "user_achievements",
+        sa.Column("user_id", sa.Integer, sa.ForeignKey(f"{SCHEMA}.users.user_id", ondelete="CASCADE"), primary_key=True),
+        sa.Column(
+            "achievement_id", sa.Integer,
+            sa.ForeignKey(f"{SCHEMA}.achievements.achievement_id", ondelete="CASCADE"), primary_key=True,
+        ),
+        sa.Column("received_at", sa.DateTime, server_default=sa.func.now()),
+        schema=SCHEMA,
+    )
+    op.create_table(
+        "notifications",
+        sa.Column("notification_id", sa.Integer, primary_key=True),
+        sa.Column("user_id", sa.Integer, sa.ForeignKey(f"{SCHEMA}.users.user_id", ondelete="CASCADE"), nullable=False),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("message", sa.Text, nullable=False),
+        sa.Column("is_read", sa.Boolean),
+        sa.Column("created_at", sa.DateTime, server_default=sa.func.now()),
+        schema=SCHEMA,
+    )
+    op.create_index("ix_ideabridge_notifications_notification_id", "notifications", ["notification_id"], schema=SCHEMA)
+
+
+def downgrade():
+    for table in (
+        "notifications", "user_achievements", "achievements", "points_log", "points_rules", "transactions",
+        "reward_purchases", "rewards", "votes", "comments", "idea_statuses", "ideas", "categories", "users",
+    ):
+        op.drop_table(table, schema=SCHEMA)
@@ -0,0 +1,25 @@
+"""индекс ленты идей для keyset-пагинации по (created_at, idea_id)
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+SCHEMA = "ideabridge"
+
+
+def upgrade():
+    op.create_index(
+        "ix_ideas_created_at_idea_id", "ideas", [sa.text("created_at DESC"), sa.text("idea_id DESC")], schema=SCHEMA
+    )
+
+
+def downgrade():
+    op.drop_index("ix_ideas_created_at_idea_id", table_name="ideas", schema=SCHEMA)
@@ -0,0 +1,35 @@
+"""счётчики активности пользователей (user_stats)
+
+После upgrade на существующих данных заполнить счётчики:
+    python -m app.cli reconcile-user-stats
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+SCHEMA = "ideabridge"
+
+
+def upgrade():
+    op.create_table(
+        "user_stats",
+        sa.Column("user_id", sa.Integer, sa.ForeignKey(f"{SCHEMA}.users.user_id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("ideas_count", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("comments_count", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("likes_received", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("votes_cast", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        schema=SCHEMA,
+    )
+
+
+def downgrade():
+    op.drop_table("user_stats", schema=SCHEMA)
@@ -0,0 +1,29 @@
+"""версии справочников для кэша каталога (cache_versions)
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+SCHEMA = "ideabridge"
+
+
+def upgrade():
+    op.create_table(
+        "cache_versions",
+        sa.Column("name", sa.String(50), primary_key=True),
+        sa.Column("version", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        schema=SCHEMA,
+    )
+
+
+def downgrade():
+    op.drop_table("cache_versions", schema=SCHEMA)
@@ -0,0 +1,39 @@
+"""transactional outbox: таблица outbox_events и индекс ожидающих событий
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+SCHEMA = "ideabridge"
+
+
+def upgrade():
+    op.create_table(
+        "outbox_events",
+        sa.Column("event_id", sa.BigInteger, primary_key=True),
+        sa.Column("event_type", sa.String(50), nullable=False),
+        sa.Column("payload", sa.JSON, nullable=False),
+        sa.Column("status", sa.String(20), nullable=False, server_default="pending"),
+        sa.Column("attempts", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("last_error", sa.Text),
+        sa.Column("available_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("processed_at", sa.DateTime(timezone=True)),
+        schema=SCHEMA,
+    )
+    op.create_index(
+        "ix_outbox_events_pending", "outbox_events", ["available_at", "event_id"],
+        postgresql_where=sa.text("status = 'pending'"), schema=SCHEMA,
+    )
+
+
+def downgrade():
+    op.drop_table("outbox_events", schema=SCHEMA)
@@ -0,0 +1,43 @@
+"""уведомления: is_read NOT NULL и индексы ленты и непрочитанных
+
+Индексы могли появиться раньше миграции у баз, которые поднимал create_all при старте
+приложения до перехода на Alembic, поэтому создаются через IF NOT EXISTS;
+SET NOT NULL / SET DEFAULT идемпотентны.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+SCHEMA = "ideabridge"
+
+
+def upgrade():
+    op.execute(f"UPDATE {SCHEMA}.notifications SET is_read = false WHERE is_read IS NULL")
+    op.alter_column(
+        "notifications", "is_read", existing_type=sa.Boolean, nullable=False, server_default=sa.false(), schema=SCHEMA
+    )
+    op.execute(f"""
+        CREATE INDEX IF NOT EXISTS ix_notifications_user_created
+        ON {SCHEMA}.notifications (user_id, created_at DESC, notification_id DESC)
+    """)
+    op.execute(f"""
+        CREATE INDEX IF NOT EXISTS ix_notifications_user_unread
+        ON {SCHEMA}.notifications (user_id, created_at DESC, notification_id DESC)
+        WHERE is_read = false
+    """)
+
+
+def downgrade():
+    op.drop_index("ix_notifications_user_unread", table_name="notifications", schema=SCHEMA)
+    op.drop_index("ix_notifications_user_created", table_name="notifications", schema=SCHEMA)
+    op.alter_column(
+        "notifications", "is_read", existing_type=sa.Boolean, nullable=True, server_default=None, schema=SCHEMA
+    )
@@ -0,0 +1,37 @@
+"""архив уведомлений, секционированный по месяцам created_at
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+SCHEMA = "ideabridge"
+
+
+def upgrade():
+    op.create_table(
+        "notifications_archive",
+        sa.Column("notification_id", sa.Integer, primary_key=True),
+        sa.Column("created_at", sa.DateTime, primary_key=True),
+        sa.Column("user_id", sa.Integer, sa.ForeignKey(f"{SCHEMA}.users.user_id", ondelete="CASCADE"), nullable=False),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("message", sa.Text, nullable=False),
+        sa.Column("is_read", sa.Boolean, nullable=False),
+        sa.Column("archived_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        schema=SCHEMA,
+        postgresql_partition_by="RANGE (created_at)",
+    )
+    op.create_index(
+        "ix_ideabridge_notifications_archive_user_id", "notifications_archive", ["user_id"], schema=SCHEMA
+    )
+
+
+def downgrade():
+    op.drop_table("notifications_archive", schema=SCHEMA)
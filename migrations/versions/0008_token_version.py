@@ -0,0 +1,25 @@
+"""версия токенов пользователя (users.token_version) для отзыва JWT
+
+Колонка могла появиться раньше миграции у баз, которые поднимал create_all при старте
+приложения до перехода на Alembic, поэтому добавляется через IF NOT EXISTS.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+SCHEMA = "ideabridge"
+
+
+def upgrade():
+    op.execute(f"ALTER TABLE {SCHEMA}.users ADD COLUMN IF NOT EXISTS token_version integer NOT NULL DEFAULT 0")
+
+
+def downgrade():
+    op.drop_column("users", "token_version", schema=SCHEMA)
@@ -0,0 +1,36 @@
+"""денормализованные счётчики голосов и комментариев идеи
+
+Колонки могли появиться раньше миграции у баз, которые поднимал create_all при старте
+приложения до перехода на Alembic, поэтому добавляются через IF NOT EXISTS;
+значения пересчитываются в любом случае.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+SCHEMA = "ideabridge"
+
+
+def upgrade():
+    op.execute(f"""
+        ALTER TABLE {SCHEMA}.ideas
+            ADD COLUMN IF NOT EXISTS vote_count integer NOT NULL DEFAULT 0,
+            ADD COLUMN IF NOT EXISTS comment_count integer NOT NULL DEFAULT 0
+    """)
+    op.execute(f"""
+        UPDATE {SCHEMA}.ideas i SET
+            vote_count = (SELECT count(*) FROM {SCHEMA}.votes v WHERE v.idea_id = i.idea_id),
+            comment_count = (SELECT count(*) FROM {SCHEMA}.comments c WHERE c.idea_id = i.idea_id)
+    """)
+
+
+def downgrade():
+    op.drop_column("ideas", "comment_count", schema=SCHEMA)
+    op.drop_column("ideas", "vote_count", schema=SCHEMA)
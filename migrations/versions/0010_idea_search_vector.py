@@ -0,0 +1,32 @@
+"""полнотекстовый поиск идей: вычисляемый search_vector и GIN-индекс
+
+Колонка и индекс могли появиться раньше миграции у баз, которые поднимал create_all
+при старте приложения до перехода на Alembic, поэтому создаются через IF NOT EXISTS.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+SCHEMA = "ideabridge"
+
+
+def upgrade():
+    op.execute(f"""
+        ALTER TABLE {SCHEMA}.ideas ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('russian', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('russian', coalesce(description, '')), 'B')
+        ) STORED
+    """)
+    op.execute(f"CREATE INDEX IF NOT EXISTS ix_ideas_search_vector ON {SCHEMA}.ideas USING gin (search_vector)")
+
+
+def downgrade():
+    op.drop_index("ix_ideas_search_vector", table_name="ideas", schema=SCHEMA)
+    op.drop_column("ideas", "search_vector", schema=SCHEMA)
@@ -0,0 +1,32 @@
+"""MinHash-подписи идей для поиска похожих (idea_signatures)
+
+После upgrade на существующих данных посчитать подписи:
+    python -m app.cli backfill-similarity
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+SCHEMA = "ideabridge"
+
+
+def upgrade():
+    op.create_table(
+        "idea_signatures",
+        sa.Column("idea_id", sa.Integer, sa.ForeignKey(f"{SCHEMA}.ideas.idea_id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("params", sa.String(50), nullable=False),
+        sa.Column("signature", sa.LargeBinary, nullable=False),
+        schema=SCHEMA,
+    )
+
+
+def downgrade():
+    op.drop_table("idea_signatures", schema=SCHEMA)
@@ -0,0 +1,42 @@
+"""админ-статистика: шардированные system_counters и суточный rollup daily_activity
+
+После upgrade на существующих данных заполнить счётчики:
+    python -m app.cli reconcile-system-counters
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0012"
+down_revision = "0011"
+branch_labels = None
+depends_on = None
+
+SCHEMA = "ideabridge"
+
+
+def upgrade():
+    op.create_table(
+        "system_counters",
+        sa.Column("name", sa.String(50), primary_key=True),
+        sa.Column("shard", sa.Integer, primary_key=True),
+        sa.Column("value", sa.BigInteger, nullable=False, server_default="0"),
+        schema=SCHEMA,
+    )
+    op.create_table(
+        "daily_activity",
+        sa.Column("day", sa.Date, primary_key=True),
+        sa.Column("shard", sa.Integer, primary_key=True),
+        sa.Column("ideas", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("votes", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("comments", sa.Integer, nullable=False, server_default="0"),
+        schema=SCHEMA,
+    )
+
+
+def downgrade():
+    op.drop_table("daily_activity", schema=SCHEMA)
+    op.drop_table("system_counters", schema=SCHEMA)
@@ -0,0 +1,30 @@
+"""участники команды идеи (idea_team_members)
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0013"
+down_revision = "0012"
+branch_labels = None
+depends_on = None
+
+SCHEMA = "ideabridge"
+
+
+def upgrade():
+    # таблица участников раньше создавалась вне приложения — может уже существовать
+    op.execute(f"""
+        CREATE TABLE IF NOT EXISTS {SCHEMA}.idea_team_members (
+            idea_id integer NOT NULL REFERENCES {SCHEMA}.ideas (idea_id) ON DELETE CASCADE,
+            user_id integer NOT NULL REFERENCES {SCHEMA}.users (user_id) ON DELETE CASCADE,
+            is_primary boolean NOT NULL DEFAULT false,
+            PRIMARY KEY (idea_id, user_id)
+        )
+    """)
+
+
+def downgrade():
+    op.drop_table("idea_team_members", schema=SCHEMA)
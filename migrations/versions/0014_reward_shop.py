@@ -0,0 +1,36 @@
+"""магазин наград: CHECK на остаток и монеты, индекс покупок пользователя
+
+CHECK-ограничения создаются NOT VALID: проверяются для новых и изменённых строк,
+без полного прохода по users под блокировкой. Проверить старые строки отдельно:
+    ALTER TABLE ideabridge.users VALIDATE CONSTRAINT ck_users_coins_non_negative;
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0014"
+down_revision = "0013"
+branch_labels = None
+depends_on = None
+
+SCHEMA = "ideabridge"
+
+
+def upgrade():
+    op.execute(
+        f"ALTER TABLE {SCHEMA}.rewards ADD CONSTRAINT ck_rewards_stock_non_negative CHECK (stock >= 0) NOT VALID"
+    )
+    op.execute(
+        f"ALTER TABLE {SCHEMA}.users ADD CONSTRAINT ck_users_coins_non_negative CHECK (coins >= 0) NOT VALID"
+    )
+    op.create_index(
+        "ix_reward_purchases_user_reward", "reward_purchases", ["user_id", "reward_id"], schema=SCHEMA
+    )
+
+
+def downgrade():
+    op.drop_index("ix_reward_purchases_user_reward", table_name="reward_purchases", schema=SCHEMA)
+    op.drop_constraint("ck_users_coins_non_negative", "users", schema=SCHEMA)
+    op.drop_constraint("ck_rewards_stock_non_negative", "rewards", schema=SCHEMA)
@@ -0,0 +1,30 @@
+"""покупки наград удаляются вместе с пользователем (reward_purchases.user_id ON DELETE CASCADE)
+
+Revision ID: 0015
+Revises: 0014
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0015"
+down_revision = "0014"
+branch_labels = None
+depends_on = None
+
+SCHEMA = "ideabridge"
+
+
+def _recreate_user_fk(ondelete):
+    op.drop_constraint("reward_purchases_user_id_fkey", "reward_purchases", schema=SCHEMA)
+    op.create_foreign_key(
+        "reward_purchases_user_id_fkey", "reward_purchases", "users", ["user_id"], ["user_id"],
+        source_schema=SCHEMA, referent_schema=SCHEMA, ondelete=ondelete,
+    )
+
+
+def upgrade():
+    _recreate_user_fk("CASCADE")
+
+
+def downgrade():
+    _recreate_user_fk(None)
@@ -0,0 +1,40 @@
+"""идемпотентность покупок по ключу клиента: transactions.related_id BIGINT, reward_purchases.transaction_id
+
+related_id хранит 64-битный хэш Idempotency-Key. ALTER TYPE integer -> bigint
+перезаписывает transactions под эксклюзивной блокировкой — выполнять в окно обслуживания.
+
+Revision ID: 0016
+Revises: 0015
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0016"
+down_revision = "0015"
+branch_labels = None
+depends_on = None
+
+SCHEMA = "ideabridge"
+
+
+def upgrade():
+    op.alter_column("transactions", "related_id", type_=sa.BigInteger, existing_type=sa.Integer, schema=SCHEMA)
+    op.add_column(
+        "reward_purchases",
+        sa.Column(
+            "transaction_id", sa.Integer,
+            sa.ForeignKey(f"{SCHEMA}.transactions.transaction_id", ondelete="SET NULL"),
+        ),
+        schema=SCHEMA,
+    )
+    op.create_unique_constraint(
+        "reward_purchases_transaction_id_key", "reward_purchases", ["transaction_id"], schema=SCHEMA
+    )
+
+
+def downgrade():
+    op.drop_column("reward_purchases", "transaction_id", schema=SCHEMA)
+    # хэши ключей в int не помещаются
+    op.execute(f"UPDATE {SCHEMA}.transactions SET related_id = NULL WHERE related_type = 'reward_purchase'")
+    op.alter_column("transactions", "related_id", type_=sa.Integer, existing_type=sa.BigInteger, schema=SCHEMA)
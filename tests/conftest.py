@@ -0,0 +1,74 @@
+"""
+Общие фикстуры. Тесты, которым нужна БД, идут против отдельной базы из TEST_DATABASE_URL:
+её схема поднимается alembic upgrade head, перед каждым тестом таблицы очищаются.
+Без TEST_DATABASE_URL такие тесты пропускаются.
+
+    TEST_DATABASE_URL=postgresql://postgres@localhost/ideabridge_test python -m pytest
+"""
+import os
+import uuid
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# настройки читаются при импорте app — подменяем окружение до него
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+if TEST_DATABASE_URL:
+    os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+    os.environ["DATABASE_URL_LOCAL"] = TEST_DATABASE_URL
+os.environ.setdefault("DATABASE_URL", "postgresql://localhost/ideabridge_test")
+os.environ.setdefault("DATABASE_URL_LOCAL", os.environ["DATABASE_URL"])
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+
+@pytest.fixture(scope="session")
+def database():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL не задан")
+    from alembic import command
+    from alembic.config import Config
+
+    # без alembic.ini: его fileConfig отключил бы логгеры приложения, которые проверяют тесты
+    config = Config()
+    config.set_main_option("script_location", os.path.join(ROOT, "migrations"))
+    command.upgrade(config, "head")
+    return TEST_DATABASE_URL
+
+
+@pytest.fixture
+def db(database):
+    from sqlalchemy import text
+    from app.database import SessionLocal
+    from app.models import Base
+
+    session = SessionLocal()
+    # без RESTART IDENTITY: id не повторяются, in-process кэши процесса не видят чужих записей
+    tables = ", ".join(table.fullname for table in Base.metadata.sorted_tables)
+    session.execute(text(f"TRUNCATE {tables} CASCADE"))
+    session.commit()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def make_user(db):
+    """Фабрика пользователей: make_user(coins=100) -> (User, токен)"""
+    from app import models
+    from app.auth import create_user_token
+
+    def _make_user(**fields):
+        suffix = uuid.uuid4().hex[:12]
+        user = models.User(
+            full_name=fields.pop("full_name", f"test {suffix}"),
+            email=fields.pop("email", f"{suffix}@test.local"),
+            password_hash="-",
+            **fields,
+        )
+        db.add(user)
+        db.commit()
+        return user, create_user_token(user)
+
+    return _make_user
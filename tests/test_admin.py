@@ -0,0 +1,37 @@
+from fastapi.testclient import TestClient
+
+from app import models
+from app.database import async_engine
+from app.main import app
+from app.routers.admin import delete_user
+from app.services.principal_cache import Principal
+
+
+def _principal(user: models.User) -> Principal:
+    return Principal(
+        user_id=user.user_id, email=user.email, full_name=user.full_name,
+        role=user.role, department=user.department, token_version=user.token_version,
+    )
+
+
+def test_delete_user_drops_cached_idea_responses(db, make_user):
+    admin, _ = make_user(role="admin")
+    author, _ = make_user()
+    idea = models.Idea(title="удаляемая идея", description="описание", author_id=author.user_id)
+    db.add(idea)
+    db.commit()
+    db.add(models.IdeaStatus(idea_id=idea.idea_id, status="new", expert_id=admin.user_id))
+    db.commit()
+
+    history = f"/ideas/{idea.idea_id}/history"
+    with TestClient(app) as client:
+        # прогреваем кэш ответов
+        assert [i["idea_id"] for i in client.get("/ideas/").json()["items"]] == [idea.idea_id]
+        assert len(client.get(history).json()) == 1
+
+        delete_user(author.user_id, db, _principal(admin))
+
+        assert client.get("/ideas/").json()["items"] == []
+        assert client.get(history).json() == []
+        # соединения asyncpg привязаны к event loop клиента — закрываем их в нём же
+        client.portal.call(async_engine.dispose)
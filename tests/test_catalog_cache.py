@@ -0,0 +1,61 @@
+import threading
+
+from app import models
+from app.services.catalog_cache import CatalogCache
+
+
+class BlockingSession:
+    """Сессия, чей запрос к БД ждёт release — имитирует медленный ответ"""
+
+    def __init__(self, db):
+        self.db = db
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def execute(self, *args, **kwargs):
+        self.started.set()
+        assert self.release.wait(5)
+        return self.db.execute(*args, **kwargs)
+
+
+def _bump(db, cache, **rule):
+    db.add(models.PointsRule(**rule))
+    cache.bump_version(db)
+    db.commit()
+
+
+def test_reload_on_version_change(db):
+    cache = CatalogCache(check_interval=0)
+    assert cache.rules(db) == {}
+    _bump(db, cache, action_key="vote", points_amount=2, coins_amount=1)
+    assert cache.rules(db)["vote"].points_amount == 2
+
+
+def test_readers_are_not_blocked_by_refresh(db):
+    cache = CatalogCache(check_interval=3600)
+    _bump(db, cache, action_key="vote", points_amount=2, coins_amount=1)
+    cache.rules(db)
+    cache._checked_at = float("-inf")
+
+    slow = BlockingSession(db)
+    refresh = threading.Thread(target=cache.rules, args=(slow,))
+    refresh.start()
+    try:
+        assert slow.started.wait(5)
+        # проверку версии ведёт другой поток — читатель получает текущий снимок без БД
+        assert cache.rules(None)["vote"].points_amount == 2
+    finally:
+        slow.release.set()
+        refresh.join()
+
+
+def test_load_started_before_clear_is_not_kept(db):
+    cache = CatalogCache(check_interval=3600)
+    slow = BlockingSession(db)
+    loader = threading.Thread(target=cache.rules, args=(slow,))
+    loader.start()
+    assert slow.started.wait(5)
+    cache.clear()
+    slow.release.set()
+    loader.join()
+    assert cache._snapshot is None
@@ -0,0 +1,91 @@
+import asyncio
+import json
+import logging
+
+from app.services.connection_manager import ConnectionManager
+from app.services.pubsub import PgListener
+
+
+class FakeWebSocket:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.sent = []
+        self.closed = None
+
+    async def send_text(self, text: str):
+        if self.fail:
+            raise ConnectionError("обрыв")
+        self.sent.append(json.loads(text))
+
+    async def close(self, code: int):
+        self.closed = code
+
+
+def test_burst_is_sent_as_one_frame_and_task_is_released():
+    async def scenario():
+        manager = ConnectionManager(queue_size=10, batch_window=0.01, send_timeout=1)
+        websocket = FakeWebSocket()
+        manager.connect(websocket, user_id=1)
+        for i in range(3):
+            manager.send(1, {"id": i})
+        assert len(manager._tasks) == 1
+        await asyncio.gather(*manager._tasks)
+        await asyncio.sleep(0)
+        assert websocket.sent == [[{"id": 0}, {"id": 1}, {"id": 2}]]
+        assert not manager._tasks
+
+    asyncio.run(scenario())
+
+
+def test_failed_send_closes_session():
+    async def scenario():
+        manager = ConnectionManager(queue_size=10, batch_window=0, send_timeout=1)
+        websocket = FakeWebSocket(fail=True)
+        manager.connect(websocket, user_id=1)
+        manager.send(1, {"id": 1})
+        await asyncio.gather(*manager._tasks)
+        await asyncio.sleep(0)
+        assert websocket.closed == 1011
+        assert manager.connection_count == 0
+        assert not manager._tasks
+
+    asyncio.run(scenario())
+
+
+def test_stop_cancels_pending_sends():
+    async def scenario():
+        manager = ConnectionManager(queue_size=10, batch_window=60, send_timeout=1)
+        websocket = FakeWebSocket()
+        manager.connect(websocket, user_id=1)
+        manager.send(1, {"id": 1})
+        await manager.stop()
+        assert not manager._tasks
+        assert websocket.sent == []
+        assert websocket.closed == 1001
+
+    asyncio.run(scenario())
+
+
+def test_listener_keeps_and_releases_handler_tasks(caplog):
+    received = []
+
+    async def ok(data):
+        received.append(data)
+
+    async def broken(data):
+        raise RuntimeError("сломан")
+
+    async def scenario():
+        listener = PgListener("postgresql://unused")
+        listener.subscribe("chan", ok)
+        listener.subscribe("chan", broken)
+        listener._on_message(None, 0, "chan", '{"x": 1}')
+        assert len(listener._dispatching) == 2
+        await asyncio.gather(*listener._dispatching)
+        await asyncio.sleep(0)
+        assert not listener._dispatching
+
+    with caplog.at_level(logging.ERROR):
+        asyncio.run(scenario())
+    assert received == [{"x": 1}]
+    assert "Ошибка обработчика pub/sub" in caplog.text
@@ -0,0 +1,36 @@
+import json
+
+from sqlalchemy import select
+
+from app import models
+from app.services.idea_import import IdeaImporter
+
+
+def _ndjson(rows):
+    return [json.dumps(row, ensure_ascii=False) + "\n" for row in rows]
+
+
+def test_failed_batch_is_rolled_back_and_reported(db, make_user):
+    author, _ = make_user()
+    rows = [{"title": f"идея {i}", "description": "описание", "author_id": author.user_id} for i in range(6)]
+    # NUL недопустим в тексте Postgres — COPY второй пачки падает
+    rows[3]["description"] = "сломано\x00"
+    rows[4]["author_id"] = 10 ** 9
+
+    report = IdeaImporter(db, batch_size=3).run(_ndjson(rows), "ndjson").as_dict()
+
+    assert report["rows_read"] == 6
+    assert report["imported"] == 3
+    assert report["batches"] == 1
+    assert report["rejected"] == 1
+    assert report["errors"] == [{"line": 5, "error": "автор не найден"}]
+    assert report["failed"] == 2
+    [failed] = report["failed_batches"]
+    assert (failed["first_line"], failed["last_line"], failed["rows"]) == (4, 6, 2)
+    assert failed["error"]
+
+    titles = set(db.execute(select(models.Idea.title)).scalars())
+    assert titles == {"идея 0", "идея 1", "идея 2"}
+    assert db.execute(
+        select(models.UserStats.ideas_count).where(models.UserStats.user_id == author.user_id)
+    ).scalar() == 3
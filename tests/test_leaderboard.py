@@ -0,0 +1,60 @@
+from app.services.leaderboard import Leaderboard
+
+
+class MessageDuringSnapshot:
+    """Сессия, во время SELECT которой приходит сообщение pub/sub с новыми очками"""
+
+    def __init__(self, db, on_execute):
+        self.db = db
+        self.on_execute = on_execute
+
+    def execute(self, *args, **kwargs):
+        result = self.db.execute(*args, **kwargs).all()
+        self.on_execute()
+        return _Rows(result)
+
+
+class _Rows:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+
+def test_reconcile_fixes_drift_and_removes_deleted(db, make_user):
+    alice, _ = make_user(points=30)
+    bob, _ = make_user(points=10)
+    board = Leaderboard(reconcile_interval=60, apply_batch=1)
+    assert board.reconcile(db) == 2
+
+    board.update(bob.user_id, 50, bob.full_name, None)
+    board.update(10 ** 9, 5, "удалён", None)
+    assert board.rank(bob.user_id) == 1
+
+    assert board.reconcile(db) == 2
+    assert board.get(bob.user_id).points == 10
+    assert board.get(10 ** 9) is None
+    assert board.rank(alice.user_id) == 1
+    assert board.reconcile(db) == 0
+
+
+def test_reconcile_keeps_updates_newer_than_snapshot(db, make_user):
+    alice, _ = make_user(points=30)
+    board = Leaderboard(reconcile_interval=60)
+    board.reconcile(db)
+
+    newcomer = 10 ** 9
+
+    def message():
+        board.update(alice.user_id, 80, alice.full_name, None)
+        board.update(newcomer, 5, "новый", None)
+
+    assert board.reconcile(MessageDuringSnapshot(db, message)) == 0
+    assert board.get(alice.user_id).points == 80
+    assert board.get(newcomer).points == 5
+
+    # следующая сверка уже видит состояние БД
+    assert board.reconcile(db) == 2
+    assert board.get(alice.user_id).points == 30
+    assert board.get(newcomer) is None
@@ -0,0 +1,24 @@
+import asyncio
+import os
+import signal
+
+from app.services.password_hasher import PasswordHasher
+
+
+def test_pool_is_recreated_after_worker_dies():
+    async def scenario():
+        hasher = PasswordHasher(workers=1, max_pending=4)
+        hasher.start()
+        try:
+            executor = hasher._executor
+            worker = await hasher._submit(os.getpid)
+            os.kill(worker, signal.SIGKILL)
+            # пул ломается, операция повторяется в новом пуле
+            assert await hasher._submit(os.getpid) != worker
+            assert hasher._executor is not executor
+            assert hasher.pending == 0
+        finally:
+            hasher.shutdown()
+        assert hasher._executor is None
+
+    asyncio.run(scenario())
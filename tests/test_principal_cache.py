@@ -0,0 +1,44 @@
+from app.services.principal_cache import Principal, PrincipalCache
+
+
+class InvalidatedDuringRead:
+    """Сессия, во время чтения которой другой запрос меняет пользователя и сбрасывает кэш"""
+
+    def __init__(self, db, cache, user_id):
+        self.db = db
+        self.cache = cache
+        self.user_id = user_id
+
+    def execute(self, *args, **kwargs):
+        result = self.db.execute(*args, **kwargs)
+        self.cache.invalidate(self.user_id)
+        return result
+
+
+def test_load_caches_principal(db, make_user):
+    user, _ = make_user()
+    cache = PrincipalCache(max_size=10, ttl=60)
+    principal = cache.load(db, user.user_id)
+    assert principal.email == user.email
+    assert cache.get(user.user_id) == principal
+
+
+def test_load_racing_invalidate_does_not_cache_stale_entry(db, make_user):
+    user, _ = make_user()
+    cache = PrincipalCache(max_size=10, ttl=60)
+    principal = cache.load(InvalidatedDuringRead(db, cache, user.user_id), user.user_id)
+    # результат можно вернуть вызывающему, но в кэш он не попадает
+    assert principal.user_id == user.user_id
+    assert cache.get(user.user_id) is None
+    assert cache.load(db, user.user_id) == cache.get(user.user_id)
+
+
+def test_put_without_generation_always_caches():
+    cache = PrincipalCache(max_size=1, ttl=60)
+    stale = cache.generation
+    cache.invalidate(1)
+    principal = Principal(1, "a@b", "a", "user", None, 0)
+    cache.put(principal, stale)
+    assert cache.get(1) is None
+    cache.put(principal)
+    assert cache.get(1) == principal
@@ -0,0 +1,189 @@
+"""
+Бюджет SQL на эндпоинт: запросы считаются listener'ом before_cursor_execute на обоих
+движках (sync и async), COMMIT — событием commit. Каждое действие — один commit.
+"""
+import time
+from contextlib import contextmanager
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app import models
+from app.database import SessionLocal, async_engine, engine
+from app.lifecycle import warm_up_state
+from app.main import app
+from app.services.catalog_cache import catalog_cache
+from app.services.outbox_service import OutboxProcessor
+from app.services.response_cache import response_cache
+
+# максимум SQL-запросов на одно действие; рост сверх бюджета — регрессия
+BUDGETS = {
+    "create_idea": 10,
+    "comment": 8,
+    "vote": 8,
+    "unvote": 6,
+    # не зависит от числа голосов в пакете
+    "vote_batch": 7,
+    # разбор outbox: на событие, вместе с выборкой пачки
+    "outbox_event": 13,
+}
+
+
+class StatementCounter:
+    def __init__(self):
+        self.statements = []
+        self.commits = 0
+
+    @property
+    def selects(self) -> int:
+        return sum(1 for s in self.statements if s.lstrip().upper().startswith(("SELECT", "WITH")))
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def _on_commit(self, conn):
+        self.commits += 1
+
+    @contextmanager
+    def attached(self):
+        engines = (engine, async_engine.sync_engine)
+        for target in engines:
+            event.listen(target, "before_cursor_execute", self._on_execute)
+            event.listen(target, "commit", self._on_commit)
+        try:
+            yield self
+        finally:
+            for target in engines:
+                event.remove(target, "before_cursor_execute", self._on_execute)
+                event.remove(target, "commit", self._on_commit)
+
+
+@contextmanager
+def counting():
+    counter = StatementCounter()
+    with counter.attached():
+        yield counter
+
+
+@pytest.fixture(scope="module")
+def client(database):
+    with TestClient(app) as client:
+        # фоновый прогрев тоже ходит в БД — ждём его, чтобы не считать чужие запросы
+        deadline = time.monotonic() + 30
+        while not warm_up_state.ready and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert warm_up_state.ready, warm_up_state.as_dict()
+        yield client
+
+
+@pytest.fixture
+def users(db, make_user, client):
+    author, author_token = make_user()
+    voter, voter_token = make_user()
+    # principal попадает в кэш до замеров
+    for token in (author_token, voter_token):
+        assert client.get("/ideas/protected", headers={"Authorization": f"Bearer {token}"}).status_code == 200
+    return {"author": author_token, "voter": voter_token}
+
+
+def _auth(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _create_idea(client, token: str, title: str = "Идея для замера") -> int:
+    response = client.post("/ideas/create", json={"title": title, "description": "описание"}, headers=_auth(token))
+    assert response.status_code == 200, response.text
+    return response.json()["idea_id"]
+
+
+def test_create_idea(client, users):
+    with counting() as counter:
+        _create_idea(client, users["author"])
+    assert counter.commits == 1
+    assert len(counter.statements) <= BUDGETS["create_idea"]
+
+
+def test_comment(client, users):
+    idea_id = _create_idea(client, users["author"])
+    with counting() as counter:
+        response = client.post(
+            f"/ideas/{idea_id}/comment", json={"idea_id": idea_id, "user_id": 0, "text": "комментарий"},
+            headers=_auth(users["voter"]),
+        )
+    assert response.status_code == 200, response.text
+    assert counter.commits == 1
+    assert len(counter.statements) <= BUDGETS["comment"]
+
+
+def test_vote_toggle(client, users):
+    idea_id = _create_idea(client, users["author"])
+    for action, expected in (("vote", "Голос принят"), ("unvote", "Голос удалён")):
+        with counting() as counter:
+            response = client.post(f"/ideas/{idea_id}/vote", headers=_auth(users["voter"]))
+        assert response.json()["message"] == expected
+        assert counter.commits == 1
+        assert len(counter.statements) <= BUDGETS[action]
+
+
+def test_vote_batch(client, users):
+    idea_ids = [_create_idea(client, users["author"], f"Идея {i}") for i in range(10)]
+    with counting() as counter:
+        response = client.post(
+            "/ideas/votes:batch", json={"votes": [{"idea_id": i, "vote": True} for i in idea_ids]},
+            headers=_auth(users["voter"]),
+        )
+    assert response.json()["added"] == sorted(idea_ids)
+    assert counter.commits == 1
+    assert len(counter.statements) <= BUDGETS["vote_batch"]
+
+
+def test_feed_is_one_select_per_page(client, users, monkeypatch):
+    """Лента со счётчиками голосов и комментариев — один SELECT на страницу, без N+1"""
+    idea_ids = [_create_idea(client, users["author"], f"Идея {i}") for i in range(25)]
+    client.post(
+        "/ideas/votes:batch", json={"votes": [{"idea_id": i, "vote": True} for i in idea_ids]},
+        headers=_auth(users["voter"]),
+    )
+    monkeypatch.setattr(response_cache, "enabled", False)
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        with counting() as counter:
+            response = client.get("/ideas/", params={"limit": 10, **({"cursor": cursor} if cursor else {})})
+        page = response.json()
+        assert response.status_code == 200, page
+        assert len(counter.statements) == counter.selects == 1, counter.statements
+        assert all(item["vote_count"] == 1 for item in page["items"])
+        seen += [item["idea_id"] for item in page["items"]]
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert pages == 3
+    assert sorted(seen) == sorted(idea_ids)
+
+
+def test_reward_pipeline(client, users, db):
+    """Очки, достижения и уведомления по событиям outbox — одна транзакция на пачку"""
+    db.add_all(
+        [models.PointsRule(action_key=key, points_amount=10, coins_amount=1)
+         for key in ("create_idea", "idea_like", "vote", "comment_received", "comment_add")]
+        + [models.Achievement(name="Первая идея", condition_key="first_idea", reward_points=5, reward_coins=5)]
+    )
+    catalog_cache.bump_version(db)
+    db.commit()
+    catalog_cache.clear()
+
+    idea_id = _create_idea(client, users["author"])
+    client.post(f"/ideas/{idea_id}/vote", headers=_auth(users["voter"]))
+    client.post(
+        f"/ideas/{idea_id}/comment", json={"idea_id": idea_id, "user_id": 0, "text": "комментарий"},
+        headers=_auth(users["voter"]),
+    )
+    with counting() as counter:
+        processed = OutboxProcessor(SessionLocal).drain_once()
+    assert processed == 3
+    assert counter.commits == 1
+    assert len(counter.statements) <= BUDGETS["outbox_event"] * processed
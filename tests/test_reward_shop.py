@@ -0,0 +1,105 @@
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func, select
+
+from app import models
+from app.database import SessionLocal
+from app.routers.admin import delete_user
+from app.services.principal_cache import Principal
+from app.services.reward_shop import RewardShopService
+
+COST = 10
+
+
+@pytest.fixture
+def reward(db):
+    def _reward(stock: int, cost: int = COST):
+        reward = models.Reward(name=f"merch {uuid.uuid4().hex[:8]}", cost=cost, stock=stock)
+        db.add(reward)
+        db.commit()
+        return reward.reward_id
+
+    return _reward
+
+
+def _buy(user_id: int, reward_id: int, key=None):
+    session = SessionLocal()
+    try:
+        return RewardShopService(session).purchase(user_id, reward_id, key)
+    except HTTPException as e:
+        return e.status_code
+    finally:
+        session.close()
+
+
+def test_parallel_buyers_never_oversell(db, make_user, reward):
+    stock, buyers = 5, 20
+    reward_id = reward(stock)
+    # у каждого четвёртого монет не хватает
+    users = [make_user(coins=COST - 1 if i % 4 == 0 else COST * 2)[0] for i in range(buyers)]
+    initial_coins = {user.user_id: user.coins for user in users}
+    start = threading.Barrier(buyers)
+
+    def buy(user_id):
+        start.wait()
+        # повтор с тем же ключом не должен привести ко второй покупке
+        key = str(uuid.uuid4())
+        return [_buy(user_id, reward_id, key) for _ in range(2)]
+
+    with ThreadPoolExecutor(max_workers=buyers) as pool:
+        results = list(pool.map(buy, initial_coins))
+
+    assert all(isinstance(r, dict) or r == 409 for attempts in results for r in attempts)
+    db.expire_all()
+    stock_left = db.execute(select(models.Reward.stock).where(models.Reward.reward_id == reward_id)).scalar_one()
+    purchases = dict(db.execute(
+        select(models.RewardPurchase.user_id, func.count())
+        .where(models.RewardPurchase.reward_id == reward_id)
+        .group_by(models.RewardPurchase.user_id)
+    ).all())
+    coins = dict(db.execute(
+        select(models.User.user_id, models.User.coins).where(models.User.user_id.in_(list(initial_coins)))
+    ).all())
+
+    assert stock_left == 0
+    assert sum(purchases.values()) == stock
+    assert all(n == 1 for n in purchases.values())
+    assert all(value >= 0 for value in coins.values())
+    assert all(initial_coins[u] - coins[u] == COST * purchases.get(u, 0) for u in initial_coins)
+    assert not {u for u, c in initial_coins.items() if c < COST} & set(purchases)
+
+
+def test_idempotency_key_returns_existing_purchase(db, make_user, reward):
+    user, _ = make_user(coins=COST * 3)
+    reward_id = reward(5)
+
+    first = _buy(user.user_id, reward_id, "order-1")
+    retry = _buy(user.user_id, reward_id, "order-1")
+    second = _buy(user.user_id, reward_id, "order-2")
+    without_key = _buy(user.user_id, reward_id)
+
+    assert retry == {**first, "already_purchased": True}
+    assert second["purchase_id"] != first["purchase_id"]
+    assert without_key["purchase_id"] not in (first["purchase_id"], second["purchase_id"])
+    assert without_key["coins_left"] == 0
+    assert _buy(user.user_id, reward(5), "order-1") == 422
+
+
+def test_user_with_purchases_can_be_deleted(db, make_user, reward):
+    admin, _ = make_user(role="admin")
+    buyer, _ = make_user(coins=COST)
+    assert isinstance(_buy(buyer.user_id, reward(1), "order-1"), dict)
+
+    principal = Principal(
+        user_id=admin.user_id, email=admin.email, full_name=admin.full_name,
+        role=admin.role, department=admin.department, token_version=admin.token_version,
+    )
+    delete_user(buyer.user_id, db, principal)
+
+    assert db.execute(
+        select(func.count()).select_from(models.RewardPurchase).where(models.RewardPurchase.user_id == buyer.user_id)
+    ).scalar_one() == 0
@@ -0,0 +1,28 @@
+from app import crud, models
+
+
+def test_keyset_pages_cover_results_exactly_once(db, make_user):
+    author, _ = make_user()
+    # разная частота слова даёт разные ранги, повторы — одинаковые (связи по idea_id)
+    db.add_all([
+        models.Idea(
+            title=f"идея {i}",
+            description=" ".join(["инновация"] * (i % 7 + 1) + ["прочее слово"] * (i % 5)),
+            author_id=author.user_id,
+        )
+        for i in range(40)
+    ])
+    db.commit()
+
+    everything, cursor = crud.search_ideas(db, "инновация", limit=100)
+    assert cursor is None and len(everything) == 40
+    expected = [idea.idea_id for idea, _ in everything]
+
+    seen, cursor = [], None
+    # потолок страниц: курсор, не сдвигающий выдачу, зациклил бы тест
+    for _ in range(len(expected)):
+        rows, cursor = crud.search_ideas(db, "инновация", cursor=cursor, limit=3)
+        seen.extend(idea.idea_id for idea, _ in rows)
+        if cursor is None:
+            break
+    assert seen == expected
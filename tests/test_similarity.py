@@ -0,0 +1,117 @@
+import random
+
+import numpy as np
+import pytest
+
+from app import models
+from app.database import SessionLocal
+from app.services.similarity import MinHasher, SimilarityIndex, idea_text
+from app.settings import settings
+from benchmarks.fts_search import WORDS
+
+IDEAS = 500
+
+
+def _index() -> SimilarityIndex:
+    hasher = MinHasher(settings.SIMILARITY_NUM_PERM, settings.SIMILARITY_SHINGLE_SIZE, settings.SIMILARITY_SEED)
+    return SimilarityIndex(hasher, settings.SIMILARITY_BANDS, settings.SIMILARITY_THRESHOLD)
+
+
+def _text(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 40)))
+
+
+def _paraphrase(text: str, rng: random.Random) -> str:
+    """Повторная подача с правками: ~10% слов заменены"""
+    words = text.split()
+    for _ in range(max(1, len(words) // 10)):
+        words[rng.randrange(len(words))] = rng.choice(WORDS)
+    return " ".join(words)
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    rng = random.Random(7)
+    texts = [_text(rng) for _ in range(IDEAS)]
+    index = _index()
+    for idea_id, signature in enumerate(index.hasher.signatures(texts)):
+        index.add(idea_id, signature)
+    return index, texts
+
+
+def test_batch_signatures_match_single(corpus):
+    index, texts = corpus
+    batch = index.hasher.signatures(texts[:20], chunk=7)
+    for text, signature in zip(texts, batch):
+        assert np.array_equal(signature, index.hasher.signature(text))
+
+
+def test_near_duplicates_are_found(corpus):
+    index, texts = corpus
+    rng = random.Random(11)
+    targets = rng.sample(range(IDEAS), 50)
+    found = 0
+    for target in targets:
+        hits = index.query(index.hasher.signature(_paraphrase(texts[target], rng)))
+        found += any(idea_id == target for idea_id, _ in hits)
+    assert found / len(targets) >= 0.9
+
+
+def test_exact_text_scores_one(corpus):
+    index, texts = corpus
+    hits = index.query(index.hasher.signature(texts[3]))
+    assert hits[0] == (3, 1.0)
+
+
+def test_unrelated_texts_do_not_match(corpus):
+    index, _ = corpus
+    unrelated = [
+        "Квартальный отчёт бухгалтерии о закупке канцелярских товаров",
+        "Погода на выходные: дождь, ветер и похолодание до пяти градусов",
+        "Lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod",
+    ]
+    for text in unrelated:
+        assert index.query(index.hasher.signature(text)) == []
+
+
+def test_add_is_idempotent(corpus):
+    index, texts = corpus
+    size = len(index)
+    index.add(0, index.hasher.signature(texts[1]))
+    assert len(index) == size
+    assert index.query(index.hasher.signature(texts[0]))[0] == (0, 1.0)
+
+
+def test_changed_params_invalidate_stored_signatures():
+    a = MinHasher(128, 5, 1)
+    assert a.params != MinHasher(128, 5, 2).params
+    assert a.params != MinHasher(128, 4, 1).params
+    with pytest.raises(ValueError):
+        SimilarityIndex(a, bands=15, threshold=0.5)
+
+
+def test_backfill_and_load_match_add(db, make_user):
+    rng = random.Random(3)
+    author, _ = make_user()
+    ideas = [
+        models.Idea(title=" ".join(rng.sample(WORDS, 3)), description=_text(rng), author_id=author.user_id)
+        for _ in range(25)
+    ]
+    db.add_all(ideas)
+    db.commit()
+
+    index = _index()
+    assert index.backfill(SessionLocal, batch_size=10) == len(ideas)
+    # повторный запуск ничего не пересчитывает
+    assert index.backfill(SessionLocal, batch_size=10) == 0
+
+    loaded = _index()
+    assert loaded.load(db, batch_size=10) == len(ideas)
+    built = _index()
+    for idea in ideas:
+        built.add(idea.idea_id, built.hasher.signature(idea_text(idea.title, idea.description)))
+
+    assert len(loaded) == len(built) == len(ideas)
+    for idea in ideas:
+        query = built.hasher.signature(_paraphrase(idea_text(idea.title, idea.description), rng))
+        assert loaded.query(query) == built.query(query)
@@ -0,0 +1,39 @@
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.auth import create_access_token
+from app.main import app
+from app.services.connection_manager import manager
+from app.services.principal_cache import invalidate_principal, principal_cache
+
+
+def _connect(client, token):
+    return client.websocket_connect(f"/ws/notifications?token={token}")
+
+
+def test_current_token_is_accepted(db, make_user):
+    user, token = make_user()
+    with _connect(TestClient(app), token):
+        assert user.user_id in manager._sessions
+
+
+def test_revoked_token_is_rejected(db, make_user):
+    user, token = make_user()
+    principal_cache.load(db, user.user_id)
+    # как при смене роли: версия токена растёт, кэш сбрасывается
+    user.token_version += 1
+    invalidate_principal(db, user.user_id)
+    db.commit()
+    with pytest.raises(WebSocketDisconnect) as closed:
+        with _connect(TestClient(app), token):
+            pass
+    assert closed.value.code == 1008
+
+
+@pytest.mark.parametrize("claims", [{"sub": "not-a-number"}, {"sub": "1000000000"}])
+def test_invalid_or_unknown_user_is_rejected(db, claims):
+    with pytest.raises(WebSocketDisconnect) as closed:
+        with _connect(TestClient(app), create_access_token(claims)):
+            pass
+    assert closed.value.code == 1008